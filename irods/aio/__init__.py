@@ -0,0 +1,8 @@
+"""An asyncio interface to iRODS: sessions whose operations are awaited, made over
+asyncio streams rather than blocking sockets.  See irods.aio.session.AsyncSession."""
+
+from irods.aio.connection import AsyncConnection
+from irods.aio.pool import AsyncPool
+from irods.aio.session import AsyncQuery, AsyncSession
+
+__all__ = ["AsyncConnection", "AsyncPool", "AsyncQuery", "AsyncSession"]
@@ -0,0 +1,357 @@
+import asyncio
+import base64
+import logging
+import os
+import ssl
+import struct
+
+import irods.client_configuration as cfg
+from irods.api_number import api_number
+from irods.client_server_negotiation import (
+    perform_negotiation,
+    validate_policy,
+    REQUEST_NEGOTIATION,
+    REQUIRE_TCP,
+    FAILURE,
+    USE_SSL,
+    CS_NEG_RESULT_KW,
+)
+from irods.connection import (
+    Connection,
+    _OPENED_DATA_OBJECT_REQUESTS,
+    _check_response,
+    _native_auth_digest,
+)
+from irods.exception import NetworkException, OperationNotSupported, nominal_code
+from irods.message import (
+    iRODSMessage,
+    AuthChallenge,
+    AuthResponse,
+    ClientServerNegotiation,
+    FileSeekResponse,
+    JSON_Message,
+    OpenedDataObjRequest,
+    StartupPack,
+    StringStringMap,
+    VersionResponse,
+    _decode_msg_header,
+)
+from irods import LONG_NAME_LEN, NATIVE_AUTH_SCHEME
+
+logger = logging.getLogger(__name__)
+
+
+async def _read_message(reader, into_buffer=None):
+    """Read one iRODS protocol frame from an asyncio StreamReader."""
+    (header_size,) = struct.unpack(">i", await reader.readexactly(4))
+    (msg_type, msg_len, err_len, bs_len, int_info) = _decode_msg_header(
+        await reader.readexactly(header_size)
+    )
+    message = await reader.readexactly(msg_len) if msg_len != 0 else None
+    error = await reader.readexactly(err_len) if err_len != 0 else None
+    bs = await reader.readexactly(bs_len) if bs_len != 0 else None
+    if bs is not None and into_buffer is not None:
+        view = memoryview(into_buffer).cast("B")
+        view[:bs_len] = bs
+        bs = view[:bs_len]
+    return iRODSMessage(msg_type, message, error, bs, int_info)
+
+
+class AsyncConnection:
+    """A connection to an iRODS server over asyncio streams.
+
+    Requests and responses are the irods.message classes used by irods.connection.Connection;
+    only the transport differs.  Connections are made by AsyncConnection.open() (usually from
+    an irods.aio.pool.AsyncPool), which negotiates TLS as the account requires and authenticates
+    by the native scheme.
+    """
+
+    def __init__(self, pool, account):
+        self.pool = pool
+        self.account = account
+        self.reader = None
+        self.writer = None
+        self._server_version = None
+        self._client_signature = None
+        self._disconnected = True
+        self.create_time = self.last_used_time = None
+
+    @classmethod
+    async def open(cls, pool, account):
+        conn = cls(pool, account)
+        try:
+            await conn._connect()
+            await conn._login()
+        except BaseException:
+            conn.abort()
+            raise
+        return conn
+
+    @property
+    def server_version(self):
+        return tuple(
+            int(x)
+            for x in self._server_version.relVersion.replace("rods", "").split(".")
+        )
+
+    @property
+    def client_signature(self):
+        return self._client_signature
+
+    async def send(self, message):
+        try:
+            self.writer.writelines(message.pack_segments())
+            await self.writer.drain()
+        except (OSError, AttributeError) as e:
+            logger.error("Unable to send message: %r", e)
+            self.abort()
+            raise NetworkException("Unable to send message")
+
+    async def recv(self, into_buffer=None, acceptable_errors=()):
+        try:
+            msg = await _read_message(self.reader, into_buffer)
+        except (OSError, asyncio.IncompleteReadError, AttributeError) as e:
+            logger.error("Could not receive server response: %r", e)
+            self.abort()
+            raise NetworkException("Could not receive server response")
+        return _check_response(msg, set(map(nominal_code, acceptable_errors)))
+
+    async def request(self, message, **options):
+        await self.send(message)
+        return await self.recv(**options)
+
+    async def _connect(self):
+        address = (self.account.host, self.account.port)
+        timeout = getattr(self.pool, "connection_timeout", None)
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(*address), timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            raise NetworkException(
+                "Could not connect to specified host and port: {}:{}".format(*address)
+            )
+        self._disconnected = False
+
+        main_message = StartupPack(
+            (self.account.proxy_user, self.account.proxy_zone),
+            (self.account.client_user, self.account.client_zone),
+            getattr(self.pool, "application_name", ""),
+        )
+        requires_negotiation = (
+            getattr(self.account, "client_server_negotiation", None)
+            == REQUEST_NEGOTIATION
+        )
+        if requires_negotiation:
+            main_message.option = "{}{}".format(
+                main_message.option, REQUEST_NEGOTIATION
+            )
+        if len(main_message.option) >= LONG_NAME_LEN:
+            raise ValueError("Application name too long.")
+        await self.send(iRODSMessage(msg_type="RODS_CONNECT", msg=main_message))
+
+        neg_result = None
+        if requires_negotiation:
+            client_policy = getattr(self.account, "client_server_policy", REQUIRE_TCP)
+            validate_policy(client_policy)
+            response = (await self.recv()).get_main_message(ClientServerNegotiation)
+            neg_result, status = perform_negotiation(
+                client_policy=client_policy, server_policy=response.result
+            )
+            await self.send(
+                iRODSMessage(
+                    msg_type="RODS_CS_NEG_T",
+                    msg=ClientServerNegotiation(
+                        status=status,
+                        result="{}={};".format(CS_NEG_RESULT_KW, neg_result),
+                    ),
+                )
+            )
+            if neg_result == FAILURE:
+                self.abort()
+                raise NetworkException(
+                    "Client-Server negotiation failure: {},{}".format(
+                        client_policy, response.result
+                    )
+                )
+
+        version_msg = await self.recv()
+        if neg_result == USE_SSL:
+            await self._ssl_startup()
+        self._server_version = version_msg.get_main_message(VersionResponse)
+
+    async def _ssl_startup(self):
+        try:
+            context = self.account.ssl_context
+        except AttributeError:
+            self.account.ssl_context = context = Connection.make_ssl_context(
+                self.account
+            )
+        host = self.account.host
+        server_hostname = host if context.check_hostname else None
+        if hasattr(self.writer, "start_tls"):
+            await self.writer.start_tls(context, server_hostname=server_hostname)
+        else:
+            # Before Python 3.11, the stream is upgraded through the event loop, and a new reader
+            # and writer are made over the TLS transport it returns.
+            loop = asyncio.get_running_loop()
+            reader = asyncio.StreamReader()
+            protocol = asyncio.StreamReaderProtocol(reader)
+            transport = await loop.start_tls(
+                self.writer.transport,
+                protocol,
+                context,
+                server_hostname=server_hostname,
+            )
+            self.reader = reader
+            self.writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+
+        key_size = self.account.encryption_key_size
+        key = os.urandom(key_size)
+        self.writer.write(
+            iRODSMessage.pack_header(
+                self.account.encryption_algorithm,
+                key_size,
+                self.account.encryption_salt_size,
+                self.account.encryption_num_hash_rounds,
+                0,
+            )
+        )
+        self.writer.write(
+            iRODSMessage.pack_header("SHARED_SECRET", key_size, 0, 0, 0) + key
+        )
+        await self.writer.drain()
+
+    async def _login(self):
+        # A password scrambled in the .irodsA file is used natively, whatever the original scheme.
+        scheme = self.account.authentication_scheme
+        if scheme != NATIVE_AUTH_SCHEME:
+            raise OperationNotSupported(
+                "Authentication scheme {!r} is not supported by AsyncConnection.".format(
+                    scheme
+                )
+            )
+        password = self.account.password or ""
+        if self.server_version >= (4, 3, 0) and not cfg.legacy_auth.force_legacy_auth:
+            await self._login_native(password)
+        else:
+            await self._login_native_legacy(password)
+        self.create_time = self.last_used_time = asyncio.get_running_loop().time()
+
+    async def _auth_api_request(self, data):
+        response = await self.request(
+            iRODSMessage(
+                "RODS_API_REQ",
+                msg=JSON_Message(data, self.server_version),
+                int_info=api_number["AUTHENTICATION_APN"],
+            )
+        )
+        return response.get_json_encoded_struct()
+
+    async def _login_native(self, password):
+        # The client side of the native scheme's flow in the 4.3 authentication framework
+        # (see irods.auth.native).
+        request = {
+            "scheme": NATIVE_AUTH_SCHEME,
+            "user_name": self.account.proxy_user,
+            "zone_name": self.account.proxy_zone,
+            "next_operation": "auth_agent_auth_request",
+        }
+        response = await self._auth_api_request(request)
+        challenge = response["request_result"].encode("utf-8")
+        self._client_signature = "".join("{:02x}".format(c) for c in challenge[:16])
+        request = dict(
+            response,
+            digest=base64.encodebytes(_native_auth_digest(challenge, password))
+            .strip()
+            .decode("utf-8"),
+            next_operation="auth_agent_auth_response",
+        )
+        await self._auth_api_request(request)
+
+    async def _login_native_legacy(self, password):
+        challenge_msg = await self.request(
+            iRODSMessage(msg_type="RODS_API_REQ", int_info=api_number["AUTH_REQUEST_AN"])
+        )
+        challenge = challenge_msg.get_main_message(AuthChallenge).challenge
+        self._client_signature = "".join("{:02x}".format(c) for c in challenge[:16])
+        await self.request(
+            iRODSMessage(
+                msg_type="RODS_API_REQ",
+                int_info=api_number["AUTH_RESPONSE_AN"],
+                msg=AuthResponse(
+                    response=_native_auth_digest(challenge.strip(), password),
+                    username=self.account.proxy_user,
+                ),
+            )
+        )
+
+    async def disconnect(self):
+        if self._disconnected:
+            return
+        try:
+            await self.send(iRODSMessage(msg_type="RODS_DISCONNECT"))
+            self.writer.close()
+            await self.writer.wait_closed()
+        except (NetworkException, OSError, ssl.SSLError):
+            pass
+        finally:
+            self.abort()
+
+    def abort(self):
+        """Close the transport at once, without a word to the server."""
+        self._disconnected = True
+        writer, self.writer = self.writer, None
+        self.reader = None
+        if writer is not None:
+            writer.transport.abort()
+
+    async def release(self, destroy=False):
+        await self.pool.release_connection(self, destroy)
+
+    async def read_file(self, desc, size, buffer=None):
+        response = await self.request(
+            _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_READ_AN"](
+                l1descInx=desc, len=size, whence=0, offset=0
+            ),
+            into_buffer=buffer,
+        )
+        return response.bs
+
+    async def write_file(self, desc, data):
+        response = await self.request(
+            _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_WRITE_AN"](
+                bs=data, l1descInx=desc, len=len(data), whence=0, offset=0
+            )
+        )
+        return response.int_info
+
+    async def seek_file(self, desc, offset, whence):
+        response = await self.request(
+            _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_LSEEK_AN"](
+                l1descInx=desc, len=0, whence=whence, offset=offset
+            )
+        )
+        return response.get_main_message(FileSeekResponse).offset
+
+    async def close_file(self, desc, **options):
+        if not options:
+            message = _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_CLOSE_AN"](
+                l1descInx=desc, len=0, whence=0, offset=0
+            )
+        else:
+            message = iRODSMessage(
+                "RODS_API_REQ",
+                msg=OpenedDataObjRequest(
+                    l1descInx=desc,
+                    len=0,
+                    whence=0,
+                    oprType=0,
+                    offset=0,
+                    bytesWritten=0,
+                    KeyValPair_PI=StringStringMap(options),
+                ),
+                int_info=api_number["DATA_OBJ_CLOSE_AN"],
+            )
+        await self.request(message)
+
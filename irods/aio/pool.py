@@ -0,0 +1,130 @@
+import asyncio
+import collections
+import contextlib
+import logging
+import os
+
+from irods import DEFAULT_CONNECTION_TIMEOUT
+from irods.aio.connection import AsyncConnection
+from irods.exception import ConnectionPoolTimeout
+from irods.pool import DEFAULT_APPLICATION_NAME, PoolMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPool:
+    """A pool of AsyncConnection objects, the counterpart of irods.pool.Pool for use from a
+    single event loop.
+
+    A positive max_size bounds the number of connections; coroutines needing one beyond that
+    wait (in the order of their arrival) for one to be released, for at most checkout_timeout
+    seconds if that is not None.
+    """
+
+    def __init__(
+        self, account, application_name="", max_size=0, checkout_timeout=None
+    ):
+        self.account = account
+        self.active = set()
+        self.idle = []
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.connection_timeout = DEFAULT_CONNECTION_TIMEOUT
+        self.application_name = (
+            os.environ.get("spOption", "")
+            or application_name
+            or DEFAULT_APPLICATION_NAME
+        )
+        self.metrics = PoolMetrics()
+        self._opening = 0
+        self._waiters = collections.deque()
+        self._released = None  # An asyncio.Condition, made on first use within the event loop.
+
+    def _condition(self):
+        if self._released is None:
+            self._released = asyncio.Condition()
+        return self._released
+
+    def _saturated(self):
+        return (
+            0 < self.max_size <= len(self.active) + self._opening and not self.idle
+        )
+
+    async def _wait_for_release(self, released):
+        # Called with the condition's lock held.  Coroutines are served in the order of their
+        # arrival, as by irods.pool.Pool.
+        loop = asyncio.get_running_loop()
+        begin = loop.time()
+        token = object()
+        self._waiters.append(token)
+        try:
+            await asyncio.wait_for(
+                released.wait_for(
+                    lambda: self._waiters[0] is token and not self._saturated()
+                ),
+                self.checkout_timeout,
+            )
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise ConnectionPoolTimeout(
+                "No connection was released within {} seconds; all {} are in use.".format(
+                    self.checkout_timeout, self.max_size
+                )
+            )
+        finally:
+            self._waiters.remove(token)
+            released.notify_all()
+        self.metrics.record_wait(loop.time() - begin)
+
+    async def get_connection(self):
+        released = self._condition()
+        async with released:
+            if self._waiters or self._saturated():
+                await self._wait_for_release(released)
+            conn = self.idle.pop() if self.idle else None
+            if conn is None:
+                self._opening += 1
+        if conn is None:
+            try:
+                conn = await AsyncConnection.open(self, self.account)
+            finally:
+                async with released:
+                    self._opening -= 1
+                    released.notify_all()
+            self.metrics.connections_created += 1
+        self.active.add(conn)
+        self.metrics.checkouts += 1
+        self.metrics.peak_active = max(self.metrics.peak_active, len(self.active))
+        return conn
+
+    async def release_connection(self, conn, destroy=False):
+        released = self._condition()
+        async with released:
+            if conn in self.active:
+                self.active.remove(conn)
+                if not destroy and not conn._disconnected:
+                    conn.last_used_time = asyncio.get_running_loop().time()
+                    self.idle.append(conn)
+            elif destroy and conn in self.idle:
+                self.idle.remove(conn)
+            released.notify_all()
+        if destroy:
+            await conn.disconnect()
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        """Check out a connection for the duration of an "async with" block."""
+        conn = await self.get_connection()
+        try:
+            yield conn
+        finally:
+            await self.release_connection(conn, destroy=conn._disconnected)
+
+    async def close(self):
+        """Disconnect all connections, idle and active."""
+        connections = list(self.active) + self.idle
+        self.active.clear()
+        del self.idle[:]
+        await asyncio.gather(
+            *(conn.disconnect() for conn in connections), return_exceptions=True
+        )
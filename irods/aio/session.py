@@ -0,0 +1,357 @@
+import io
+import logging
+import os
+from os.path import basename, dirname
+
+import irods.keywords as kw
+from irods import DEFAULT_CONNECTION_TIMEOUT
+from irods.aio.pool import AsyncPool
+from irods.api_number import api_number
+from irods.exception import (
+    CAT_NO_ROWS_FOUND,
+    MultipleResultsFound,
+    NoResultFound,
+)
+from irods.manager.data_object_manager import DataObjectManager
+from irods.manager.metadata_manager import MetadataManager
+from irods.message import (
+    FileOpenRequest,
+    GenQueryResponse,
+    MetadataRequest,
+    StringStringMap,
+    empty_gen_query_out,
+    iRODSMessage,
+)
+from irods.meta import iRODSMeta
+from irods.models import (
+    Collection,
+    CollectionMeta,
+    DataObject,
+    DataObjectMeta,
+    Resource,
+    ResourceMeta,
+    User,
+    UserMeta,
+)
+from irods.query import Query
+from irods.results import ResultSet
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncQuery(Query):
+    """A Query built in the usual way (filter, limit, order_by, ...) whose execution is
+    awaited.  Results are had through "await q.all()", "await q.one()", "await q.first()",
+    or "async for row in q"."""
+
+    async def execute(self):
+        message = iRODSMessage(
+            "RODS_API_REQ", msg=self._message(), int_info=api_number["GEN_QUERY_AN"]
+        )
+        async with self.sess.pool.connection() as conn:
+            try:
+                result_message = await conn.request(message)
+                return ResultSet(result_message.get_main_message(GenQueryResponse))
+            except CAT_NO_ROWS_FOUND:
+                return ResultSet(empty_gen_query_out(list(self.columns.keys())))
+
+    async def close(self):
+        await self.limit(0).execute()
+
+    async def all(self):
+        result_set = await self.execute()
+        if result_set.continue_index > 0:
+            await self.continue_index(result_set.continue_index).close()
+        return result_set
+
+    async def get_batches(self):
+        result_set = await self.execute()
+        try:
+            yield result_set
+            while result_set.continue_index > 0:
+                try:
+                    result_set = await self.continue_index(
+                        result_set.continue_index
+                    ).execute()
+                    yield result_set
+                except CAT_NO_ROWS_FOUND:
+                    break
+        except GeneratorExit:
+            if result_set.continue_index > 0:
+                await self.continue_index(result_set.continue_index).close()
+            raise
+
+    async def get_results(self):
+        async for result_set in self.get_batches():
+            for result in result_set:
+                yield result
+
+    def __aiter__(self):
+        return self.get_results()
+
+    def __iter__(self):
+        raise TypeError("Use 'async for' to iterate over an AsyncQuery.")
+
+    async def one(self):
+        results = await self.execute()
+        if results.continue_index > 0:
+            await self.continue_index(results.continue_index).close()
+        if not len(results):
+            raise NoResultFound()
+        if len(results) > 1:
+            raise MultipleResultsFound()
+        return results[0]
+
+    async def first(self):
+        query = self.limit(1)
+        results = await query.execute()
+        if results.continue_index > 0:
+            await query.continue_index(results.continue_index).close()
+        return results[0] if len(results) else None
+
+
+class AsyncMetadataManager:
+    """The get, add, remove, and set operations of irods.manager.metadata_manager.MetadataManager,
+    awaited."""
+
+    _META_MODELS = {
+        "d": DataObjectMeta,
+        "C": CollectionMeta,
+        "R": ResourceMeta,
+        "u": UserMeta,
+    }
+
+    def __init__(self, sess):
+        self.sess = sess
+
+    async def get(self, model_cls, path):
+        resource_type = MetadataManager._model_class_to_resource_type(model_cls)
+        model = self._META_MODELS[resource_type]
+        conditions = {
+            "d": [Collection.name == dirname(path), DataObject.name == basename(path)],
+            "C": [Collection.name == path],
+            "R": [Resource.name == path],
+            "u": [User.name == path],
+        }[resource_type]
+        query = self.sess.query(model.id, model.name, model.value, model.units).filter(
+            *conditions
+        )
+        return [
+            iRODSMeta(
+                row[model.name], row[model.value], row[model.units], avu_id=row[model.id]
+            )
+            async for row in query
+        ]
+
+    async def _modify(self, operation, model_cls, path, meta, **opts):
+        resource_type = MetadataManager._model_class_to_resource_type(model_cls)
+        message_body = MetadataRequest(
+            operation,
+            "-" + resource_type,
+            path,
+            meta.name,
+            meta.value,
+            meta.units,
+            **opts
+        )
+        async with self.sess.pool.connection() as conn:
+            response = await conn.request(
+                iRODSMessage(
+                    "RODS_API_REQ",
+                    msg=message_body,
+                    int_info=api_number["MOD_AVU_METADATA_AN"],
+                )
+            )
+        logger.debug(response.int_info)
+
+    async def add(self, model_cls, path, meta, **opts):
+        await self._modify("add", model_cls, path, meta, **opts)
+
+    async def remove(self, model_cls, path, meta, **opts):
+        await self._modify("rm", model_cls, path, meta, **opts)
+
+    async def set(self, model_cls, path, meta, **opts):
+        await self._modify("set", model_cls, path, meta, **opts)
+
+
+class AsyncDataObjectFile:
+    """An open data object, read and written by awaiting its methods.  The connection on which
+    it was opened is held until close() (or the end of an "async with" block)."""
+
+    def __init__(self, conn, desc, **options):
+        self.conn = conn
+        self.desc = desc
+        self.options = options
+        self.closed = False
+
+    async def read(self, size=-1):
+        if size >= 0:
+            return bytes(await self.conn.read_file(self.desc, size) or b"")
+        chunks = []
+        while True:
+            chunk = await self.conn.read_file(
+                self.desc, io.DEFAULT_BUFFER_SIZE * 128
+            )
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(bytes(chunk))
+
+    async def readinto(self, b):
+        contents = await self.conn.read_file(self.desc, len(b), buffer=b)
+        return len(contents) if contents is not None else 0
+
+    async def write(self, b):
+        return await self.conn.write_file(self.desc, b)
+
+    async def seek(self, offset, whence=os.SEEK_SET):
+        return await self.conn.seek_file(self.desc, offset, whence)
+
+    async def tell(self):
+        return await self.seek(0, os.SEEK_CUR)
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.conn.close_file(self.desc, **self.options)
+        finally:
+            await self.conn.release(destroy=self.conn._disconnected)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+class AsyncDataObjectManager:
+
+    def __init__(self, sess):
+        self.sess = sess
+
+    async def open(self, path, mode, create=True, **options):
+        """Open a data object in one of the modes of DataObjectManager.open ("r", "r+", "w",
+        "w+", "a", or "a+"), returning an AsyncDataObjectFile."""
+        D = DataObjectManager
+        create_flag = D.O_CREAT if create else 0
+        flags = {
+            "r": D.O_RDONLY,
+            "r+": D.O_RDWR,
+            "w": D.O_WRONLY | create_flag | D.O_TRUNC,
+            "w+": D.O_RDWR | create_flag | D.O_TRUNC,
+            "a": D.O_WRONLY | create_flag,
+            "a+": D.O_RDWR | create_flag,
+        }[mode]
+        if self.sess.default_resource and kw.DEST_RESC_NAME_KW not in options:
+            options[kw.DEST_RESC_NAME_KW] = self.sess.default_resource
+        conn = await self.sess.pool.get_connection()
+        try:
+            response = await conn.request(
+                iRODSMessage(
+                    "RODS_API_REQ",
+                    msg=FileOpenRequest(
+                        objPath=path,
+                        createMode=0,
+                        openFlags=flags,
+                        offset=0,
+                        dataSize=-1 if conn.server_version >= (4, 3, 1) else 0,
+                        numThreads=0,
+                        oprType=options.get(kw.OPR_TYPE_KW, 0),
+                        KeyValPair_PI=StringStringMap(options),
+                    ),
+                    int_info=api_number["DATA_OBJ_OPEN_AN"],
+                )
+            )
+        except BaseException:
+            await conn.release(destroy=conn._disconnected)
+            raise
+        f = AsyncDataObjectFile(conn, response.int_info)
+        if "a" in mode:
+            await f.seek(0, os.SEEK_END)
+        return f
+
+
+class AsyncSession:
+    """A session whose operations are coroutines, run on an asyncio event loop over
+    AsyncConnection objects rather than threads.
+
+    Its constructor takes the keyword arguments of irods.session.iRODSSession that determine
+    the account (including irods_env_file and the ssl_* and encryption_* settings), and also
+    pool_max_size, pool_checkout_timeout, and connection_timeout.  Only native
+    authentication is supported.  A first connection is made on entering an "async with"
+    block (or awaiting connect()), which establishes the server version needed in building
+    queries; all connections are closed on leaving it (or awaiting cleanup()).
+
+    The operations available are query(), metadata.get/add/remove/set, and data_objects.open
+    (with read, write, seek, and close on the returned object).
+    """
+
+    def __init__(self, **kwargs):
+        from irods.session import iRODSSession
+
+        self.connection_timeout = kwargs.pop(
+            "connection_timeout", DEFAULT_CONNECTION_TIMEOUT
+        )
+        max_size = int(kwargs.pop("pool_max_size", 0))
+        checkout_timeout = kwargs.pop("pool_checkout_timeout", None)
+        application_name = kwargs.pop("application_name", "")
+        # The account is configured from keywords and environment files just as for iRODSSession.
+        account = iRODSSession(
+            configure=False, auto_cleanup=False
+        )._configure_account(**kwargs)
+        self.pool = AsyncPool(
+            account,
+            application_name=application_name,
+            max_size=max_size,
+            checkout_timeout=checkout_timeout,
+        )
+        self.pool.connection_timeout = self.connection_timeout
+        self._server_version = None
+        self.metadata = AsyncMetadataManager(self)
+        self.data_objects = AsyncDataObjectManager(self)
+
+    async def connect(self):
+        async with self.pool.connection() as conn:
+            self._server_version = conn.server_version
+        return self
+
+    async def cleanup(self):
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    @property
+    def server_version(self):
+        if self._server_version is None:
+            raise RuntimeError(
+                "The server version is not known until the session has connected."
+            )
+        return self._server_version
+
+    @property
+    def username(self):
+        return self.pool.account.client_user
+
+    @property
+    def zone(self):
+        return self.pool.account.client_zone
+
+    @property
+    def host(self):
+        return self.pool.account.host
+
+    @property
+    def port(self):
+        return self.pool.account.port
+
+    @property
+    def default_resource(self):
+        return getattr(self.pool.account, "default_resource", None)
+
+    def query(self, *args, **kwargs):
+        return AsyncQuery(self, *args, **kwargs)
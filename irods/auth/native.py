@@ -1,9 +1,7 @@
 import base64
 import logging
-import hashlib
-import struct
 
-from irods import MAX_PASSWORD_LENGTH
+from irods.connection import _native_auth_digest
 
 from . import (
     __NEXT_OPERATION__,
@@ -95,18 +93,7 @@ class _native_ClientAuthState(authentication_base):
             "{:02x}".format(c) for c in challenge[:16]
         )
 
-        padded_pwd = struct.pack(
-            "%ds" % MAX_PASSWORD_LENGTH, password.encode("utf-8").strip()
-        )
-
-        m = hashlib.md5()
-        m.update(challenge)
-        m.update(padded_pwd)
-
-        encoded_pwd = m.digest()
-        if b"\x00" in encoded_pwd:
-            encoded_pwd_array = bytearray(encoded_pwd)
-            encoded_pwd = bytes(encoded_pwd_array.replace(b"\0", b"\1"))
+        encoded_pwd = _native_auth_digest(challenge, password)
         request["digest"] = base64.encodebytes(encoded_pwd).strip().decode("utf-8")
 
         request[__NEXT_OPERATION__] = self.AUTH_CLIENT_AUTH_RESPONSE
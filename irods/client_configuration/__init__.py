@@ -94,6 +94,9 @@ class DataObjects(iRODSConfiguration):
         "allow_redirect",
         "force_create_by_default",
         "force_put_by_default",
+        "parallel_chunk_size",
+        "parallel_transfer_retries",
+        "write_behind",
     )
 
     def __init__(self):
@@ -113,6 +116,19 @@ class DataObjects(iRODSConfiguration):
         self.force_create_by_default = True
         self.force_put_by_default = True
 
+        # A positive value makes parallel transfer threads draw fixed-size chunks
+        # from a shared queue, instead of each being assigned one equal share of
+        # the data object up front.
+        self.parallel_chunk_size = 0
+
+        # The number of times a parallel transfer thread re-sends a chunk over a newly
+        # opened connection after a network error, before giving up on the transfer.
+        self.parallel_transfer_retries = 3
+
+        # A positive value is the number of bytes of written data that an open data object
+        # may hold in memory while it is sent to the server from a background thread.
+        self.write_behind = 0
+
 
 # #############################################################################
 #
@@ -1,3 +1,5 @@
+import collections
+import selectors
 import socket
 import logging
 import struct
@@ -6,6 +8,8 @@ import os
 import ssl
 import datetime
 import errno
+import irods.metrics as metrics
+import irods.tracing as tracing
 import irods.password_obfuscation as obf
 from irods import LONG_NAME_LEN, MAX_NAME_LEN
 from irods.exception import PAM_AUTH_PASSWORD_INVALID_TTL
@@ -14,6 +18,9 @@ import re
 
 
 from irods.message import (
+    _Buffered_socket_reader,
+    _Request_template,
+    _send_message_segments,
     iRODSMessage,
     StartupPack,
     AuthResponse,
@@ -65,6 +72,64 @@ from irods.api_number import api_number
 logger = logging.getLogger(__name__)
 
 
+def _opened_data_object_request_template(api_name):
+    return _Request_template(
+        OpenedDataObjRequest(
+            l1descInx=0,
+            len=0,
+            whence=0,
+            oprType=0,
+            offset=0,
+            bytesWritten=0,
+            KeyValPair_PI=StringStringMap(),
+        ),
+        api_number[api_name],
+        ("l1descInx", "len", "whence", "offset"),
+    )
+
+
+# Requests on an open data object differ only in these few fields, and are sent often enough
+# that it pays to serialize them once (see irods.message._Request_template).
+_OPENED_DATA_OBJECT_REQUESTS = {
+    api_name: _opened_data_object_request_template(api_name)
+    for api_name in (
+        "DATA_OBJ_READ_AN",
+        "DATA_OBJ_WRITE_AN",
+        "DATA_OBJ_LSEEK_AN",
+        "DATA_OBJ_CLOSE_AN",
+    )
+}
+
+
+def _check_response(msg, acceptable_codes=()):
+    """Raise the exception for an error code returned in a server response, unless the code
+    is among those acceptable; otherwise return the response."""
+    if msg.int_info < 0:
+        try:
+            err_msg = (
+                iRODSMessage(msg=msg.error).get_main_message(Error).RErrMsg_PI[0].msg
+            )
+        except TypeError:
+            err_msg = None
+        if nominal_code(msg.int_info) not in acceptable_codes:
+            exc = get_exception_by_code(msg.int_info, err_msg)
+            exc.server_msg = msg
+            raise exc
+    return msg
+
+
+def _native_auth_digest(challenge, password):
+    """Return the response to a native authentication challenge: the MD5 digest of the
+    challenge and the padded password, with any zero bytes replaced."""
+    padded_pwd = struct.pack(
+        "%ds" % MAX_PASSWORD_LENGTH, password.encode("utf-8").strip()
+    )
+    m = hashlib.md5()
+    m.update(challenge)
+    m.update(padded_pwd)
+    return m.digest().replace(b"\x00", b"\x01")
+
+
 class PlainTextPAMPasswordError(Exception):
     pass
 
@@ -77,6 +142,8 @@ class Connection:
 
         self.pool = pool
         self.socket = None
+        self._reader = None
+        self._samples = collections.deque()  # Requests awaiting responses, when metrics are enabled.
         self.account = account
         self.auth_options = {}
         self._client_signature = None
@@ -88,49 +155,56 @@ class Connection:
 
         try:
             scheme = self.account._original_authentication_scheme
+            with tracing.span(
+                "irods.auth",
+                {"irods.auth_scheme": scheme, "irods.host": self.account.host},
+            ):
+                self._authenticate(scheme)
 
-            ses = self.pool.session_ref()
-            if ses:
-                ses.resolve_auth_options(scheme, conn=self)
+            # By now the server's responses have been read, including any TLS 1.3 session
+            # tickets sent after the handshake.
+            self._remember_tls_session()
+        finally:
+            self.create_time = datetime.datetime.now()
+            self.last_used_time = self.create_time
 
-            # These variables are just useful diagnostics.  The login_XYZ() methods should fail by
-            # raising exceptions if they encounter authentication errors.
-            auth_module = auth_type = ""
+    def _authenticate(self, scheme):
+        ses = self.pool.session_ref()
+        if ses:
+            ses.resolve_auth_options(scheme, conn=self)
 
-            import irods.client_configuration as cfg
+        # These variables are just useful diagnostics.  The login_XYZ() methods should fail by
+        # raising exceptions if they encounter authentication errors.
+        auth_module = auth_type = ""
 
-            if (
-                self.server_version >= (4, 3, 0)
-                and not cfg.legacy_auth.force_legacy_auth
-            ):
-                import irods.auth
-
-                auth_module = None
-                # use client side "plugin" module: irods.auth.<scheme>
-                irods.auth.load_plugins(subset=[scheme])
-                auth_module = getattr(irods.auth, scheme, None)
-                if auth_module:
-                    auth_module.login(self, **self.auth_options)
-                    auth_type = auth_module.__name__
+        import irods.client_configuration as cfg
+
+        if self.server_version >= (4, 3, 0) and not cfg.legacy_auth.force_legacy_auth:
+            import irods.auth
+
+            auth_module = None
+            # use client side "plugin" module: irods.auth.<scheme>
+            irods.auth.load_plugins(subset=[scheme])
+            auth_module = getattr(irods.auth, scheme, None)
+            if auth_module:
+                auth_module.login(self, **self.auth_options)
+                auth_type = auth_module.__name__
+        else:
+            # use legacy (iRODS pre-4.3 style) authentication
+            auth_type = scheme
+            if scheme == NATIVE_AUTH_SCHEME:
+                self._login_native()
+            elif scheme == GSI_AUTH_SCHEME:
+                self.client_ctx = None
+                self._login_gsi()
+            elif scheme in PAM_AUTH_SCHEMES:
+                self._login_pam()
             else:
-                # use legacy (iRODS pre-4.3 style) authentication
-                auth_type = scheme
-                if scheme == NATIVE_AUTH_SCHEME:
-                    self._login_native()
-                elif scheme == GSI_AUTH_SCHEME:
-                    self.client_ctx = None
-                    self._login_gsi()
-                elif scheme in PAM_AUTH_SCHEMES:
-                    self._login_pam()
-                else:
-                    auth_type = None
+                auth_type = None
 
-            if not auth_type:
-                msg = f"Authentication failed: scheme = {scheme!r}, auth_type = {auth_type!r}, auth_module = {auth_module!r}, "
-                raise ValueError(msg)
-        finally:
-            self.create_time = datetime.datetime.now()
-            self.last_used_time = self.create_time
+        if not auth_type:
+            msg = f"Authentication failed: scheme = {scheme!r}, auth_type = {auth_type!r}, auth_module = {auth_module!r}, "
+            raise ValueError(msg)
 
     @property
     def server_version(self):
@@ -152,11 +226,17 @@ class Connection:
         logger.debug(DESTRUCTOR_MSG)
 
     def send(self, message):
-        string = message.pack()
-
-        logger.debug(string)
+        registry = metrics._registry
+        if registry is not None:
+            sample = metrics._Request_sample(metrics.api_name(message))
+        segments = message.pack_segments()
+        if registry is not None:
+            sample.serialized(segments)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(b"".join(segments))
         try:
-            self.socket.sendall(string)
+            _send_message_segments(self.socket, segments)
         except:
             logger.error(
                 "Unable to send message. "
@@ -165,14 +245,26 @@ class Connection:
             )
             self.release(True)
             raise NetworkException("Unable to send message")
+        if registry is not None:
+            sample.sent()
+            self._samples.append(sample)
 
     def recv(self, into_buffer=None, return_message=(), acceptable_errors=()):
         acceptable_codes = set(nominal_code(e) for e in acceptable_errors)
+        registry = metrics._registry
         try:
+            if registry is not None:
+                sample = (
+                    self._samples.popleft()
+                    if self._samples
+                    else metrics._Request_sample("UNSOLICITED")
+                )
+                self._socket_reader().wait_for_frame()
+                sample.response_began()
             if into_buffer is None:
-                msg = iRODSMessage.recv(self.socket)
+                msg = iRODSMessage.recv(self._socket_reader())
             else:
-                msg = iRODSMessage.recv_into(self.socket, into_buffer)
+                msg = iRODSMessage.recv_into(self._socket_reader(), into_buffer)
         except (socket.error, socket.timeout) as e:
             # If _recv_message_in_len() fails in recv() or recv_into(),
             # it will throw a socket.error exception. The exception is
@@ -182,27 +274,23 @@ class Connection:
             logger.error("Could not receive server response")
             self.release(True)
             raise NetworkException("Could not receive server response")
+        if registry is not None:
+            sample.received(registry, msg)
         if isinstance(return_message, list):
             return_message[:] = [msg]
-        if msg.int_info < 0:
-            try:
-                err_msg = (
-                    iRODSMessage(msg=msg.error)
-                    .get_main_message(Error)
-                    .RErrMsg_PI[0]
-                    .msg
-                )
-            except TypeError:
-                err_msg = None
-            if nominal_code(msg.int_info) not in acceptable_codes:
-                exc = get_exception_by_code(msg.int_info, err_msg)
-                exc.server_msg = msg
-                raise exc
-        return msg
+        return _check_response(msg, acceptable_codes)
 
     def recv_into(self, buffer, **options):
         return self.recv(into_buffer=buffer, **options)
 
+    def _socket_reader(self):
+        # The reader is bound to a particular socket object, so a new one is made whenever
+        # the socket is replaced (as when it is wrapped for SSL).
+        reader = self._reader
+        if reader is None or reader.sock is not self.socket:
+            reader = self._reader = _Buffered_socket_reader(self.socket)
+        return reader
+
     def __enter__(self):
         return self
 
@@ -260,13 +348,20 @@ class Connection:
         except AttributeError:
             self.account.ssl_context = context = self.make_ssl_context(self.account)
 
-        # Wrap socket with context
+        # Wrap socket with context, offering to resume a TLS session from an earlier connection
+        # to the same server.  A session can only be resumed through the SSLContext which made it.
+        cached = self.pool._tls_sessions.get((host, self.account.port)) if self.pool else None
+        tls_session = cached[1] if cached and cached[0] is context else None
         wrapped_socket = context.wrap_socket(
-            self.socket, server_hostname=(host if context.check_hostname else None)
+            self.socket,
+            server_hostname=(host if context.check_hostname else None),
+            session=tls_session,
         )
 
         # Initial SSL handshake
         wrapped_socket.do_handshake()
+        if self.pool:
+            self.pool._record_tls_handshake(wrapped_socket.session_reused)
 
         # Generate key (shared secret)
         key = os.urandom(self.account.encryption_key_size)
@@ -284,6 +379,15 @@ class Connection:
         # Use SSL socket from now on
         self.socket = wrapped_socket
 
+    def _remember_tls_session(self):
+        if isinstance(self.socket, ssl.SSLSocket) and self.pool:
+            tls_session = self.socket.session
+            if tls_session is not None:
+                self.pool._tls_sessions[(self.account.host, self.account.port)] = (
+                    self.socket.context,
+                    tls_session,
+                )
+
     def _connect(self):
         address = (self.account.host, self.account.port)
         timeout = self.pool.connection_timeout
@@ -407,15 +511,46 @@ class Connection:
             # like to ensure as much cleanup as possible, thus preventing the above socket shutdown
             # procedure from running too many times and creating confusing messages
 
+    def abandon(self):
+        """Close this process's handle on the socket without a word to the server, as for a
+        connection inherited across a fork: the protocol stream still belongs to the parent."""
+        self._disconnected = True
+        sock, self.socket = self.socket, None
+        self._reader = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def is_alive(self):
+        """Check, without a round trip to the server, whether an idle connection is still usable.
+
+        The server sends nothing unprompted except in closing the connection, so the socket of a
+        live idle connection must be open and have nothing waiting to be read.
+        """
+        sock = self.socket
+        if sock is None or self._disconnected or sock.fileno() == -1:
+            return False
+        if self._reader is not None and self._reader.buffered:
+            return False
+        if isinstance(sock, ssl.SSLSocket) and sock.pending():
+            return False
+        # A selector, unlike select.select, accepts descriptors beyond FD_SETSIZE.
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(sock, selectors.EVENT_READ)
+                readable = selector.select(0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
     def recvall(self, n):
         # Helper function to recv n bytes or return None if EOF is hit
-        data = b""
-        while len(data) < n:
-            packet = self.socket.recv(n - len(data))
-            if not packet:
-                return None
-            data += packet
-        return data
+        try:
+            return self._socket_reader().read(n)
+        except socket.error:
+            return None
 
     def init_sec_context(self):
         import gssapi
@@ -448,7 +583,7 @@ class Connection:
     def receive_gsi_token(self):
 
         # Receive client token from iRODS
-        data = self.socket.recv(4)
+        data = self.recvall(4)
         value = struct.unpack("I", bytearray(data))
         token_len = socket.ntohl(value[0])
         server_token = self.recvall(token_len)
@@ -644,26 +779,25 @@ class Connection:
         elif buffer is not None:
             size = min(size, len(buffer))
 
-        message_body = OpenedDataObjRequest(
-            l1descInx=desc,
-            len=size,
-            whence=0,
-            oprType=0,
-            offset=0,
-            bytesWritten=0,
-            KeyValPair_PI=StringStringMap(),
-        )
-        message = iRODSMessage(
-            "RODS_API_REQ", msg=message_body, int_info=api_number["DATA_OBJ_READ_AN"]
-        )
+        self.send_read_file(desc, size)
+        return self.recv_read_file(buffer)
+
+    # A read is split into sending the request and receiving the response, so that several
+    # requests may be kept in flight (see iRODSDataObjectFileRaw's read-ahead).  Responses
+    # arrive in the order the requests were sent.
 
+    def send_read_file(self, desc, size):
+        message = _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_READ_AN"](
+            l1descInx=desc, len=size, whence=0, offset=0
+        )
         logger.debug(desc)
         self.send(message)
+
+    def recv_read_file(self, buffer=None):
         if buffer is None:
             response = self.recv()
         else:
             response = self.recv_into(buffer)
-
         return response.bs
 
     def _login_native(self, password=None):
@@ -686,19 +820,7 @@ class Connection:
         # and https://github.com/irods/irods/blob/4.2.1/lib/core/src/clientLogin.cpp#L38-L60
         self._client_signature = "".join("{:02x}".format(c) for c in challenge[:16])
 
-        challenge = challenge.strip()
-        padded_pwd = struct.pack(
-            "%ds" % MAX_PASSWORD_LENGTH, password.encode("utf-8").strip()
-        )
-
-        m = hashlib.md5()
-        m.update(challenge)
-        m.update(padded_pwd)
-        encoded_pwd = m.digest()
-
-        if b"\x00" in encoded_pwd:
-            encoded_pwd_array = bytearray(encoded_pwd)
-            encoded_pwd = bytes(encoded_pwd_array.replace(b"\x00", b"\x01"))
+        encoded_pwd = _native_auth_digest(challenge.strip(), password)
 
         pwd_msg = AuthResponse(response=encoded_pwd, username=self.account.proxy_user)
         pwd_request = iRODSMessage(
@@ -711,37 +833,16 @@ class Connection:
         logger.info("Native authorization validated (in legacy auth).")
 
     def write_file(self, desc, string):
-        message_body = OpenedDataObjRequest(
-            l1descInx=desc,
-            len=len(string),
-            whence=0,
-            oprType=0,
-            offset=0,
-            bytesWritten=0,
-            KeyValPair_PI=StringStringMap(),
-        )
-        message = iRODSMessage(
-            "RODS_API_REQ",
-            msg=message_body,
-            bs=string,
-            int_info=api_number["DATA_OBJ_WRITE_AN"],
+        message = _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_WRITE_AN"](
+            bs=string, l1descInx=desc, len=len(string), whence=0, offset=0
         )
         self.send(message)
         response = self.recv()
         return response.int_info
 
     def seek_file(self, desc, offset, whence):
-        message_body = OpenedDataObjRequest(
-            l1descInx=desc,
-            len=0,
-            whence=whence,
-            oprType=0,
-            offset=offset,
-            bytesWritten=0,
-            KeyValPair_PI=StringStringMap(),
-        )
-        message = iRODSMessage(
-            "RODS_API_REQ", msg=message_body, int_info=api_number["DATA_OBJ_LSEEK_AN"]
+        message = _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_LSEEK_AN"](
+            l1descInx=desc, len=0, whence=whence, offset=offset
         )
 
         self.send(message)
@@ -750,18 +851,25 @@ class Connection:
         return offset
 
     def close_file(self, desc, **options):
-        message_body = OpenedDataObjRequest(
-            l1descInx=desc,
-            len=0,
-            whence=0,
-            oprType=0,
-            offset=0,
-            bytesWritten=0,
-            KeyValPair_PI=StringStringMap(options),
-        )
-        message = iRODSMessage(
-            "RODS_API_REQ", msg=message_body, int_info=api_number["DATA_OBJ_CLOSE_AN"]
-        )
+        if not options:
+            message = _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_CLOSE_AN"](
+                l1descInx=desc, len=0, whence=0, offset=0
+            )
+        else:
+            message_body = OpenedDataObjRequest(
+                l1descInx=desc,
+                len=0,
+                whence=0,
+                oprType=0,
+                offset=0,
+                bytesWritten=0,
+                KeyValPair_PI=StringStringMap(options),
+            )
+            message = iRODSMessage(
+                "RODS_API_REQ",
+                msg=message_body,
+                int_info=api_number["DATA_OBJ_CLOSE_AN"],
+            )
 
         self.send(message)
         self.recv()
@@ -1,2 +1,9 @@
 SYS_SVR_TO_CLI_COLL_STAT = 99999996
 SYS_CLI_TO_SVR_COLL_STAT_REPLY = 99999997
+
+# Limits of one bulk data object put (as by "iput -b"), and the special column indices of
+# the attribute array describing the files it carries.
+MAX_NUM_BULK_OPR_FILES = 50
+BULK_OPR_BUF_SIZE = 4 * 1024 * 1024
+COL_DATA_MODE = 421
+OFFSET_INX = 9999998
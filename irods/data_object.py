@@ -3,17 +3,25 @@ import sys
 import logging
 import os
 import ast
+import collections
+import threading
 
 from irods.models import DataObject
 from irods.meta import iRODSMetaCollection
 import irods.keywords as kw
 from irods.api_number import api_number
 from irods.message import JSON_Message, iRODSMessage
+import irods.exception as ex
+import irods.tracing as tracing
 
 logger = logging.getLogger(__name__)
 
 IRODS_SERVER_WITH_CLOSE_REPLICA_API = (4, 2, 9)
 
+DEFAULT_READ_AHEAD_BLOCK_SIZE = 1024**2
+
+DEFAULT_WRITE_BEHIND_BLOCK_SIZE = 1024**2
+
 
 def chunks(f, chunksize=io.DEFAULT_BUFFER_SIZE):
     return iter(lambda: f.read(chunksize), b"")
@@ -133,26 +141,209 @@ class iRODSDataObject:
         self.manager.replicate(self.path, resource=resource, **options)
 
 
+class _Write_behind:
+    """Sends the data written to an open data object from a background thread, so that the
+    writer need not wait on the server acknowledging each block.  At most max_bytes of
+    written data are held in memory; beyond that, write() blocks until blocks have been
+    sent.  An error in sending is raised by the next call to write() or drain(), and by
+    every call after it."""
+
+    def __init__(self, conn, desc, max_bytes):
+        self.conn = conn
+        self.desc = desc
+        self.max_bytes = max_bytes
+        self.block_size = max(1, min(DEFAULT_WRITE_BEHIND_BLOCK_SIZE, max_bytes // 2))
+        self._pending = bytearray()  # Not yet a full block, hence not yet queued.
+        self._blocks = collections.deque()
+        self._queued_bytes = 0  # Includes the block being sent.
+        self._error = None
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def _raise_error(self):
+        # The error stays set: nothing written after lost data may be sent.
+        if self._error is not None:
+            raise self._error
+
+    def _send_blocks(self):
+        while True:
+            with self._condition:
+                while not self._blocks and not self._stopping:
+                    self._condition.wait()
+                if not self._blocks:
+                    return
+                block = self._blocks[0]
+            try:
+                self.conn.write_file(self.desc, block)
+            except BaseException as e:
+                with self._condition:
+                    # The data queued behind a failed block must not be written out of order.
+                    self._error = e
+                    self._blocks.clear()
+                    self._queued_bytes = 0
+                    self._condition.notify_all()
+                continue
+            with self._condition:
+                if self._blocks and self._blocks[0] is block:
+                    self._blocks.popleft()
+                    self._queued_bytes -= len(block)
+                self._condition.notify_all()
+
+    def _enqueue(self, block):
+        with self._condition:
+            while (
+                self._queued_bytes
+                and self._queued_bytes + len(block) > self.max_bytes
+                and self._error is None
+            ):
+                self._condition.wait()
+            self._raise_error()
+            self._blocks.append(block)
+            self._queued_bytes += len(block)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._send_blocks, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def write(self, b):
+        with self._condition:
+            self._raise_error()
+        view = memoryview(b).cast("B")
+        nbytes = len(view)
+        while view:
+            room = self.block_size - len(self._pending)
+            self._pending += view[:room]
+            view = view[room:]
+            if len(self._pending) >= self.block_size:
+                block, self._pending = self._pending, bytearray()
+                self._enqueue(block)
+        return nbytes
+
+    def drain(self):
+        """Queue any partial block, and wait until all data written so far has been sent."""
+        if self._pending:
+            block, self._pending = self._pending, bytearray()
+            self._enqueue(block)
+        with self._condition:
+            while self._queued_bytes and self._error is None:
+                self._condition.wait()
+            self._raise_error()
+
+    def stop(self):
+        try:
+            self.drain()
+        finally:
+            with self._condition:
+                self._stopping = True
+                self._blocks.clear()
+                self._condition.notify_all()
+            if self._thread is not None:
+                self._thread.join()
+
+
 class iRODSDataObjectFileRaw(io.RawIOBase):
     """The raw object supporting file-like operations (read/write/seek) for the
     iRODSDataObject."""
 
     session = None  # codacy
-
-    def __init__(self, conn, descriptor, finalize_on_close=True, **options):
+    path = None  # The logical path, where known (for tracing).
+
+    def __init__(
+        self,
+        conn,
+        descriptor,
+        finalize_on_close=True,
+        read_ahead=0,
+        write_behind=0,
+        **options
+    ):
         """
         Constructor needs a connection and an iRODS data object descriptor. If the
         finalize_on_close flag evaluates False, close() will invoke the REPLICA_CLOSE
         API instead of closing and finalizing the object (useful for parallel
         transfers using multiple threads).
+
+        A positive read_ahead is the number of read requests to keep in flight on the
+        connection while the object is read sequentially.
+
+        A positive write_behind is the number of bytes of written data which may be held
+        in memory while being sent to the server from a background thread.
         """
         super(iRODSDataObjectFileRaw, self).__init__()
         self.conn = conn
         self.desc = descriptor
         self.options = options
         self.finalize_on_close = finalize_on_close
+        self.read_ahead = read_ahead
+        self._reads_in_flight = []  # sizes of the read requests sent but not yet answered
+        self._read_ahead_data = memoryview(b"")  # received, but not yet returned by readinto
+        self._read_ahead_eof = False
+        self._position = None  # tracked only with read-ahead or write-behind, so tell() needn't wait on them
+        self._write_behind = (
+            _Write_behind(conn, descriptor, write_behind) if write_behind > 0 else None
+        )
+
+    def _drain_write_behind(self):
+        if self._write_behind is not None:
+            self._write_behind.drain()
+
+    def _cancel_read_ahead(self, restore_position=True):
+        """Receive and discard the responses to any read requests in flight, returning the
+        number of bytes read from the server but not yet returned by readinto().  Unless
+        restore_position is False, the server's offset is moved back by that amount."""
+        unconsumed = len(self._read_ahead_data)
+        self._read_ahead_data = memoryview(b"")
+        error = None
+        while self._reads_in_flight:
+            self._reads_in_flight.pop(0)
+            try:
+                unconsumed += len(self.conn.recv_read_file() or b"")
+            except ex.NetworkException:
+                del self._reads_in_flight[:]
+                raise
+            except ex.iRODSException as e:
+                error = error or e
+        if error is not None:
+            raise error
+        if unconsumed and restore_position:
+            self.conn.seek_file(self.desc, -unconsumed, os.SEEK_CUR)
+        return unconsumed
+
+    def _readinto_ahead(self, b):
+        if not self._read_ahead_data:
+            block_size = max(len(b), DEFAULT_READ_AHEAD_BLOCK_SIZE)
+            while len(self._reads_in_flight) < self.read_ahead:
+                self.conn.send_read_file(self.desc, block_size)
+                self._reads_in_flight.append(block_size)
+            size = self._reads_in_flight.pop(0)
+            try:
+                if size <= len(b):
+                    # The response cannot overrun b, so it is received there directly.
+                    nbytes = len(self.conn.recv_read_file(buffer=b) or b"")
+                else:
+                    self._read_ahead_data = memoryview(
+                        self.conn.recv_read_file() or b""
+                    )
+                    nbytes = None
+            except BaseException:
+                self._cancel_read_ahead(restore_position=False)
+                raise
+            if nbytes == 0 or (nbytes is None and not self._read_ahead_data):
+                # At the end of the object, the requests still in flight can only return nothing.
+                self._read_ahead_eof = True
+                self._cancel_read_ahead(restore_position=False)
+                return 0
+            if nbytes is not None:
+                return nbytes
+        nbytes = min(len(b), len(self._read_ahead_data))
+        b[:nbytes] = self._read_ahead_data[:nbytes]
+        self._read_ahead_data = self._read_ahead_data[nbytes:]
+        return nbytes
 
     def replica_access_info(self):
+        self._drain_write_behind()
+        self._cancel_read_ahead()
         message_body = JSON_Message(
             {"fd": self.desc}, server_version=self.conn.server_version
         )
@@ -211,27 +402,98 @@ class iRODSDataObjectFileRaw(io.RawIOBase):
             raise
         return True
 
+    def _abandon(self):
+        """Mark the handle closed without involving its connection, which is no longer usable
+        (as in a forked child, where the connection belongs to the parent process)."""
+        self._write_behind = None
+        self._reads_in_flight = []
+        self._read_ahead_data = memoryview(b"")
+        io.RawIOBase.close(self)
+
+    def flush(self):
+        super(iRODSDataObjectFileRaw, self).flush()
+        self._drain_write_behind()
+
     def close(self):
+        with tracing.span(
+            "irods.data_object.close",
+            {"irods.path": self.path, "irods.api": "DATA_OBJ_CLOSE_AN"},
+        ):
+            self._close()
+
+    def _close(self):
+        write_error = None
+        if self._write_behind is not None:
+            try:
+                self._write_behind.stop()
+            except ex.NetworkException:
+                raise
+            except Exception as e:
+                # The object is still closed, the error being raised afterward.
+                write_error = e
+            self._write_behind = None
+        try:
+            self._cancel_read_ahead(restore_position=False)
+        except ex.iRODSException as e:
+            if isinstance(e, ex.NetworkException):
+                raise
+            logger.debug("Ignoring error in discarded read-ahead: %r", e)
         if self.finalize_on_close or not self._close_replica():
             self.conn.close_file(self.desc, **self.options)
         self.conn.release()
         super(iRODSDataObjectFileRaw, self).close()
+        if write_error is not None:
+            raise write_error
         return None
 
     def seek(self, offset, whence=0):
-        return self.conn.seek_file(self.desc, offset, whence)
+        if (offset, whence) == (0, os.SEEK_CUR) and self._position is not None:
+            return self._position
+        self._drain_write_behind()
+        unconsumed = self._cancel_read_ahead(restore_position=False)
+        if whence == os.SEEK_CUR:
+            offset -= unconsumed
+        self._read_ahead_eof = False
+        position = self.conn.seek_file(self.desc, offset, whence)
+        if self.read_ahead > 0 or self._write_behind is not None:
+            self._position = position
+        return position
 
     def readinto(self, b):
+        with tracing.span(
+            "irods.data_object.read",
+            {"irods.path": self.path, "irods.api": "DATA_OBJ_READ_AN"},
+        ) as span:
+            nbytes = self._readinto(b)
+            span.set_attribute("irods.bytes", nbytes)
+        return nbytes
+
+    def _readinto(self, b):
+        self._drain_write_behind()
+        if self.read_ahead > 0 and not self._read_ahead_eof and len(b):
+            nbytes = self._readinto_ahead(b)
+            if self._position is not None:
+                self._position += nbytes
+            return nbytes
         contents = self.conn.read_file(self.desc, buffer=b)
         if contents is None:
             return 0
 
+        if self._position is not None:
+            self._position += len(contents)
         return len(contents)
 
     def write(self, b):
+        # The buffer, including a memoryview, is passed through uncopied to be sent as the request's bs part.
         if isinstance(b, memoryview):
-            return self.conn.write_file(self.desc, b.tobytes())
-
+            b = b.cast("B")
+        self._cancel_read_ahead()
+        if self._write_behind is not None:
+            nbytes = self._write_behind.write(b)
+            if self._position is not None:
+                self._position += nbytes
+            return nbytes
+        self._position = None
         return self.conn.write_file(self.desc, b)
 
     def readable(self):
@@ -57,6 +57,10 @@ class OperationNotSupported(PycommandsException):
     pass
 
 
+class ConnectionPoolTimeout(PycommandsException):
+    pass
+
+
 class QueryException(PycommandsException):
     pass
 
@@ -35,6 +35,11 @@ class CollectionManager(Manager):
 
     def create(self, path, recurse=True, **options):
         path = iRODSCollection.normalize_path(path)
+        self._create(path, recurse, **options)
+        return self.get(path)
+
+    def _create(self, path, recurse=True, **options):
+        """Send the request to create a collection, without then fetching it from the catalog."""
         if recurse:
             options[kw.RECURSIVE_OPR__KW] = ""
 
@@ -46,8 +51,7 @@ class CollectionManager(Manager):
         )
         with self.sess.pool.get_connection() as conn:
             conn.send(message)
-            response = conn.recv()
-        return self.get(path)
+            conn.recv()
 
     def remove(self, path, recurse=True, force=False, **options):
         if recurse:
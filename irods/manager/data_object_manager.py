@@ -1,11 +1,23 @@
 import ast
+import base64
 import collections
+import concurrent.futures
+import fnmatch
+import hashlib
 import io
 import json
 import logging
 import os
 import weakref
 from typing import Any, List, Type
+from irods import MAX_NAME_LEN
+from irods.column import Like
+from irods.constants import (
+    BULK_OPR_BUF_SIZE,
+    COL_DATA_MODE,
+    MAX_NUM_BULK_OPR_FILES,
+    OFFSET_INX,
+)
 from irods.models import DataObject, Collection
 from irods.manager import Manager
 from irods.manager._internal import _api_impl, _logical_path
@@ -19,6 +31,9 @@ from irods.message import (
     DataObjChksumRequest,
     DataObjChksumResponse,
     RErrorStack,
+    BulkOprRequest,
+    GenQueryResponse,
+    GenQueryResponseColumn,
     STR_PI,
 )
 import irods.exception as ex
@@ -34,6 +49,7 @@ from irods.data_object import (
 import irods.client_configuration as client_config
 import irods.keywords as kw
 import irods.parallel as parallel
+import irods.tracing as tracing
 from irods.parallel import deferred_call
 
 
@@ -123,7 +139,16 @@ def call___del__if_exists(super_):
         next_finalizer_in_MRO()
 
 
-class ManagedBufferedRandom(io.BufferedRandom):
+class FlushingBufferedRandom(io.BufferedRandom):
+    """A BufferedRandom whose flush() also flushes the raw object, which waits there for any
+    data still being sent by write-behind (see the write_behind parameter of open())."""
+
+    def flush(self):
+        super(FlushingBufferedRandom, self).flush()
+        self.raw.flush()
+
+
+class ManagedBufferedRandom(FlushingBufferedRandom):
 
     def __init__(self, *a, **kwd):
         # Help ensure proper teardown sequence by storing a reference to the session,
@@ -150,9 +175,66 @@ DEFAULT_NUMBER_OF_THREADS = (
 
 DEFAULT_QUEUE_DEPTH = 32
 
+DEFAULT_NUMBER_OF_TREE_WORKERS = 4
+
+TreeTransferFailure = collections.namedtuple(
+    "TreeTransferFailure", ("local_path", "logical_path", "exception")
+)
+TreeTransferFailure.__doc__ = """A file or data object that could not be transferred as part of a tree,
+with the exception raised in the attempt."""
+
 logger = logging.getLogger(__name__)
 
 
+SyncAction = collections.namedtuple(
+    "SyncAction", ("operation", "local_path", "logical_path", "reason")
+)
+SyncAction.__doc__ = """One action planned by DataObjectManager.sync: the `operation' is one of "put",
+"get", "unlink" (a data object), "remove" (a local file), "create_collection", or
+"create_directory", and the `reason' one of "missing", "size", "checksum", "newer", or
+"extraneous"."""
+
+
+def _tree_filter(relative_path, include=(), exclude=()):
+    """Tell whether a path within a tree passes the include and exclude patterns."""
+    if include and not any(fnmatch.fnmatchcase(relative_path, p) for p in include):
+        return False
+    return not any(fnmatch.fnmatchcase(relative_path, p) for p in exclude)
+
+
+def _path_beneath(coll_path, *names):
+    """Join the `names' onto the collection path `coll_path', which may be the root "/"."""
+    return "/".join([coll_path.rstrip("/")] + list(names)) if names else coll_path
+
+
+def _check_checksum_scheme(scheme):
+    if scheme not in ("sha2", "md5"):
+        raise ValueError("Unknown checksum scheme {!r}; expected 'sha2' or 'md5'.".format(scheme))
+
+
+def _checksum_hasher(like):
+    """Return a hasher for checksums in the format of `like', a catalog checksum or the name of
+    a checksum scheme: SHA-256 if it starts with "sha2", else MD5."""
+    return hashlib.sha256() if like.startswith("sha2") else hashlib.md5()
+
+
+def _checksum_string(hasher):
+    """Format a hasher's digest as the catalog does: for SHA-256 in base64 after "sha2:", and
+    for MD5 in hexadecimal."""
+    if hasher.name == "sha256":
+        return "sha2:" + base64.b64encode(hasher.digest()).decode("ascii")
+    return hasher.hexdigest()
+
+
+def _file_checksum(local_path, like):
+    """Compute a local file's checksum in the format of the catalog's checksum `like'."""
+    hasher = _checksum_hasher(like)
+    with open(local_path, "rb") as f:
+        for chunk in chunks(f, DataObjectManager.READ_BUFFER_SIZE):
+            hasher.update(chunk)
+    return _checksum_string(hasher)
+
+
 class Server_Checksum_Warning(Exception):
     """Error from iRODS server indicating some replica checksums are missing or incorrect."""
 
@@ -346,6 +428,17 @@ class DataObjectManager(Manager):
                 raise ex.OVERWRITE_WITHOUT_FORCE_FLAG
         options.pop(kw.FORCE_FLAG_KW, None)
 
+        self._upload(local_path, obj, num_threads, updatables, options)
+
+        if return_data_object:
+            return self.get(obj)
+
+    def _upload(self, local_path, obj, num_threads, updatables, options):
+        """Transfer the contents of a local file to a data object, replicating it afterward if
+        ALL_KW is among the `options'.
+
+        Called from put() and put_tree(), once the data object's path has been settled.
+        """
         with open(local_path, "rb") as f:
             sizelist = []
             if self.should_parallelize_transfer(
@@ -381,8 +474,693 @@ class DataObjectManager(Manager):
             del repl_options[kw.REG_CHKSUM_KW]
             self.replicate(obj, **repl_options)
 
-        if return_data_object:
-            return self.get(obj)
+    def put_tree(
+        self,
+        local_dir,
+        coll_path,
+        num_workers=DEFAULT_NUMBER_OF_TREE_WORKERS,
+        num_threads=DEFAULT_NUMBER_OF_THREADS,
+        updatables=(),
+        bulk=False,
+        checksum_scheme="sha2",
+        **options
+    ):
+        """Upload the files under the local directory `local_dir' into the collection `coll_path',
+        in the manner of "iput -r".  A list of TreeTransferFailure, empty if all went well, is
+        returned for the files that could not be uploaded; the others are still transferred.
+
+        The collections mirroring the local directories are created first, those at each level
+        of the tree being requested concurrently; one that cannot be created is reported among
+        the failures, and nothing beneath it is uploaded.  The files are then uploaded by a
+        pool of `num_workers' threads, largest first, each thread holding one connection of the
+        session's pool.  A file larger than MAXIMUM_SINGLE_THREADED_TRANSFER_SIZE is sent by
+        parallel_put with up to `num_threads' connections of its own.  The `updatables' are
+        given the byte counts of all files, as they are sent.
+
+        With bulk=True, the files of each directory no larger than BULK_OPR_BUF_SIZE are instead
+        sent together in bulk requests, as by bulk_put, any checksums of theirs being computed
+        with the `checksum_scheme'.
+
+        As with put, an existing data object is overwritten only if the force flag is in effect;
+        in place of put's checks for each file, those beneath `coll_path' are listed up front.
+        """
+        if not os.path.isdir(local_dir):
+            raise NotADirectoryError(local_dir)
+        _check_checksum_scheme(checksum_scheme)
+        self._resolve_force_put_option(
+            options, default_setting=client_config.data_objects.force_put_by_default
+        )
+        force = options.pop(kw.FORCE_FLAG_KW, None) is not None
+        options.pop(kw.DATA_SIZE_KW, None)
+        coll_path = iRODSCollection.normalize_path(coll_path)
+
+        failures = []
+        levels = collections.defaultdict(list)
+        files = []
+        for directory, _, names in os.walk(
+            local_dir,
+            onerror=lambda e: failures.append(TreeTransferFailure(e.filename, None, e)),
+        ):
+            relative = os.path.relpath(directory, local_dir)
+            parts = [] if relative == os.curdir else relative.split(os.sep)
+            logical_dir = _path_beneath(coll_path, *parts)
+            levels[len(parts)].append((directory, logical_dir))
+            for name in names:
+                local_path = os.path.join(directory, name)
+                logical_path = _path_beneath(logical_dir, name)
+                try:
+                    size = os.path.getsize(local_path)
+                except OSError as e:
+                    failures.append(TreeTransferFailure(local_path, logical_path, e))
+                    continue
+                files.append((size, local_path, logical_path))
+        files.sort(key=lambda f: f[0], reverse=True)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as pool:
+            missing, created_failures = self._create_collections(pool, levels)
+            failures += created_failures
+            files = [f for f in files if f[2].rpartition("/")[0] not in missing]
+
+            existing = set()
+            if not force:
+                existing.update(
+                    _path_beneath(row[Collection.name], row[DataObject.name])
+                    for row in self._query_tree(coll_path, DataObject.name)
+                )
+
+            futures = self._submit_puts(
+                pool,
+                files,
+                force,
+                existing,
+                num_threads,
+                updatables,
+                options,
+                bulk_limits=(
+                    (MAX_NUM_BULK_OPR_FILES, BULK_OPR_BUF_SIZE) if bulk else None
+                ),
+                checksum_scheme=checksum_scheme,
+            )
+            failures += self._tree_transfer_failures(futures, "Upload")
+        return failures
+
+    def bulk_put(
+        self,
+        local_paths,
+        coll_path,
+        max_files=MAX_NUM_BULK_OPR_FILES,
+        max_bytes=BULK_OPR_BUF_SIZE,
+        num_workers=DEFAULT_NUMBER_OF_TREE_WORKERS,
+        updatables=(),
+        checksum_scheme="sha2",
+        **options
+    ):
+        """Upload the local files named in `local_paths' into the existing collection
+        `coll_path', in the manner of "iput -b".  Instead of each data object being opened,
+        written, and closed in turn, the files are packed into bulk requests of at most
+        `max_files' files and `max_bytes' bytes, each of which the server unpacks and registers
+        as a whole.  A file larger than `max_bytes' is sent on its own, as by put.
+
+        The requests are made by a pool of `num_workers' threads, each holding the contents of
+        one request in memory.  A list of TreeTransferFailure is returned, as for put_tree; when
+        a bulk request fails, every file in it is listed.  As with put, an existing data object is
+        overwritten only if the force flag is in effect.  If REG_CHKSUM_KW or VERIFY_CHKSUM_KW is
+        among the `options', a checksum computed locally is sent with each small file.  It is
+        computed with the `checksum_scheme', "sha2" (SHA-256) or "md5", which should be the
+        server's default hash scheme; the server does not otherwise checksum files sent in bulk.
+        """
+        _check_checksum_scheme(checksum_scheme)
+        self._resolve_force_put_option(
+            options, default_setting=client_config.data_objects.force_put_by_default
+        )
+        force = options.pop(kw.FORCE_FLAG_KW, None) is not None
+        coll_path = iRODSCollection.normalize_path(coll_path)
+
+        failures = []
+        files = []
+        for local_path in local_paths:
+            try:
+                size = os.path.getsize(local_path)
+            except OSError as e:
+                failures.append(TreeTransferFailure(local_path, None, e))
+                continue
+            files.append(
+                (
+                    size,
+                    local_path,
+                    _path_beneath(coll_path, os.path.basename(local_path)),
+                )
+            )
+
+        existing = set()
+        if not force:
+            query = self.sess.query(DataObject.name).filter(
+                Collection.name == coll_path
+            )
+            existing.update(
+                _path_beneath(coll_path, row[DataObject.name]) for row in query
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as pool:
+            futures = self._submit_puts(
+                pool,
+                files,
+                force,
+                existing,
+                DEFAULT_NUMBER_OF_THREADS,
+                updatables,
+                options,
+                bulk_limits=(max_files, max_bytes),
+                checksum_scheme=checksum_scheme,
+            )
+            failures += self._tree_transfer_failures(futures, "Upload")
+        return failures
+
+    def _submit_puts(
+        self,
+        pool,
+        files,
+        force,
+        existing,
+        num_threads,
+        updatables,
+        options,
+        bulk_limits=None,
+        checksum_scheme="sha2",
+    ):
+        """Submit to the `pool' the uploads of the `files', given as tuples of size, local path,
+        and logical path, returning the futures as needed by _tree_transfer_failures.  Unless
+        `force' is true, uploads to the `existing' logical paths fail.  If `bulk_limits' are
+        given as a maximum number of files and of bytes, the files within those limits are sent
+        by bulk requests, one for each batch of those bound for the same collection, with any
+        checksums computed in the `checksum_scheme'.
+        """
+        bulk_options = {**options, kw.FORCE_FLAG_KW: ""} if force else options
+
+        def upload(local_path, logical_path):
+            if logical_path in existing:
+                raise ex.OVERWRITE_WITHOUT_FORCE_FLAG
+            self._upload(
+                local_path, logical_path, num_threads, updatables, dict(options)
+            )
+
+        futures = {}
+        by_collection = collections.defaultdict(list)
+        for size, local_path, logical_path in sorted(files, reverse=True):
+            if bulk_limits and size <= bulk_limits[1] and logical_path not in existing:
+                by_collection[irods_dirname(logical_path)].append(
+                    (size, local_path, logical_path)
+                )
+                continue
+            future = pool.submit(upload, local_path, logical_path)
+            futures[future] = [(local_path, logical_path)]
+
+        max_files, max_bytes = bulk_limits or (0, 0)
+        for coll_path, entries in by_collection.items():
+            batch, batch_bytes = [], 0
+            for entry in entries + [None]:
+                if batch and (
+                    entry is None
+                    or len(batch) == max_files
+                    or batch_bytes + entry[0] > max_bytes
+                ):
+                    future = pool.submit(
+                        self._bulk_put_request,
+                        coll_path,
+                        batch,
+                        updatables,
+                        bulk_options,
+                        checksum_scheme,
+                    )
+                    futures[future] = [(e[1], e[2]) for e in batch]
+                    batch, batch_bytes = [], 0
+                if entry is not None:
+                    batch.append(entry)
+                    batch_bytes += entry[0]
+        return futures
+
+    def _bulk_put_request(
+        self, coll_path, batch, updatables, options, checksum_scheme="sha2"
+    ):
+        """Send the files of the `batch' (tuples of size, local path, and logical path) to the
+        collection `coll_path' in one BULK_DATA_OBJ_PUT_AN request.
+
+        The data are the files' contents laid end to end, the attribute array giving for each
+        file the data object's path, the file's mode, the offset at which its contents end, and
+        (if checksums are to be registered or verified) its checksum in the `checksum_scheme'.
+
+        The files are all read first; those which cannot be are left out of the request, and
+        returned as a list of TreeTransferFailure.
+        """
+        failures = []
+        readable = []
+        for _, local_path, logical_path in batch:
+            try:
+                with open(local_path, "rb") as f:
+                    readable.append(
+                        (logical_path, f.read(), os.fstat(f.fileno()).st_mode)
+                    )
+            except OSError as e:
+                failures.append(TreeTransferFailure(local_path, logical_path, e))
+        if not readable:
+            return failures
+
+        with_checksums = kw.REG_CHKSUM_KW in options or kw.VERIFY_CHKSUM_KW in options
+        data = bytearray()
+        columns = collections.OrderedDict(
+            [(DataObject.name.icat_id, []), (COL_DATA_MODE, []), (OFFSET_INX, [])]
+        )
+        if with_checksums:
+            columns[DataObject.checksum.icat_id] = []
+        for logical_path, contents, mode in readable:
+            data += contents
+            columns[DataObject.name.icat_id].append(logical_path)
+            columns[COL_DATA_MODE].append(str(mode))
+            columns[OFFSET_INX].append(str(len(data)))
+            if with_checksums:
+                hasher = _checksum_hasher(checksum_scheme)
+                hasher.update(contents)
+                columns[DataObject.checksum.icat_id].append(_checksum_string(hasher))
+
+        message_body = BulkOprRequest(
+            objPath=coll_path,
+            GenQueryOut_PI=GenQueryResponse(
+                rowCnt=len(readable),
+                attriCnt=len(columns),
+                continueInx=0,
+                totalRowCount=len(readable),
+                SqlResult_PI=[
+                    GenQueryResponseColumn(
+                        attriInx=index, reslen=MAX_NAME_LEN, value=values
+                    )
+                    for index, values in columns.items()
+                ],
+            ),
+            KeyValPair_PI=StringStringMap(options),
+        )
+        message = iRODSMessage(
+            "RODS_API_REQ",
+            msg=message_body,
+            bs=data,
+            int_info=api_number["BULK_DATA_OBJ_PUT_AN"],
+        )
+        with self.sess.pool.get_connection() as conn:
+            conn.send(message)
+            conn.recv()
+        do_progress_updates(updatables, len(data))
+        return failures
+
+    def get_tree(
+        self,
+        coll_path,
+        local_dir,
+        num_workers=DEFAULT_NUMBER_OF_TREE_WORKERS,
+        num_threads=DEFAULT_NUMBER_OF_THREADS,
+        updatables=(),
+        include=(),
+        exclude=(),
+        **options
+    ):
+        """Download the data objects in the collection `coll_path' and all collections beneath it
+        into the local directory `local_dir', in the manner of "iget -r".  As for put_tree, a list
+        of TreeTransferFailure is returned for the data objects that could not be downloaded.
+
+        The tree is listed by two queries for the collections and two for the data objects,
+        rather than by queries for each collection, and the local directories are all created
+        before any download starts.  The data objects are then fetched by a pool of
+        `num_workers' threads, largest first, each thread holding one connection of the
+        session's pool and at most READ_BUFFER_SIZE bytes of data at a time.  A data object
+        larger than MAXIMUM_SINGLE_THREADED_TRANSFER_SIZE is fetched by parallel_get with up to
+        `num_threads' connections of its own.
+
+        If `include' is given, only the data objects whose paths relative to `coll_path' match
+        one of its glob-style patterns (as for fnmatch, where '*' also matches '/') are
+        downloaded; of those, any matching a pattern in `exclude' are skipped.  As with get,
+        existing local files are overwritten only if the force flag is given in `options'.
+        """
+        coll_path = iRODSCollection.normalize_path(coll_path)
+
+        def relative_parts(logical_dir):
+            return (
+                logical_dir[len(_path_beneath(coll_path, "")) :].split("/")
+                if logical_dir != coll_path
+                else []
+            )
+
+        directories = [row[Collection.name] for row in self._query_tree(coll_path)]
+        if coll_path not in directories:
+            raise ex.CollectionDoesNotExist(coll_path)
+
+        objects = {}
+        for row in self._query_tree(coll_path, DataObject.name, DataObject.size):
+            parts = relative_parts(row[Collection.name]) + [row[DataObject.name]]
+            if not _tree_filter("/".join(parts), include, exclude):
+                continue
+            logical_path = _path_beneath(row[Collection.name], row[DataObject.name])
+            # Each replica has a row; the largest size is kept for scheduling.
+            size = max(int(row[DataObject.size]), objects.get(logical_path, (0,))[0])
+            objects[logical_path] = (size, os.path.join(local_dir, *parts))
+
+        for logical_dir in directories:
+            os.makedirs(
+                os.path.join(local_dir, *relative_parts(logical_dir)), exist_ok=True
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as pool:
+            futures = {
+                pool.submit(
+                    self._download,
+                    logical_path,
+                    local_path,
+                    num_threads,
+                    updatables,
+                    **options
+                ): [(local_path, logical_path)]
+                for logical_path, (_, local_path) in sorted(
+                    objects.items(), key=lambda item: item[1][0], reverse=True
+                )
+            }
+            return self._tree_transfer_failures(futures, "Download")
+
+    def sync(
+        self,
+        local_dir,
+        coll_path,
+        direction="put",
+        delete=False,
+        checksum=False,
+        dry_run=False,
+        plan=None,
+        num_workers=DEFAULT_NUMBER_OF_TREE_WORKERS,
+        num_threads=DEFAULT_NUMBER_OF_THREADS,
+        updatables=(),
+        include=(),
+        exclude=(),
+        **options
+    ):
+        """Bring the collection `coll_path' up to date with the local directory `local_dir' (if
+        `direction' is "put") or the directory up to date with the collection (if "get"), in the
+        manner of "irsync -r", transferring only what differs.  As for put_tree and get_tree, a
+        list of TreeTransferFailure is returned for the actions that failed.
+
+        The collection tree is listed in bulk, as by get_tree, with the size, modification time,
+        and checksum of each data object, and compared with the local files' sizes and
+        modification times.  A file or data object is transferred if it is missing from the
+        destination, if the sizes differ, or if the source was modified later than the
+        destination.  Downloaded files are given the modification times of the data objects,
+        so that they compare as current thereafter.  With checksum=True, a file whose size
+        matches a data object having a checksum in the catalog is instead compared by the
+        checksum, computed locally with the same algorithm.  With delete=True, the files or data
+        objects in the destination that are not in the source are deleted (data objects being
+        moved to the trash, as by unlink).  The `include' and `exclude' patterns, as for get_tree,
+        restrict the comparison, including what may be deleted.
+
+        The actions decided on are SyncAction tuples, appended to `plan' if it is a list; with
+        dry_run=True, nothing further is done.  Otherwise the collections or directories needed
+        are created, and the actions carried out by a pool of `num_workers' threads, large data
+        transfers using the parallel machinery as for put_tree and get_tree.  As for put_tree, a
+        collection that cannot be created is reported, and nothing beneath it is attempted.
+        """
+        if direction not in ("put", "get"):
+            raise ValueError(
+                "direction must be 'put' or 'get', not {!r}".format(direction)
+            )
+        if direction == "put" and not os.path.isdir(local_dir):
+            raise NotADirectoryError(local_dir)
+        coll_path = iRODSCollection.normalize_path(coll_path)
+        options.pop(kw.FORCE_FLAG_KW, None)
+        options.pop(kw.DATA_SIZE_KW, None)
+
+        def relative_parts(logical_dir):
+            return (
+                logical_dir[len(_path_beneath(coll_path, "")) :].split("/")
+                if logical_dir != coll_path
+                else []
+            )
+
+        failures = []
+        local_dirs = {}
+        local_files = {}
+        for directory, _, names in os.walk(
+            local_dir,
+            onerror=lambda e: failures.append(TreeTransferFailure(e.filename, None, e)),
+        ):
+            relative = os.path.relpath(directory, local_dir)
+            parts = [] if relative == os.curdir else relative.split(os.sep)
+            local_dirs["/".join(parts)] = directory
+            for name in names:
+                key = "/".join(parts + [name])
+                if not _tree_filter(key, include, exclude):
+                    continue
+                local_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(local_path)
+                except OSError as e:
+                    failures.append(TreeTransferFailure(local_path, None, e))
+                    continue
+                local_files[key] = (local_path, stat.st_size, int(stat.st_mtime))
+
+        remote_dirs = {
+            "/".join(relative_parts(row[Collection.name])): row[Collection.name]
+            for row in self._query_tree(coll_path)
+        }
+        if direction == "get" and "" not in remote_dirs:
+            raise ex.CollectionDoesNotExist(coll_path)
+        remote_files = {}
+        for row in self._query_tree(
+            coll_path,
+            DataObject.name,
+            DataObject.size,
+            DataObject.modify_time,
+            DataObject.checksum,
+        ):
+            key = "/".join(
+                relative_parts(row[Collection.name]) + [row[DataObject.name]]
+            )
+            if not _tree_filter(key, include, exclude):
+                continue
+            entry = (
+                _path_beneath(row[Collection.name], row[DataObject.name]),
+                int(row[DataObject.size]),
+                int(row[DataObject.modify_time].timestamp()),
+                row[DataObject.checksum] or "",
+            )
+            # Of the rows for several replicas, the latest modified is compared.
+            if key not in remote_files or entry[2] > remote_files[key][2]:
+                remote_files[key] = entry
+
+        def logical_path_of(key):
+            return _path_beneath(coll_path, *key.split("/")) if key else coll_path
+
+        def local_path_of(key):
+            return os.path.join(local_dir, *key.split("/")) if key else local_dir
+
+        def transfer_reason(key):
+            local_file = local_files.get(key)
+            remote_file = remote_files.get(key)
+            source, destination = (
+                (local_file, remote_file)
+                if direction == "put"
+                else (remote_file, local_file)
+            )
+            if destination is None:
+                return "missing"
+            if source[1] != destination[1]:
+                return "size"
+            if checksum and remote_file[3]:
+                try:
+                    local_checksum = _file_checksum(local_file[0], remote_file[3])
+                except OSError as e:
+                    failures.append(
+                        TreeTransferFailure(local_file[0], remote_file[0], e)
+                    )
+                    return None
+                return "checksum" if local_checksum != remote_file[3] else None
+            return "newer" if source[2] > destination[2] else None
+
+        actions = []
+        if direction == "put":
+            sources, destinations = local_files, remote_files
+            actions += [
+                SyncAction(
+                    "create_collection",
+                    local_dirs[key],
+                    logical_path_of(key),
+                    "missing",
+                )
+                for key in sorted(set(local_dirs) - set(remote_dirs))
+            ]
+        else:
+            sources, destinations = remote_files, local_files
+            actions += [
+                SyncAction(
+                    "create_directory", local_path_of(key), remote_dirs[key], "missing"
+                )
+                for key in sorted(set(remote_dirs) - set(local_dirs))
+            ]
+        for key in sorted(sources):
+            reason = transfer_reason(key)
+            if reason:
+                actions.append(
+                    SyncAction(
+                        direction,
+                        (
+                            local_files[key][0]
+                            if key in local_files
+                            else local_path_of(key)
+                        ),
+                        (
+                            remote_files[key][0]
+                            if key in remote_files
+                            else logical_path_of(key)
+                        ),
+                        reason,
+                    )
+                )
+        if delete:
+            actions += [
+                SyncAction(
+                    "unlink" if direction == "put" else "remove",
+                    local_files[key][0] if key in local_files else None,
+                    remote_files[key][0] if key in remote_files else None,
+                    "extraneous",
+                )
+                for key in sorted(set(destinations) - set(sources))
+            ]
+
+        if isinstance(plan, list):
+            plan.extend(actions)
+        if dry_run:
+            return failures
+
+        by_operation = collections.defaultdict(list)
+        for action in actions:
+            by_operation[action.operation].append(action)
+
+        for action in by_operation["create_directory"]:
+            os.makedirs(action.local_path, exist_ok=True)
+
+        remote_times = {entry[0]: entry[2] for entry in remote_files.values()}
+
+        def get(local_path, logical_path):
+            self._download(
+                logical_path,
+                local_path,
+                num_threads,
+                updatables,
+                **{**options, kw.FORCE_FLAG_KW: ""}
+            )
+            os.utime(local_path, (remote_times[logical_path],) * 2)
+
+        operations = {
+            "put": lambda local_path, logical_path: self._upload(
+                local_path, logical_path, num_threads, updatables, dict(options)
+            ),
+            "get": get,
+            "unlink": lambda local_path, logical_path: self.unlink(logical_path),
+            "remove": lambda local_path, logical_path: os.remove(local_path),
+        }
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as pool:
+            levels = collections.defaultdict(list)
+            for action in by_operation["create_collection"]:
+                levels[action.logical_path.count("/")].append(
+                    (action.local_path, action.logical_path)
+                )
+            missing, created_failures = self._create_collections(pool, levels)
+            failures += created_failures
+
+            # The transfers are made largest first, and the deletions last.
+            sizes = {entry[0]: entry[1] for entry in sources.values()}
+            transfers = sorted(
+                (
+                    a
+                    for a in actions
+                    if a.operation in operations
+                    and not (
+                        a.operation == "put"
+                        and a.logical_path.rpartition("/")[0] in missing
+                    )
+                ),
+                key=lambda a: -sizes.get(
+                    a.local_path if direction == "put" else a.logical_path, -1
+                ),
+            )
+            futures = {
+                pool.submit(
+                    operations[action.operation], action.local_path, action.logical_path
+                ): [(action.local_path, action.logical_path)]
+                for action in transfers
+            }
+            failures += self._tree_transfer_failures(futures, "Synchronization")
+        return failures
+
+    def _query_tree(self, coll_path, *columns):
+        """Yield the rows of a query for the collection name and the given `columns', over the
+        collection `coll_path' and every collection beneath it."""
+        prefix = _path_beneath(coll_path, "")
+        for condition in (
+            Collection.name == coll_path,
+            Like(Collection.name, prefix + "%"),
+        ):
+            for row in self.sess.query(Collection.name, *columns).filter(condition):
+                # The pattern's wildcards can match characters of `coll_path' itself.
+                name = row[Collection.name]
+                if name == coll_path or name.startswith(prefix):
+                    yield row
+
+    def _create_collections(self, pool, levels):
+        """Create the collections given, as pairs of local directory and logical path, by depth
+        in the dict `levels', those at each depth concurrently through the executor `pool'.
+
+        A collection that cannot be created is logged and reported by a TreeTransferFailure,
+        and those beneath it are not attempted.  Returns the set of the logical paths of all
+        collections not created, along with the list of failures.
+        """
+        missing = set()
+        failures = []
+        for depth in sorted(levels):
+            futures = {}
+            for local_dir, logical_dir in levels[depth]:
+                if logical_dir.rpartition("/")[0] in missing:
+                    missing.add(logical_dir)
+                    continue
+                # A level's parent collections exist by now, but recursion lets the
+                # request succeed for a collection already present.
+                future = pool.submit(self.sess.collections._create, logical_dir)
+                futures[future] = [(local_dir, logical_dir)]
+            for failure in self._tree_transfer_failures(futures, "Collection creation"):
+                missing.add(failure.logical_path)
+                failures.append(failure)
+        return missing, failures
+
+    @staticmethod
+    def _tree_transfer_failures(futures, description):
+        """Wait on the `futures' (a dict giving the pairs of local and logical paths transferred
+        by each), returning a TreeTransferFailure for each pair of those that raised an exception.
+        A future which succeeds may itself return a list of TreeTransferFailure, for files it
+        left out; these are included.
+        """
+        failures = []
+        for future in concurrent.futures.as_completed(futures):
+            exception = future.exception()
+            if exception is None:
+                failed = future.result() or []
+            else:
+                failed = [
+                    TreeTransferFailure(local_path, logical_path, exception)
+                    for local_path, logical_path in futures[future]
+                ]
+            for failure in failed:
+                logger.warning(
+                    "%s between %r and %r failed: %r",
+                    description,
+                    failure.local_path,
+                    failure.logical_path,
+                    failure.exception,
+                )
+            failures += failed
+        return failures
 
     def chksum(self, path, **options):
         """
@@ -434,6 +1212,11 @@ class DataObjectManager(Manager):
         data_open_returned_values=None,
         progressQueue=False,
         updatables=(),
+        chunk_size=None,
+        journal=None,
+        resume=False,
+        retries=None,
+        errors=None,
     ):
         """Call into the irods.parallel library for multi-1247 GET.
 
@@ -441,6 +1224,18 @@ class DataObjectManager(Manager):
         the condition that the data object is determined to be of appropriate size
         for parallel download.
 
+        A positive chunk_size lets the transfer threads share a queue of chunks of
+        that many bytes; if None, the data_objects.parallel_chunk_size setting is used.
+
+        If journal is True or a file path, the chunks completed are recorded in a journal
+        file (by default, the local file's path plus irods.parallel.JOURNAL_SUFFIX).  With
+        resume=True, a journal left by an interrupted call is used to transfer only the
+        chunks still missing.  The journal is deleted once the transfer is complete.
+
+        A chunk whose transfer fails with a NetworkException is re-sent over a newly opened
+        connection up to `retries' times (if None, the data_objects.parallel_transfer_retries
+        setting is used).  If a list is given as `errors', an irods.parallel.ChunkFailure
+        is appended to it for each failed attempt.
         """
         return parallel.io_main(
             self.sess,
@@ -452,6 +1247,11 @@ class DataObjectManager(Manager):
             data_open_returned_values=data_open_returned_values,
             queueLength=(DEFAULT_QUEUE_DEPTH if progressQueue else 0),
             updatables=updatables,
+            chunk_size=chunk_size,
+            journal=journal,
+            resume=resume,
+            retries=retries,
+            errors=errors,
         )
 
     def parallel_put(
@@ -465,12 +1265,21 @@ class DataObjectManager(Manager):
         open_options={},
         updatables=(),
         progressQueue=False,
+        chunk_size=None,
+        journal=None,
+        resume=False,
+        retries=None,
+        errors=None,
     ):
         """Call into the irods.parallel library for multi-1247 PUT.
 
         Called from a session.data_objects.put(...) on the condition that the
         data object is determined to be of appropriate size for parallel upload.
 
+        The chunk_size, journal, resume, retries, and errors parameters have the same meaning as
+        for parallel_get.  When retries are allowed, the data object's first handle, through
+        which the replica is finalized, is kept idle so that every chunk can be retried; the
+        put then holds one connection more than num_threads.
         """
         return parallel.io_main(
             self.sess,
@@ -483,6 +1292,11 @@ class DataObjectManager(Manager):
             open_options=open_options,
             queueLength=(DEFAULT_QUEUE_DEPTH if progressQueue else 0),
             updatables=updatables,
+            chunk_size=chunk_size,
+            journal=journal,
+            resume=resume,
+            retries=retries,
+            errors=errors,
         )
 
     @staticmethod
@@ -552,6 +1366,14 @@ class DataObjectManager(Manager):
         )
     )
 
+    @tracing.traced(
+        "irods.data_object.open",
+        lambda self, path, mode, *args, **options: {
+            "irods.path": path,
+            "irods.mode": mode,
+            "irods.api": "DATA_OBJ_OPEN_AN",
+        },
+    )
     def open(
         self,
         path,
@@ -564,6 +1386,10 @@ class DataObjectManager(Manager):
         # global setting. Use True or False as an override.
         returned_values=None,  # Used to update session reference, for forging more conns to same host, in irods.parallel.io_main
         allow_redirect=client_config.getter("data_objects", "allow_redirect"),
+        read_ahead=0,  # Number of read requests to keep in flight for sequential reads.
+        write_behind=client_config.getter(
+            "data_objects", "write_behind"
+        ),  # Bytes of written data that may be held while being sent in the background.
         **options
     ):
         _raw_fd_holder = options.get("_raw_fd_holder", [])
@@ -612,6 +1438,9 @@ class DataObjectManager(Manager):
 
         requested_hierarchy = options.get(kw.RESC_HIER_STR_KW, None)
 
+        if callable(write_behind):
+            write_behind = write_behind()
+
         conn = self.sess.pool.get_connection()
         redirected_host = ""
 
@@ -646,11 +1475,16 @@ class DataObjectManager(Manager):
         if redirected_host and use_get_rescinfo_apis:
             # Redirect only if the local zone is being targeted, and if the hostname is changed from the original.
             if target_zone == self.sess.zone and (self.sess.host != redirected_host):
-                # This is the actual redirect.
-                directed_sess = self.sess.clone(host=redirected_host)
-                returned_values["session"] = directed_sess
-                conn.release()
-                conn = directed_sess.pool.get_connection()
+                # This is the actual redirect.  Sessions (and their pooled connections) are reused
+                # across redirects to the same host.
+                with tracing.span(
+                    "irods.data_object.redirect",
+                    {"irods.path": path, "irods.host": redirected_host},
+                ):
+                    directed_sess = self.sess._redirect_session(redirected_host)
+                    returned_values["session"] = directed_sess
+                    conn.release()
+                    conn = directed_sess.pool.get_connection()
                 logger.debug("redirect_to_host = %s", redirected_host)
 
         # Restore RESC HIER for DATA_OBJ_OPEN call
@@ -665,9 +1499,20 @@ class DataObjectManager(Manager):
         conn.send(message)
         desc = conn.recv().int_info
 
+        span = tracing.current_span()
+        span.set_attribute("irods.host", directed_sess.host)
+        if requested_hierarchy is not None:
+            span.set_attribute("irods.resc_hier", requested_hierarchy)
+
         raw = iRODSDataObjectFileRaw(
-            conn, desc, finalize_on_close=finalize_on_close, **options
+            conn,
+            desc,
+            finalize_on_close=finalize_on_close,
+            read_ahead=read_ahead,
+            write_behind=write_behind,
+            **options
         )
+        raw.path = path
         raw.session = directed_sess
 
         (_raw_fd_holder).append(raw)
@@ -678,6 +1523,8 @@ class DataObjectManager(Manager):
             auto_close = auto_close()
         if auto_close:
             ret_value = ManagedBufferedRandom(raw, _session=self.sess)
+        elif write_behind:
+            ret_value = FlushingBufferedRandom(raw)
         else:
             ret_value = io.BufferedRandom(raw)
         if "a" in mode:
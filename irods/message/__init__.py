@@ -3,6 +3,7 @@
 import struct
 import logging
 import socket
+import ssl
 import json
 import irods.exception as ex
 from typing import Optional
@@ -13,7 +14,10 @@ from ..api_number import api_number
 from collections import namedtuple
 import os
 import ast
+import re
 import threading
+import time
+import irods.metrics as metrics
 from .message import Message
 from .property_types import (
     BinaryProperty,
@@ -201,9 +205,83 @@ def _socket_is_blocking(sk):
         return timeout is None or timeout > 0
 
 
+class _Buffered_socket_reader:
+    """Reads iRODS protocol frames from a socket by way of a reusable receive buffer.
+
+    Each refill of the buffer takes as many bytes as the socket has available, so that a
+    small response (its length prefix, header, and message) is usually had from a single
+    recv call.  Reads larger than the buffer take what is buffered and receive the rest
+    directly.  An instance may be passed in place of the socket to iRODSMessage.recv and
+    iRODSMessage.recv_into; all reads from the socket must then be made through it.
+    """
+
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, sock, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.sock = sock
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._begin = self._end = 0
+
+    @property
+    def buffered(self):
+        return self._end - self._begin
+
+    def _take(self, size):
+        """Remove and return up to `size' bytes from the buffer, as a memoryview."""
+        size = min(size, self.buffered)
+        view = self._view[self._begin : self._begin + size]
+        self._begin += size
+        if self._begin == self._end:
+            self._begin = self._end = 0
+        return view
+
+    def _fill(self, size):
+        """Receive into the buffer until at least `size' bytes (no more than its capacity) are held."""
+        if self._begin + size > len(self._buffer):
+            held = self.buffered
+            self._buffer[:held] = self._view[self._begin : self._end]
+            self._begin, self._end = 0, held
+        while self.buffered < size:
+            nbytes = self.sock.recv_into(self._view[self._end :])
+            if nbytes == 0:
+                raise socket.error(
+                    "Read {} bytes from socket instead of expected {} bytes".format(
+                        self.buffered, size
+                    )
+                )
+            self._end += nbytes
+
+    def read(self, size):
+        """Return exactly `size' bytes."""
+        if size <= len(self._buffer):
+            if self.buffered < size:
+                self._fill(size)
+            return self._take(size).tobytes()
+        head = self._take(size).tobytes()
+        return head + _recv_message_in_len(self.sock, size - len(head))
+
+    def read_into(self, buffer, size):
+        """Read exactly `size' bytes into `buffer', returning a memoryview of them."""
+        mv = memoryview(buffer)
+        head = self._take(size)
+        mv[: len(head)] = head
+        if len(head) < size:
+            _recv_message_into(self.sock, mv[len(head) :], size - len(head))
+        return mv[:size]
+
+    def wait_for_frame(self):
+        """Block until the length prefix of the next frame has been received."""
+        if self.buffered < 4:
+            self._fill(4)
+
+
 def _recv_message_in_len(sock, size):
+    if isinstance(sock, _Buffered_socket_reader):
+        return sock.read(size)
+
     size_left = size
-    retbuf = None
+    retbuf = []
 
     # Get socket properties for debug and exception messages.
     is_blocking = _socket_is_blocking(sock)
@@ -228,19 +306,17 @@ def _recv_message_in_len(sock, size):
         if len(buf) == 0:
             break
         size_left -= len(buf)
-        if retbuf is None:
-            retbuf = buf
-        else:
-            retbuf += buf
+        retbuf.append(buf)
+
+    # Pieces from short reads are joined once, rather than accumulated by repeated concatenation.
+    retbuf = retbuf[0] if len(retbuf) == 1 else b"".join(retbuf)
 
     # This method is supposed to read and return 'size'
-    # bytes from the socket. If it reads no bytes (retbuf
-    # will be None), or if it reads less number of bytes
-    # than 'size', throw a socket.error exception
-    if retbuf is None or len(retbuf) != size:
-        retbuf_size = len(retbuf) if retbuf is not None else 0
+    # bytes from the socket. If it reads less number
+    # of bytes than 'size', throw a socket.error exception
+    if len(retbuf) != size:
         msg = "Read {} bytes from socket instead of expected {} bytes".format(
-            retbuf_size, size
+            len(retbuf), size
         )
         raise socket.error(msg)
 
@@ -248,6 +324,9 @@ def _recv_message_in_len(sock, size):
 
 
 def _recv_message_into(sock, buffer, size):
+    if isinstance(sock, _Buffered_socket_reader):
+        return sock.read_into(buffer, size)
+
     size_left = size
     index = 0
     mv = memoryview(buffer)
@@ -261,11 +340,84 @@ def _recv_message_into(sock, buffer, size):
             if getattr(e, "winerror", 0) != 10045:
                 raise
             rsize = sock.recv_into(mv[index:], size_left)
+        if rsize == 0:
+            raise socket.error(
+                "Read {} bytes from socket instead of expected {} bytes".format(
+                    index, size
+                )
+            )
         size_left -= rsize
         index += rsize
     return mv[:index]
 
 
+def _send_message_segments(sock, segments):
+    """Send the buffers in `segments' in order, as by sendall() on their concatenation.
+
+    Where the socket supports it, the buffers are handed to the kernel together by
+    sendmsg() (scatter/gather), so that no copy is made of large payloads.  SSL sockets
+    do not implement sendmsg(); for these, the small leading segments are joined and
+    sent, followed by the last one.
+    """
+    segments = [seg for seg in segments if len(seg)]
+    if not segments:
+        return
+    if isinstance(sock, ssl.SSLSocket) or not hasattr(sock, "sendmsg"):
+        if len(segments) > 1:
+            sock.sendall(b"".join(segments[:-1]))
+        sock.sendall(segments[-1])
+        return
+    views = [memoryview(seg).cast("B") for seg in segments]
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
+
+
+# The MsgHeader_PI document which precedes every message has a fixed shape, so it is decoded
+# here without the generality (or the cost) of an XML parser.  Anything not matching this
+# pattern exactly, such as a header containing entities, is left to the selected parser.
+
+_MSG_HEADER_PATTERN = re.compile(
+    rb"\s*<MsgHeader_PI>\s*"
+    rb"<type>([^<&]*)</type>\s*"
+    rb"<msgLen>(-?\d+)</msgLen>\s*"
+    rb"<errorLen>(-?\d+)</errorLen>\s*"
+    rb"<bsLen>(-?\d+)</bsLen>\s*"
+    rb"<intInfo>(-?\d+)</intInfo>\s*"
+    rb"</MsgHeader_PI>[\s\0]*\Z"
+)
+
+
+def _decode_msg_header(rsp_header):
+    """Return the (type, msgLen, errorLen, bsLen, intInfo) fields of a packed MsgHeader_PI."""
+    match = _MSG_HEADER_PATTERN.match(rsp_header)
+    if match is not None:
+        (msg_type, msg_len, err_len, bs_len, int_info) = match.groups()
+        try:
+            return (
+                msg_type.decode("utf-8"),
+                int(msg_len),
+                int(err_len),
+                int(bs_len),
+                int(int_info),
+            )
+        except UnicodeDecodeError:
+            pass
+    xml_root = ET().fromstring(rsp_header)
+    return (
+        xml_root.find("type").text,
+        int(xml_root.find("msgLen").text),
+        int(xml_root.find("errorLen").text),
+        int(xml_root.find("bsLen").text),
+        int(xml_root.find("intInfo").text),
+    )
+
+
 # ------------------------------------
 
 
@@ -295,6 +447,10 @@ class iRODSMessage:
 
         pass
 
+    # The API named in the request to which this message is a response, recorded by
+    # Connection.recv when metrics are enabled (see irods.metrics).
+    _api_name = None
+
     def __init__(self, msg_type=b"", msg=None, error=b"", bs=b"", int_info=0):
         self.msg_type = msg_type
         self.msg = msg
@@ -343,12 +499,7 @@ class iRODSMessage:
         # rsp_header = sock.recv(rsp_header_size, socket.MSG_WAITALL)
         rsp_header = _recv_message_in_len(sock, rsp_header_size)
 
-        xml_root = ET().fromstring(rsp_header)
-        msg_type = xml_root.find("type").text
-        msg_len = int(xml_root.find("msgLen").text)
-        err_len = int(xml_root.find("errorLen").text)
-        bs_len = int(xml_root.find("bsLen").text)
-        int_info = int(xml_root.find("intInfo").text)
+        (msg_type, msg_len, err_len, bs_len, int_info) = _decode_msg_header(rsp_header)
 
         # message = sock.recv(msg_len, socket.MSG_WAITALL) if msg_len != 0 else
         # None
@@ -370,12 +521,7 @@ class iRODSMessage:
         rsp_header_size = struct.unpack(">i", rsp_header_size)[0]
         rsp_header = _recv_message_in_len(sock, rsp_header_size)
 
-        xml_root = ET().fromstring(rsp_header)
-        msg_type = xml_root.find("type").text
-        msg_len = int(xml_root.find("msgLen").text)
-        err_len = int(xml_root.find("errorLen").text)
-        bs_len = int(xml_root.find("bsLen").text)
-        int_info = int(xml_root.find("intInfo").text)
+        (msg_type, msg_len, err_len, bs_len, int_info) = _decode_msg_header(rsp_header)
 
         message = _recv_message_in_len(sock, msg_len) if msg_len != 0 else None
         error = _recv_message_in_len(sock, err_len) if err_len != 0 else None
@@ -410,7 +556,13 @@ class iRODSMessage:
 
         return msg_header_length + msg_header
 
-    def pack(self):
+    def pack_segments(self):
+        """Pack the message as a list of buffers (header, main message, error, and bs parts)
+        which, sent in order, are equivalent to the output of pack().
+
+        The bs part is returned as given, so a bytes-like payload (including a memoryview)
+        reaches the socket without being copied.
+        """
         # pack main message and endcode if needed
         if self.msg:
             main_msg = self.encode_unicode(self.msg.pack())
@@ -420,15 +572,31 @@ class iRODSMessage:
         # encode message parts if needed
         self.error = self.encode_unicode(self.error)
         self.bs = self.encode_unicode(self.bs)
+        bs_len = (
+            self.bs.nbytes if isinstance(self.bs, memoryview) else len(self.bs)
+        )
 
         # pack header
         packed_header = self.pack_header(
-            self.msg_type, len(main_msg), len(self.error), len(self.bs), self.int_info
+            self.msg_type, len(main_msg), len(self.error), bs_len, self.int_info
         )
 
-        return packed_header + main_msg + self.error + self.bs
+        return [packed_header, main_msg, self.error, self.bs]
+
+    def pack(self):
+        return b"".join(self.pack_segments())
 
     def get_main_message(self, cls, r_error=None):
+        registry = metrics._registry
+        if registry is None or self._api_name is None:
+            return self._parse_main_message(cls, r_error)
+        start = time.perf_counter()
+        try:
+            return self._parse_main_message(cls, r_error)
+        finally:
+            registry.record_parse(self._api_name, time.perf_counter() - start)
+
+    def _parse_main_message(self, cls, r_error):
         msg = cls()
         logger.debug(
             "Attempt to parse server response [%r] as class [%r].", self.msg, cls
@@ -450,6 +618,78 @@ class iRODSMessage:
         return msg
 
 
+class _Request_template:
+    """A request of fixed shape, serialized once, into which only a few integer fields vary.
+
+    The message is packed with a distinct sentinel value in each of the varying fields, and
+    the sentinels are then replaced by %d conversions; the header, whose lengths vary with the
+    body, is templated the same way.  Calling the template yields an object which Connection.send
+    accepts in place of an iRODSMessage.
+    """
+
+    _SENTINEL_BASE = 7000000001
+
+    def __init__(self, message, int_info, field_names, msg_type="RODS_API_REQ"):
+        self.msg_type = msg_type
+        self.int_info = int_info
+        sentinels = {
+            name: self._SENTINEL_BASE + i for i, name in enumerate(field_names)
+        }
+        for name, sentinel in sentinels.items():
+            setattr(message, name, sentinel)
+        (self._body, self._body_fields) = self._template(
+            iRODSMessage.encode_unicode(message.pack()), sentinels
+        )
+        (self._header, _) = self._template(
+            iRODSMessage.pack_header(
+                msg_type,
+                self._SENTINEL_BASE,
+                0,
+                self._SENTINEL_BASE + 1,
+                int_info,
+            )[4:],
+            {"msgLen": self._SENTINEL_BASE, "bsLen": self._SENTINEL_BASE + 1},
+        )
+
+    @staticmethod
+    def _template(packed, sentinels):
+        """Return the template made from `packed', and the names of its fields in order of appearance."""
+        template = packed.replace(b"%", b"%%")
+        positions = {}
+        for name, sentinel in sentinels.items():
+            digits = str(sentinel).encode()
+            if template.count(digits) != 1:
+                raise ValueError("Request is not suitable for templating.")
+            positions[name] = packed.index(digits)
+            template = template.replace(digits, b"%d")
+        return template, sorted(positions, key=positions.get)
+
+    def __call__(self, bs=b"", **fields):
+        body = self._body % tuple(map(fields.__getitem__, self._body_fields))
+        bs_len = bs.nbytes if isinstance(bs, memoryview) else len(bs)
+        header = self._header % (len(body), bs_len)
+        return _Packed_request(
+            [struct.pack(">i", len(header)) + header, body, bs],
+            self.msg_type,
+            self.int_info,
+        )
+
+
+class _Packed_request:
+    """The buffers of a request already packed, as returned by iRODSMessage.pack_segments()."""
+
+    def __init__(self, segments, msg_type, int_info):
+        self.segments = segments
+        self.msg_type = msg_type
+        self.int_info = int_info
+
+    def pack_segments(self):
+        return self.segments
+
+    def pack(self):
+        return b"".join(self.segments)
+
+
 # define CS_NEG_PI "int status; str result[MAX_NAME_LEN];"
 class ClientServerNegotiation(Message):
     _name = "CS_NEG_PI"
@@ -688,6 +928,17 @@ class GenQueryResponse(Message):
     SqlResult_PI = ArrayProperty(SubmessageProperty(GenQueryResponseColumn))
 
 
+# define BulkOprInp_PI "str objPath[MAX_NAME_LEN]; struct GenQueryOut_PI; struct
+# KeyValPair_PI;"
+
+
+class BulkOprRequest(Message):
+    _name = "BulkOprInp_PI"
+    objPath = StringProperty()
+    GenQueryOut_PI = SubmessageProperty(GenQueryResponse)
+    KeyValPair_PI = SubmessageProperty(StringStringMap)
+
+
 # define DataObjInp_PI "str objPath[MAX_NAME_LEN]; int createMode; int
 # openFlags; double offset; double dataSize; int numThreads; int oprType;
 # struct *SpecColl_PI; struct KeyValPair_PI;"
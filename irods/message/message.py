@@ -10,6 +10,47 @@ class MessageMetaclass(OrderedMetaclass):
             prop.dub(name)
 
 
+# The packing and unpacking functions specialized for each Message class, made on first use.
+
+_packers = {}
+
+_unpackers = {}
+
+
+def _compile_packer(cls):
+    open_tag, close_tag = "<%s>" % cls._name, "</%s>" % cls._name
+    prop_packers = tuple((name, prop.packer()) for name, prop in cls._ordered_properties)
+
+    def packer(values):
+        packed = [open_tag]
+        for name, pack in prop_packers:
+            if name in values:
+                packed.append(pack(values[name]))
+        packed.append(close_tag)
+        return "".join(packed)
+
+    _packers[cls] = packer
+    return packer
+
+
+def _compile_unpacker(cls):
+    prop_unpackers = tuple(
+        (name, prop.unpacker()) for name, prop in cls._ordered_properties
+    )
+
+    def unpacker(values, root):
+        # Group the child elements by tag in one pass, rather than searching them once for
+        # each property.
+        children = {}
+        for el in root:
+            children.setdefault(el.tag, []).append(el)
+        for name, unpack in prop_unpackers:
+            values[name] = unpack(children.get(name, ()))
+
+    _unpackers[cls] = unpacker
+    return unpacker
+
+
 class Message(OrderedClass, metaclass=MessageMetaclass):
 
     def __init__(self, *args, **kwargs):
@@ -20,6 +61,20 @@ class Message(OrderedClass, metaclass=MessageMetaclass):
                 self._values[name] = kwargs[name]
 
     def pack(self):
+        packer = _packers.get(self.__class__)
+        if packer is None:
+            packer = _compile_packer(self.__class__)
+        return packer(self._values)
+
+    def unpack(self, root):
+        unpacker = _unpackers.get(self.__class__)
+        if unpacker is None:
+            unpacker = _compile_unpacker(self.__class__)
+        unpacker(self._values, root)
+
+    # The general implementations, equivalent to the above.
+
+    def _generic_pack(self):
         values = []
         values.append("<%s>" % self.__class__._name)
         for name, prop in self._ordered_properties:
@@ -28,6 +83,6 @@ class Message(OrderedClass, metaclass=MessageMetaclass):
         values.append("</%s>" % self.__class__._name)
         return "".join(values)
 
-    def unpack(self, root):
+    def _generic_unpack(self, root):
         for name, prop in self._ordered_properties:
             self._values[name] = prop.unpack(root.findall(name))
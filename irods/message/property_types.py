@@ -32,6 +32,34 @@ class MessageProperty(OrderedProperty):
             return self.parse(el.text)
         return None
 
+    # packer() and unpacker() return functions equivalent to pack() and unpack(), for use by
+    # the specialized packing and unpacking functions of the Message class owning the property.
+    # formatter() returns one producing the element's text, as pack() would enclose it.
+
+    def formatter(self):
+        format_ = self.format
+
+        def format_text(value):
+            my_value = format_(value)
+            if isinstance(my_value, bytes):
+                my_value = my_value.decode("utf-8")
+            return my_value
+
+        return format_text
+
+    def packer(self):
+        open_tag, close_tag = "<%s>" % self.name, "</%s>" % self.name
+        format_text = self.formatter()
+        return lambda value: open_tag + format_text(value) + close_tag
+
+    def unpacker(self):
+        parse = self.parse
+
+        def unpack(els):
+            return parse(els[0].text) if els else None
+
+        return unpack
+
 
 class IntegerProperty(MessageProperty):
 
@@ -41,6 +69,12 @@ class IntegerProperty(MessageProperty):
     def parse(self, value):
         return int(value)
 
+    def formatter(self):
+        return str
+
+    def unpacker(self):
+        return lambda els: int(els[0].text) if els else None
+
 
 class LongProperty(MessageProperty):
 
@@ -50,6 +84,10 @@ class LongProperty(MessageProperty):
     def parse(self, value):
         return int(value)
 
+    formatter = IntegerProperty.formatter
+
+    unpacker = IntegerProperty.unpacker
+
 
 class BinaryProperty(MessageProperty):
 
@@ -90,6 +128,24 @@ class StringProperty(MessageProperty):
     def parse(self, value):
         return value
 
+    def formatter(self):
+        format_ = self.format
+
+        def format_text(value):
+            if type(value) is str:
+                # as by escape(value, quote=False)
+                return (
+                    value.replace("&", "&amp;")
+                    .replace("<", "&lt;")
+                    .replace(">", "&gt;")
+                )
+            return format_(value)
+
+        return format_text
+
+    def unpacker(self):
+        return lambda els: els[0].text if els else None
+
 
 class ArrayProperty(MessageProperty):
 
@@ -104,6 +160,27 @@ class ArrayProperty(MessageProperty):
     def unpack(self, els):
         return [self.prop.unpack([el]) for el in els]
 
+    def packer(self):
+        prop = self.prop.dub(self.name)
+        if isinstance(prop, SubmessageProperty):
+            pack = prop.packer()
+            return lambda values: "".join([pack(v) for v in values])
+
+        # Consecutive elements are separated by one closing and one opening tag.
+        open_tag, close_tag = "<%s>" % self.name, "</%s>" % self.name
+        separator = close_tag + open_tag
+        format_text = prop.formatter()
+
+        def pack(values):
+            texts = [format_text(v) for v in values]
+            return (open_tag + separator.join(texts) + close_tag) if texts else ""
+
+        return pack
+
+    def unpacker(self):
+        unpack = self.prop.unpacker()
+        return lambda els: [unpack([el]) for el in els]
+
 
 class SubmessageProperty(MessageProperty):
 
@@ -121,3 +198,11 @@ class SubmessageProperty(MessageProperty):
             msg.unpack(el)
             return msg
         return None
+
+    def packer(self):
+        return lambda value: value.pack()
+
+    def unpacker(self):
+        # The message class is looked up at call time, since it may be assigned after the
+        # containing message class is compiled (see MsParam.inOutStruct).
+        return self.unpack
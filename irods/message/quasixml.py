@@ -40,6 +40,10 @@ class Element:
         """Get matching child elements by name (generator variant)."""
         return (el for el in self.body if el.name == name)
 
+    def __iter__(self):
+        """Iterate over the child elements."""
+        return iter(self.body if type(self.body) is list else ())
+
     # For debugging convenience:
     def __str__(self):
         if type(self.body) is list:
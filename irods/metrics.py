@@ -0,0 +1,239 @@
+"""Per-API instrumentation of the requests which connections make of iRODS servers.
+
+Instrumentation is off until enable() is called, and costs nothing beyond a check of a module
+global while off.  Once enabled, each request sent by an irods.connection.Connection is
+recorded in the active MetricsRegistry under the name of its API (as in
+irods.api_number.api_number, or the message type for requests other than API calls), with
+the time taken to serialize it, to send it, waiting for the server to begin its response,
+receiving that response, and later parsing it; the bytes sent and received; and the error
+code of any failed request.
+
+    import irods.metrics
+    registry = irods.metrics.enable()
+    ...                                 # Use sessions as usual.
+    print(registry.to_prometheus())     # Or: registry.as_dict()
+"""
+
+import collections
+import threading
+import time
+from typing import Dict
+
+from irods.api_number import api_number
+
+__all__ = ["MetricsRegistry", "APIStats", "enable", "disable", "active_registry"]
+
+# The names for API numbers; where several names share a number, the first one listed wins.
+_api_names: Dict[int, str] = {}
+for _name, _number in api_number.items():
+    _api_names.setdefault(_number, _name)
+del _name, _number
+
+# The active MetricsRegistry, or None while instrumentation is disabled.
+_registry = None
+
+
+def enable(registry=None, callback=None):
+    """Begin recording requests in `registry' (by default, a new MetricsRegistry made with the
+    given callback), and return it."""
+    global _registry
+    if registry is None:
+        registry = MetricsRegistry(callback=callback)
+    _registry = registry
+    return registry
+
+
+def disable():
+    """Stop recording requests, returning the registry which had been in use (if any)."""
+    global _registry
+    registry, _registry = _registry, None
+    return registry
+
+
+def active_registry():
+    return _registry
+
+
+def api_name(message):
+    """Return the name under which the request `message' is recorded."""
+    if message.msg_type == "RODS_API_REQ":
+        return _api_names.get(message.int_info, str(message.int_info))
+    return message.msg_type
+
+
+class APIStats:
+    """Running totals for the requests made of one API.  Times are in seconds."""
+
+    PHASES = ("serialize", "send", "server_wait", "recv", "parse")
+
+    def __init__(self):
+        self.count = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.errors = collections.Counter()  # Failed requests, by error code.
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "errors": dict(self.errors),
+            "times": dict(self.times),
+        }
+
+
+class MetricsRegistry:
+    """Aggregates the measurements of requests by API name.
+
+    If a callback is given, it is called with the API name and a dictionary of the
+    measurements as each is recorded: once when the response to a request has been received
+    (with keys "serialize", "send", "server_wait", "recv", "bytes_out", "bytes_in", and
+    "error", the last None unless the server returned an error code), and again with the key
+    "parse" if the response is parsed.  Callbacks run on the thread making the request, and
+    should be quick.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._stats = collections.defaultdict(APIStats)
+
+    def record_request(self, api, measurements):
+        with self._lock:
+            stats = self._stats[api]
+            stats.count += 1
+            stats.bytes_out += measurements["bytes_out"]
+            stats.bytes_in += measurements["bytes_in"]
+            if measurements["error"] is not None:
+                stats.errors[measurements["error"]] += 1
+            for phase in ("serialize", "send", "server_wait", "recv"):
+                stats.times[phase] += measurements[phase]
+        if self.callback is not None:
+            self.callback(api, measurements)
+
+    def record_parse(self, api, seconds):
+        with self._lock:
+            self._stats[api].times["parse"] += seconds
+        if self.callback is not None:
+            self.callback(api, {"parse": seconds})
+
+    def stats(self, api):
+        """Return a copy of the totals for the named API."""
+        with self._lock:
+            return self._stats[api].as_dict() if api in self._stats else None
+
+    def as_dict(self):
+        with self._lock:
+            return {api: stats.as_dict() for api, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_prometheus(self, prefix="irods_client"):
+        """Return the totals in the Prometheus text exposition format."""
+        totals = self.as_dict()
+        lines = []
+
+        def family(name, help_text, samples):
+            lines.append("# HELP {}_{} {}".format(prefix, name, help_text))
+            lines.append("# TYPE {}_{} counter".format(prefix, name))
+            for labels, value in samples:
+                lines.append(
+                    "{}_{}{{{}}} {}".format(
+                        prefix,
+                        name,
+                        ",".join('{}="{}"'.format(k, v) for k, v in labels),
+                        value,
+                    )
+                )
+
+        family(
+            "requests_total",
+            "Requests sent, by API.",
+            [((("api", api),), t["count"]) for api, t in sorted(totals.items())],
+        )
+        family(
+            "request_seconds_total",
+            "Time spent on requests, by API and phase.",
+            [
+                ((("api", api), ("phase", phase)), repr(t["times"][phase]))
+                for api, t in sorted(totals.items())
+                for phase in APIStats.PHASES
+            ],
+        )
+        family(
+            "bytes_total",
+            "Bytes sent and received, by API.",
+            [
+                ((("api", api), ("direction", direction)), t["bytes_" + direction])
+                for api, t in sorted(totals.items())
+                for direction in ("out", "in")
+            ],
+        )
+        family(
+            "errors_total",
+            "Requests which failed, by API and error code.",
+            [
+                ((("api", api), ("code", code)), n)
+                for api, t in sorted(totals.items())
+                for code, n in sorted(t["errors"].items())
+            ],
+        )
+        return "\n".join(lines) + "\n"
+
+
+class _Request_sample:
+    """The measurements of one request, taken by Connection.send and completed by
+    Connection.recv on receipt of the response."""
+
+    __slots__ = ("api", "t", "serialize", "send", "server_wait", "bytes_out")
+
+    def __init__(self, api):
+        self.api = api
+        self.t = time.perf_counter()
+        self.serialize = self.send = self.server_wait = 0.0
+        self.bytes_out = 0
+
+    def _lap(self):
+        now = time.perf_counter()
+        elapsed, self.t = now - self.t, now
+        return elapsed
+
+    def serialized(self, segments):
+        self.serialize = self._lap()
+        self.bytes_out = sum(
+            seg.nbytes if isinstance(seg, memoryview) else len(seg) for seg in segments
+        )
+
+    def sent(self):
+        self.send = self._lap()
+
+    def response_began(self):
+        self.server_wait = self._lap()
+
+    def received(self, registry, response):
+        from irods.message import iRODSMessage
+
+        recv_time = self._lap()
+        lengths = [
+            len(part) if part is not None else 0
+            for part in (response.msg, response.error, response.bs)
+        ]
+        header = iRODSMessage.pack_header(
+            response.msg_type, *(lengths + [response.int_info])
+        )
+        response._api_name = self.api
+        registry.record_request(
+            self.api,
+            {
+                "serialize": self.serialize,
+                "send": self.send,
+                "server_wait": self.server_wait,
+                "recv": recv_time,
+                "bytes_out": self.bytes_out,
+                "bytes_in": len(header) + sum(lengths),
+                "error": response.int_info if response.int_info < 0 else None,
+            },
+        )
@@ -1,5 +1,8 @@
 #!/usr/bin/env python
 
+import collections
+import io
+import json
 import os
 import ssl
 import time
@@ -12,8 +15,10 @@ import multiprocessing
 from typing import List, Union
 
 from irods.data_object import iRODSDataObject
-from irods.exception import DataObjectDoesNotExist
+import irods.client_configuration as client_config
+from irods.exception import DataObjectDoesNotExist, NetworkException
 import irods.keywords as kw
+import irods.tracing as tracing
 from queue import Queue, Full, Empty
 
 
@@ -47,7 +52,7 @@ class deferred_call:
         return self.function(*self.args, **self.keywords)
 
 
-from threading import Barrier
+from threading import Barrier, BrokenBarrierError
 
 RECOMMENDED_NUM_THREADS_PER_TRANSFER = 3
 
@@ -228,41 +233,166 @@ def _io_send_bytes_progress(queueObject, item):
 COPY_BUF_SIZE = (1024**2) * 4
 
 
-def _copy_part(src, dst, length, queueObject, debug_info, mgr, updatables=()):
+def _copy_bytes(
+    src, dst, length, queueObject, debug_info, updatables=(), reported=None
+):
     """
-    The work-horse for performing the copy between file and data object.
+    Copy up to `length' bytes from src to dst, starting at the current offset of each.
 
     It also helps determine whether there has been a large enough increment of
     bytes to inform the progress bar of a need to update.
+
+    When a range is being retried, `reported' is a one-element list holding the number
+    of bytes whose progress was already reported by earlier attempts; those bytes are
+    not reported again.
     """
     from irods.manager.data_object_manager import do_progress_updates
 
+    if reported is None:
+        reported = [0]
     bytecount = 0
     accum = 0
-    while True and bytecount < length:
-        buf = src.read(min(COPY_BUF_SIZE, length - bytecount))
-        buf_len = len(buf)
-        if 0 == buf_len:
-            break
-        dst.write(buf)
-        bytecount += buf_len
-        accum += buf_len
-        if queueObject and accum and _io_send_bytes_progress(queueObject, accum):
-            accum = 0
-        do_progress_updates(updatables, buf_len)
-        if verboseConnection:
-            print("(" + debug_info + ")", end="", file=sys.stderr)
-            sys.stderr.flush()
+    # One buffer is filled and drained repeatedly, so that chunk data is not copied into new
+    # bytes objects on its way between the file and the data object.
+    buf = memoryview(bytearray(min(COPY_BUF_SIZE, max(length, 0))))
+    try:
+        while True and bytecount < length:
+            buf_len = src.readinto(buf[: min(COPY_BUF_SIZE, length - bytecount)])
+            if not buf_len:
+                break
+            dst.write(buf[:buf_len])
+            bytecount += buf_len
+            increment = min(buf_len, max(0, bytecount - reported[0]))
+            if increment:
+                reported[0] = bytecount
+                accum += increment
+                do_progress_updates(updatables, increment)
+            if queueObject and accum and _io_send_bytes_progress(queueObject, accum):
+                accum = 0
+            if verboseConnection:
+                print("(" + debug_info + ")", end="", file=sys.stderr)
+                sys.stderr.flush()
+    finally:
+        if queueObject and accum:
+            _io_send_bytes_progress(queueObject, accum)
+    return bytecount
 
+
+def _close_part(src, dst, mgr):
     # In a put or get, exactly one of (src,dst) is a file. Find which and close that one first.
     (file_, obj_) = (src, dst) if dst in mgr else (dst, src)
     file_.close()
     mgr.remove_io(obj_)  # 1. closes obj if it is not the mgr's initial descriptor
     # 2. blocks at barrier until all transfer threads are done copying
     # 3. closes with finalize if obj is mgr's initial descriptor
+
+
+def _copy_part(src, dst, length, queueObject, debug_info, mgr, updatables=()):
+    """
+    The work-horse for performing the copy between file and data object.
+    """
+    bytecount = _copy_bytes(src, dst, length, queueObject, debug_info, updatables)
+    _close_part(src, dst, mgr)
     return bytecount
 
 
+def _discard_io(Io):
+    """Abandon a data object handle without closing the replica through it.
+
+    Any buffered data is dropped and the handle's connection is disconnected and taken out
+    of the pool, leaving it to the server agent to clean up the open replica.
+    """
+    raw = Io.raw
+    try:
+        raw.conn.disconnect()
+    except Exception as e:
+        logger.debug("Ignoring error while disconnecting an abandoned handle: %r", e)
+    raw.conn.release(destroy=True)
+    io.RawIOBase.close(raw)
+
+
+ChunkFailure = collections.namedtuple(
+    "ChunkFailure", ("offset", "length", "attempt", "thread", "exception")
+)
+ChunkFailure.__doc__ = """One failed attempt at transferring a byte range, as recorded in the error
+summary of a parallel transfer."""
+
+DEFAULT_RETRY_BACKOFF = 0.5
+
+MAXIMUM_RETRY_BACKOFF = 8.0
+
+
+def _transfer_range(
+    objHandle,
+    range_,
+    file_,
+    Operation,
+    mgr_,
+    thread_debug_id,
+    queueObject=None,
+    updatables=None,
+):
+    """
+    Transfer one byte range between the file and the data object.  On a NetworkException, the
+    data object handle is discarded, a new one is opened on the same replica, and the range is
+    sent again, up to the retry limit held by the manager.
+
+    Returns a tuple (bytecount, objHandle), where objHandle is the handle in use at the end.
+    """
+    reported = [0]
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            objHandle.seek(range_[0])
+            file_.seek(range_[0])
+            if Operation.isPut():
+                bytecount = _copy_bytes(
+                    file_,
+                    objHandle,
+                    len(range_),
+                    queueObject,
+                    thread_debug_id,
+                    updatables,
+                    reported,
+                )
+                objHandle.flush()
+            else:
+                bytecount = _copy_bytes(
+                    objHandle,
+                    file_,
+                    len(range_),
+                    queueObject,
+                    thread_debug_id,
+                    updatables,
+                    reported,
+                )
+            return bytecount, objHandle
+        except NetworkException as e:
+            mgr_.errors.append(
+                ChunkFailure(range_[0], len(range_), attempt, thread_debug_id, e)
+            )
+            if attempt > mgr_.retries or not mgr_.can_replace(objHandle, Operation):
+                raise
+            delay = min(
+                MAXIMUM_RETRY_BACKOFF, DEFAULT_RETRY_BACKOFF * 2 ** (attempt - 1)
+            )
+            logger.warning(
+                "(thread %s) transfer of %d bytes at offset %d failed (attempt %d): %r ; retrying in %.1f seconds",
+                thread_debug_id,
+                len(range_),
+                range_[0],
+                attempt,
+                e,
+                delay,
+            )
+            time.sleep(delay)
+            new_handle = mgr_.reopen()
+            mgr_.replace_io(objHandle, new_handle)
+            _discard_io(objHandle)
+            objHandle = new_handle
+
+
 class _Multipart_close_manager:
     """An object used to ensure that the initial transfer thread is also the last one to
     call the close method on its `Io' object.  The caller is responsible for setting up the
@@ -272,11 +402,34 @@ class _Multipart_close_manager:
     the byte range for which they are responsible, whereas we block the initial thread
     using a threading Barrier until we know all other threads have called close().
 
+    If a transfer thread fails for good, it calls abort(), which breaks the barrier so that
+    no other thread is left waiting on it.  The initial descriptor is then abandoned rather
+    than finalized.
+
+    With `detach_initial_', no thread transfers data through the initial descriptor, which is
+    kept only for the finalizing close; this is then made by whichever thread is released
+    first from the barrier.  A failed connection can then always be replaced, since none of
+    the handles it might belong to is needed to finalize the replica.
+
     """
 
-    def __init__(self, initial_io_, exit_barrier_):
+    def __init__(
+        self,
+        initial_io_,
+        exit_barrier_,
+        journal_=None,
+        reopen_=None,
+        retries_=0,
+        errors_=None,
+        detach_initial_=False,
+    ):
         self.exit_barrier = exit_barrier_
         self.initial_io = initial_io_
+        self.initial_detached = detach_initial_
+        self.journal = journal_
+        self.reopen = reopen_
+        self.retries = retries_
+        self.errors = errors_ if errors_ is not None else []
         self.__lock = threading.Lock()
         self.aux = []
 
@@ -304,12 +457,130 @@ class _Multipart_close_manager:
                 Io.close()
                 self.aux.remove(Io)
                 is_initial = False
-        self.exit_barrier.wait()
-        if is_initial:
+        try:
+            index = self.exit_barrier.wait()
+        except BrokenBarrierError:
+            if is_initial:
+                _discard_io(Io)
+                raise
+            return
+        if is_initial or (self.initial_detached and index == 0):
             self.finalize()
 
+    def can_replace(self, Io, Operation):
+        """Whether a failed handle may be swapped for a newly opened one.  The initial descriptor
+        of a PUT may not, since the finalizing close of the replica must be made through it."""
+        if self.reopen is None:
+            return False
+        with self.__lock:
+            return not (Io is self.initial_io and Operation.isPut())
+
+    def replace_io(self, old_Io, new_Io):
+        with self.__lock:
+            if old_Io is self.initial_io:
+                self.initial_io = new_Io
+            else:
+                self.aux[self.aux.index(old_Io)] = new_Io
+
+    @property
+    def aborted(self):
+        return self.exit_barrier.broken
+
+    def abort(self, Io):
+        """Abandon the failed handle Io, and release all threads waiting at the exit barrier."""
+        with self.__lock:
+            if Io in self.aux:
+                self.aux.remove(Io)
+            detached_io = None
+            if self.initial_detached and self.initial_io is not None:
+                detached_io, self.initial_io = self.initial_io, None
+        _discard_io(Io)
+        if detached_io is not None:
+            _discard_io(detached_io)
+        self.exit_barrier.abort()
+
     def finalize(self):
         self.initial_io.close()
+        if self.journal is not None:
+            self.journal.remove()
+
+
+JOURNAL_SUFFIX = ".irods_journal"
+
+DEFAULT_JOURNAL_CHUNK_SIZE = (1024**2) * 64
+
+
+class _Range_journal:
+    """A small on-disk record of the byte ranges completed so far by a chunked parallel transfer.
+
+    Besides the ranges themselves, the journal holds an `identity' describing the transfer
+    (operation, paths, size, modification time, and replica information).  A later transfer
+    may then resume from the journal, moving only the missing chunks, provided the identity
+    it computes matches the one recorded.
+    """
+
+    def __init__(self, path, identity, chunk_size, completed=()):
+        self.path = path
+        self.identity = dict(identity)
+        self.chunk_size = chunk_size
+        self.completed = [list(r) for r in completed]
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Return the journal stored at path, or None if it is missing or unreadable."""
+        try:
+            with open(path, "r") as f:
+                j = json.load(f)
+            return cls(path, j["identity"], int(j["chunk_size"]), j["completed"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug("No usable transfer journal at %r: %r", path, e)
+            return None
+
+    def matches(self, **identity):
+        """True if all of the given identity items agree with those recorded."""
+        return all(self.identity.get(k) == v for k, v in identity.items())
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "identity": self.identity,
+                    "chunk_size": self.chunk_size,
+                    "completed": self.completed,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+    def record(self, range_):
+        """Note the byte range as transferred, and commit the journal to disk."""
+        with self.__lock:
+            merged = []
+            begin, end = range_[0], range_[-1] + 1
+            for b, e in sorted(self.completed + [[begin, end]]):
+                if merged and b <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], e)
+                else:
+                    merged.append([b, e])
+            self.completed = merged
+            self.save()
+
+    def missing_ranges(self, total_size):
+        """Return the chunks of (0, total_size) that are not yet wholly contained in a completed range."""
+        chunks = []
+        for begin in range(0, total_size, self.chunk_size):
+            end = min(begin + self.chunk_size, total_size)
+            if not any(b <= begin and end <= e for b, e in self.completed):
+                chunks.append(range(begin, end))
+        return chunks
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
 
 
 def _io_part(
@@ -331,20 +602,85 @@ def _io_part(
     if 0 == len(range_):
         return 0
     Operation = Oper(opr_)
-    (offset, length) = (range_[0], len(range_))
-    objHandle.seek(offset)
-    file_.seek(offset)
     if thread_debug_id == "":  # for more succinct thread identifiers while debugging.
         thread_debug_id = str(threading.currentThread().ident)
-    return (
-        _copy_part(
-            file_, objHandle, length, queueObject, thread_debug_id, mgr_, updatables
-        )
-        if Operation.isPut()
-        else _copy_part(
-            objHandle, file_, length, queueObject, thread_debug_id, mgr_, updatables
+    try:
+        (bytecount, objHandle) = _transfer_range(
+            objHandle,
+            range_,
+            file_,
+            Operation,
+            mgr_,
+            thread_debug_id,
+            queueObject,
+            updatables,
         )
-    )
+        (src, dst) = (file_, objHandle) if Operation.isPut() else (objHandle, file_)
+        _close_part(src, dst, mgr_)
+    except BaseException:
+        file_.close()
+        mgr_.abort(objHandle)
+        raise
+    return bytecount
+
+
+def _io_part_from_queue(
+    objHandle,
+    chunk_queue,
+    file_,
+    opr_,
+    mgr_,
+    thread_debug_id="",
+    queueObject=None,
+    updatables=None,
+):
+    """
+    Runs in a separate thread, repeatedly taking the next unclaimed byte range from chunk_queue
+    and transferring it, until the queue is exhausted.
+
+    Because every thread draws from the same queue, a thread whose stream is fast simply
+    transfers more chunks, rather than sitting idle while a slower one finishes a fixed share.
+    """
+    Operation = Oper(opr_)
+    if thread_debug_id == "":
+        thread_debug_id = str(threading.current_thread().ident)
+    bytecount = 0
+    try:
+        while not mgr_.aborted:
+            try:
+                range_ = chunk_queue.get_nowait()
+            except Empty:
+                break
+            (count, objHandle) = _transfer_range(
+                objHandle,
+                range_,
+                file_,
+                Operation,
+                mgr_,
+                thread_debug_id,
+                queueObject,
+                updatables,
+            )
+            bytecount += count
+            if mgr_.journal is not None:
+                if Operation.isGet():
+                    file_.flush()
+                mgr_.journal.record(range_)
+        (src, dst) = (file_, objHandle) if Operation.isPut() else (objHandle, file_)
+        _close_part(src, dst, mgr_)
+    except BaseException:
+        file_.close()
+        mgr_.abort(objHandle)
+        raise
+    return bytecount
+
+
+def _traced_part(part_function, span_attributes, *args, **kwargs):
+    """Run one thread's part of a parallel transfer within a tracing span."""
+    with tracing.span("irods.parallel.transfer_thread", span_attributes) as span:
+        bytecount = part_function(*args, **kwargs)
+        span.set_attribute("irods.bytes", bytecount)
+    return bytecount
 
 
 def _io_multipart_threaded(
@@ -361,6 +697,9 @@ def _io_multipart_threaded(
     """Called by _io_main.
 
     Carve up (0,total_size) range into `num_threads` parts and initiate a transfer thread for each one.
+
+    If a positive `chunk_size' is among the extra options, the range is instead cut into chunks of
+    that size, which are placed on a queue shared by all `num_threads' transfer threads.
     """
     (Data_object, Io) = dataObj_and_IO
     Operation = Oper(operation_)
@@ -373,16 +712,45 @@ def _io_multipart_threaded(
             end_offs = total_bytes
         return range(begin_offs, end_offs)
 
-    bytes_per_thread = total_size // num_threads
+    chunk_size = extra_options.get("chunk_size", 0)
+    journal = extra_options.get("journal")
+    resuming = extra_options.get("resuming", False)
 
-    ranges = [
-        bytes_range_for_thread(i, num_threads, total_size, bytes_per_thread)
-        for i in range(num_threads)
-    ]
+    if journal is not None:
+        chunk_size = journal.chunk_size
 
-    logger.info(
-        "num_threads = %s ; bytes_per_thread = %s", num_threads, bytes_per_thread
-    )
+    if chunk_size > 0:
+        chunk_queue = Queue()
+        if journal is not None:
+            chunks = journal.missing_ranges(total_size)
+        else:
+            chunks = [
+                range(begin_offs, min(begin_offs + chunk_size, total_size))
+                for begin_offs in range(0, total_size, chunk_size)
+            ]
+        for chunk in chunks:
+            chunk_queue.put(chunk)
+        num_chunks = chunk_queue.qsize()
+        num_threads = max(1, min(num_threads, num_chunks))
+        parts = [(_io_part_from_queue, chunk_queue)] * num_threads
+        logger.info(
+            "num_threads = %s ; chunk_size = %s ; num_chunks = %s",
+            num_threads,
+            chunk_size,
+            num_chunks,
+        )
+    else:
+        bytes_per_thread = total_size // num_threads
+
+        ranges = [
+            bytes_range_for_thread(i, num_threads, total_size, bytes_per_thread)
+            for i in range(num_threads)
+        ]
+        parts = [(_io_part, byte_range) for byte_range in ranges]
+
+        logger.info(
+            "num_threads = %s ; bytes_per_thread = %s", num_threads, bytes_per_thread
+        )
 
     queueLength = extra_options.get("queueLength", 0)
     if queueLength > 0:
@@ -392,11 +760,41 @@ def _io_multipart_threaded(
 
     futures = []
     executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_threads)
-    num_threads = min(num_threads, len(ranges))
-    mgr = _Multipart_close_manager(Io, Barrier(num_threads))
+    num_threads = min(num_threads, len(parts))
+
+    def open_secondary_io():
+        return session.data_objects.open(
+            Data_object.path,
+            Operation.data_object_mode(initial_open=False),
+            create=False,
+            finalize_on_close=False,
+            allow_redirect=False,
+            **{
+                kw.NUM_THREADS_KW: str(num_threads),
+                kw.DATA_SIZE_KW: str(total_size),
+                kw.RESC_HIER_STR_KW: hier_str,
+                kw.REPLICA_TOKEN_KW: replica_token,
+            }
+        )
+
+    retries = extra_options.get("retries", 0)
+    mgr = _Multipart_close_manager(
+        Io,
+        Barrier(num_threads),
+        journal,
+        reopen_=open_secondary_io,
+        retries_=retries,
+        errors_=extra_options.get("errors"),
+        detach_initial_=(Operation.isPut() and retries > 0),
+    )
+    if mgr.initial_detached:
+        # A PUT's replica is finalized through the initial descriptor, which cannot be
+        # replaced if its connection fails; so that a failed chunk can always be retried,
+        # the data are written only through secondary handles.
+        Io = None
     counter = 1
     gen_file_handle = lambda: open(
-        fname, Operation.disk_file_mode(initial_open=(counter == 1))
+        fname, Operation.disk_file_mode(initial_open=(counter == 1 and not resuming))
     )
     File = gen_file_handle()
 
@@ -405,30 +803,27 @@ def _io_multipart_threaded(
         "queueObject": queueObject,
     }
 
-    for byte_range in ranges:
+    for part_function, part_argument in parts:
         if Io is None:
-            Io = session.data_objects.open(
-                Data_object.path,
-                Operation.data_object_mode(initial_open=False),
-                create=False,
-                finalize_on_close=False,
-                allow_redirect=False,
-                **{
-                    kw.NUM_THREADS_KW: str(num_threads),
-                    kw.DATA_SIZE_KW: str(total_size),
-                    kw.RESC_HIER_STR_KW: hier_str,
-                    kw.REPLICA_TOKEN_KW: replica_token,
-                }
-            )
+            Io = open_secondary_io()
         mgr.add_io(Io)
         logger.debug("target_host = %s", Io.raw.session.pool.account.host)
         if File is None:
             File = gen_file_handle()
+        span_attributes = {
+            "irods.path": Data_object.path,
+            "irods.host": Io.raw.session.pool.account.host,
+            "irods.resc_hier": hier_str,
+            "irods.operation": "put" if Operation.isPut() else "get",
+            "irods.thread_debug_id": str(counter),
+        }
         futures.append(
             executor.submit(
-                _io_part,
+                tracing.propagating(_traced_part),
+                part_function,
+                span_attributes,
                 Io,
-                byte_range,
+                part_argument,
                 File,
                 Operation,
                 mgr,
@@ -445,6 +840,13 @@ def _io_multipart_threaded(
         else:
             return futures
     else:
+        concurrent.futures.wait(futures)
+        failures = [f.exception() for f in futures if f.exception() is not None]
+        if failures:
+            # Threads released from the exit barrier by another's failure report BrokenBarrierError;
+            # prefer to raise the exception that caused the abort.
+            failures.sort(key=lambda e: isinstance(e, BrokenBarrierError))
+            raise failures[0]
         bytecounts = [f.result() for f in futures]
         return sum(bytecounts), total_size
 
@@ -486,6 +888,50 @@ def io_main(session, Data, opr_, fname, R="", **kwopt):
         num_threads = RECOMMENDED_NUM_THREADS_PER_TRANSFER
     num_threads = max(1, min(multiprocessing.cpu_count(), num_threads))
 
+    if kwopt.get("chunk_size") is None:
+        kwopt["chunk_size"] = client_config.data_objects.parallel_chunk_size
+
+    if kwopt.get("retries") is None:
+        kwopt["retries"] = client_config.data_objects.parallel_transfer_retries
+    if kwopt.get("errors") is None:
+        kwopt["errors"] = []
+
+    # Set up the journal of completed byte ranges, if one was requested. When resuming, a journal
+    # left by an earlier attempt is first checked against what can be known before opening the
+    # data object; the remainder of its identity is checked once the replica has been opened.
+
+    logical_path = d_path or Data.path
+    resume = kwopt.pop("resume", False)
+    journal_path = kwopt.pop("journal", None) or resume
+    if journal_path is True:
+        journal_path = fname + JOURNAL_SUFFIX
+    journal = None
+    if journal_path and resume:
+        journal = _Range_journal.load(journal_path)
+        if journal is not None:
+            usable = journal.matches(
+                operation=("put" if Operation.isPut() else "get"),
+                data_object=logical_path,
+                local_file=os.path.abspath(fname),
+            )
+            if Operation.isPut():
+                local_stat = os.stat(fname)
+                usable = (
+                    usable
+                    and isinstance(Data, iRODSDataObject)
+                    and journal.matches(
+                        size=local_stat.st_size, local_mtime=local_stat.st_mtime
+                    )
+                )
+            else:
+                usable = usable and os.path.isfile(fname)
+            if not usable:
+                logger.warning(
+                    "Transfer journal %r does not match; restarting transfer from the beginning.",
+                    journal_path,
+                )
+                journal = None
+
     open_options = {}
     if Operation.isPut():
         if R:
@@ -493,12 +939,18 @@ def io_main(session, Data, opr_, fname, R="", **kwopt):
             open_options[kw.DEST_RESC_NAME_KW] = R
         open_options[kw.NUM_THREADS_KW] = str(num_threads)
         open_options[kw.DATA_SIZE_KW] = str(total_bytes)
+        if journal is not None:
+            # Write into the same replica as before, without truncating it.
+            open_options[kw.RESC_HIER_STR_KW] = journal.identity["resc_hier"]
+
+    # A resumed PUT must not truncate the data object.
+    initial_mode = Operation.data_object_mode(initial_open=(journal is None))
 
     output_values = {}
     if not Io:
         (Io, rawfile) = session.data_objects.open_with_FileRaw(
-            (d_path or Data.path),
-            Operation.data_object_mode(initial_open=True),
+            logical_path,
+            initial_mode,
             finalize_on_close=True,
             returned_values=output_values,
             **open_options
@@ -508,11 +960,14 @@ def io_main(session, Data, opr_, fname, R="", **kwopt):
             Io[kw.NUM_THREADS_KW] = str(num_threads)
             Io[kw.DATA_SIZE_KW] = str(total_bytes)
             Io["returned_values"] = output_values
+            if journal is not None and Operation.isPut():
+                Io.args = (Io.args[0], initial_mode)
+                Io[kw.RESC_HIER_STR_KW] = open_options[kw.RESC_HIER_STR_KW]
             Io = Io()
         rawfile = Io.raw
 
     if not output_values:
-        output_values = kwopt.get("data_open_returned_values", {})
+        output_values = kwopt.get("data_open_returned_values") or {}
 
     if "session" in output_values:
         session = output_values["session"]
@@ -538,9 +993,44 @@ def io_main(session, Data, opr_, fname, R="", **kwopt):
 
     (replica_token, resc_hier) = rawfile.replica_access_info()
 
+    resuming = False
+    bytes_to_transfer = total_bytes
+    if journal_path:
+        identity = dict(
+            operation=("put" if Operation.isPut() else "get"),
+            data_object=logical_path,
+            local_file=os.path.abspath(fname),
+            size=total_bytes,
+        )
+        if Operation.isPut():
+            identity.update(local_mtime=os.stat(fname).st_mtime, resc_hier=resc_hier)
+        else:
+            identity.update(remote_mtime=str(Data.modify_time))
+        if journal is not None and not journal.matches(**identity):
+            logger.warning(
+                "Transfer journal %r is out of date; restarting transfer from the beginning.",
+                journal_path,
+            )
+            journal = None
+        resuming = journal is not None
+        if journal is None:
+            journal = _Range_journal(
+                journal_path,
+                dict(identity, replica_token=replica_token),
+                kwopt["chunk_size"] or DEFAULT_JOURNAL_CHUNK_SIZE,
+            )
+            journal.save()
+        bytes_to_transfer = sum(len(r) for r in journal.missing_ranges(total_bytes))
+        logger.info(
+            "transfer journal = %r ; resuming = %s ; bytes_to_transfer = %s",
+            journal_path,
+            resuming,
+            bytes_to_transfer,
+        )
+
     queueLength = kwopt.get("queueLength", 0)
 
-    pass_thru_options = ("updatables", "queueLength")
+    pass_thru_options = ("updatables", "queueLength", "chunk_size", "retries", "errors")
     retval = _io_multipart_threaded(
         Operation,
         (Data, Io),
@@ -550,6 +1040,8 @@ def io_main(session, Data, opr_, fname, R="", **kwopt):
         fname,
         total_bytes,
         num_threads=num_threads,
+        journal=journal,
+        resuming=resuming,
         **{k: v for k, v in kwopt.items() if k in pass_thru_options}
     )
 
@@ -568,12 +1060,19 @@ def io_main(session, Data, opr_, fname, R="", **kwopt):
         return AsyncNotify(
             futures,  # individual futures, one per transfer thread
             progress_Queue=chunk_notify_queue,  # for notifying the progress indicator thread
-            total=total_bytes,  # total number of bytes for parallel transfer
+            total=(
+                None if total_bytes is None else bytes_to_transfer
+            ),  # total number of bytes for parallel transfer
             keep_={"mgr": mgr},
         )  # an open raw i/o object needing to be persisted, if any
     else:
         (_bytes_transferred, _bytes_total) = retval
-        return _bytes_transferred == _bytes_total
+        if kwopt["errors"]:
+            logger.warning(
+                "parallel transfer completed after %d failed chunk attempt(s)",
+                len(kwopt["errors"]),
+            )
+        return _bytes_transferred == bytes_to_transfer
 
 
 if __name__ == "__main__":
@@ -636,6 +1135,8 @@ if __name__ == "__main__":
     # kwarg options 'N' (num threads) and 'R' (target resource name) are via command-line
     # kwarg['num_threads'] (overrides 'N' when called as a library)
     # kwarg['target_resource_name'] (overrides 'R' when called as a library)
+    # kwarg['chunk_size'] (if positive, threads share a queue of chunks of this size)
+    # kwarg['retries'] (number of times a failed chunk is re-sent over a new connection)
     if isinstance(ret, AsyncNotify):
         print("waiting on completion...", file=sys.stderr)
         ret.set_transfer_done_callback(
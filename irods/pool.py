@@ -1,12 +1,16 @@
+import collections
+import concurrent.futures
 import contextlib
 import datetime
 import logging
 import threading
+import time
 import os
 import weakref
 
 from irods import DEFAULT_CONNECTION_TIMEOUT
 from irods.connection import Connection
+from irods.exception import ConnectionPoolTimeout
 from irods.ticket import Ticket
 
 logger = logging.getLogger(__name__)
@@ -26,6 +30,8 @@ def attribute_from_return_value(attrname):
 
 DEFAULT_APPLICATION_NAME = "python-irodsclient"
 
+MAX_PREWARM_THREADS = 8
+
 
 def _adjust_timeout_to_pool_default(conn):
     set_timeout = conn.socket.gettimeout()
@@ -35,23 +41,113 @@ def _adjust_timeout_to_pool_default(conn):
     conn.socket.settimeout(desired_value)
 
 
+def _reap_periodically(pool_ref, stop, interval):
+    # The pool is only weakly referenced between passes, so as not to keep it alive.
+    while not stop.wait(interval):
+        pool = pool_ref()
+        if pool is None:
+            return
+        try:
+            pool.reap()
+        except Exception as e:
+            logger.warning("Error in reaping idle connections: %r", e)
+        del pool
+
+
+# Pools are tracked so that the connections they hold can be dropped in a forked child.
+_pools: "weakref.WeakSet[Pool]" = weakref.WeakSet()
+
+
+def _reset_pools_after_fork():
+    for pool in list(_pools):
+        pool._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+class PoolMetrics:
+    """Counts of connection checkouts from a Pool, and of the time spent waiting on them
+    when the pool's size is bounded."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.connections_created = 0
+        self.connections_discarded = 0  # Idle connections found expired, dead, or in excess.
+        self.waits = 0  # Checkouts which found the pool saturated and had to wait.
+        self.timeouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.peak_active = 0
+        self.tls_handshakes = 0
+        self.tls_sessions_reused = 0  # Handshakes which resumed a cached TLS session.
+
+    def record_wait(self, seconds):
+        self.waits += 1
+        self.total_wait_time += seconds
+        self.max_wait_time = max(self.max_wait_time, seconds)
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
 class Pool:
 
     def __init__(
-        self, account, application_name="", connection_refresh_time=-1, session=None
+        self,
+        account,
+        application_name="",
+        connection_refresh_time=-1,
+        session=None,
+        max_size=0,
+        checkout_timeout=None,
+        max_idle_time=None,
+        max_idle_count=None,
+        max_lifetime=None,
+        probe_on_checkout=False,
+        reap_interval=None,
     ):
         """
         Pool( account , application_name='' )
         Create an iRODS connection pool; 'account' is an irods.account.iRODSAccount instance and
         'application_name' specifies the application name as it should appear in an 'ips' listing.
+
+        A positive 'max_size' bounds the number of connections, active and idle, that the pool
+        holds; a checkout beyond that waits, in turn with other waiting threads, for a connection
+        to be released.  ConnectionPoolTimeout is raised if none is released within
+        'checkout_timeout' seconds (None meaning to wait indefinitely).
+
+        Idle connections are discarded, rather than reused, once they have been idle for
+        'max_idle_time' seconds or have existed for 'max_lifetime' seconds; and no more than
+        'max_idle_count' are kept idle.  With 'probe_on_checkout' true, an idle connection is
+        also checked to be alive (see Connection.is_alive) before being reused.  These limits
+        are applied at checkout, and additionally every 'reap_interval' seconds, if given, by a
+        background thread (see reap and start_reaper).
         """
 
         self.set_session_ref(session)
         self._thread_local = threading.local()
         self.account = account
         self._lock = threading.RLock()
+        self._released = threading.Condition(self._lock)
+        self._waiters = collections.deque()
         self.active = set()
         self.idle = set()
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self._reserved = 0  # Connections being opened, counted against max_size.
+        self.max_idle_time = max_idle_time
+        self.max_idle_count = max_idle_count
+        self.max_lifetime = max_lifetime
+        self.probe_on_checkout = probe_on_checkout
+        self._reaper_stop = None
+        self._reap_interval = None
+        # The TLS session of an established connection, with the SSLContext that made it, by
+        # (host, port), to be offered for resumption by the connections made after it.
+        self._tls_sessions = {}
+        _pools.add(self)
+        self.metrics = PoolMetrics()
         self.connection_timeout = DEFAULT_CONNECTION_TIMEOUT
         self.application_name = (
             os.environ.get("spOption", "")
@@ -67,6 +163,9 @@ class Pool:
             self.refresh_connection = False
             self.connection_refresh_time = None
 
+        if reap_interval:
+            self.start_reaper(reap_interval)
+
     @contextlib.contextmanager
     def no_auto_authenticate(self):
         import irods.helpers
@@ -85,42 +184,137 @@ class Pool:
     def _conn(self, conn_):
         setattr(self._thread_local, "_conn", conn_)
 
-    @attribute_from_return_value("_conn")
-    def get_connection(self):
-        new_conn = False
+    @property
+    def saturation(self):
+        """The fraction of max_size taken by active connections (0.0 for an unbounded pool)."""
+        if self.max_size <= 0:
+            return 0.0
+        return len(self.active) / float(self.max_size)
+
+    def _saturated(self):
+        return 0 < self.max_size <= len(self.active) + self._reserved and not self.idle
+
+    def prewarm(self, n, parallel=True, max_threads=MAX_PREWARM_THREADS):
+        """
+        Open and authenticate connections into the idle set until it holds n of them (or the
+        pool holds max_size), so that the first checkouts needn't each wait on that.  With
+        'parallel' true, the connections are opened concurrently, by up to 'max_threads'
+        threads.  The number of connections opened is returned; the first error met in opening
+        any of them is raised once the others are done.
+        """
         with self._lock:
+            count = n - len(self.idle)
+            if self.max_size > 0:
+                count = min(
+                    count,
+                    self.max_size - len(self.active) - len(self.idle) - self._reserved,
+                )
+            if count <= 0:
+                return 0
+            self._reserved += count
+
+        def open_connection():
             try:
-                conn = self.idle.pop()
+                conn = Connection(self, self.account)
+            except BaseException:
+                with self._lock:
+                    self._reserved -= 1
+                    self._released.notify_all()
+                raise
+            with self._lock:
+                self._reserved -= 1
+                self.idle.add(conn)
+                self.metrics.connections_created += 1
+                self._released.notify_all()
+            logger.debug(f"Prewarmed connection with id: {id(conn)}")
 
-                curr_time = datetime.datetime.now()
-                # If 'refresh_connection' flag is True and the connection was
-                # created more than 'connection_refresh_time' seconds ago,
-                # release the connection (as its stale) and create a new one
-                if (
-                    self.refresh_connection
-                    and (curr_time - conn.create_time).total_seconds()
-                    > self.connection_refresh_time
-                ):
-                    logger.debug(
-                        f"Connection with id {id(conn)} was created more than {self.connection_refresh_time} seconds ago. "
-                        "Releasing the connection and creating a new one."
+        errors = []
+        if parallel and count > 1:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(count, max_threads)
+            ) as executor:
+                futures = [executor.submit(open_connection) for _ in range(count)]
+            errors = [f.exception() for f in futures if f.exception() is not None]
+        else:
+            for _ in range(count):
+                try:
+                    open_connection()
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            raise errors[0]
+        return count
+
+    def _wait_for_release(self):
+        # Called with the lock held.  Threads are served in the order of their arrival.
+        begin = time.monotonic()
+        deadline = (
+            None if self.checkout_timeout is None else begin + self.checkout_timeout
+        )
+        token = object()
+        self._waiters.append(token)
+        try:
+            while self._waiters[0] is not token or self._saturated():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.metrics.timeouts += 1
+                    raise ConnectionPoolTimeout(
+                        "No connection was released within {} seconds; all {} are in use.".format(
+                            self.checkout_timeout, self.max_size
+                        )
                     )
-                    # Since calling disconnect() repeatedly is safe, we call disconnect()
-                    # here explicitly, instead of relying on the garbage collector to clean
-                    # up the object and call disconnect(). This makes the behavior of the
-                    # code more predictable as we are not relying on when garbage collector is called
-                    conn.disconnect()
-                    conn = Connection(self, self.account)
+                self._released.wait(remaining)
+        finally:
+            self._waiters.remove(token)
+            self._released.notify_all()
+        self.metrics.record_wait(time.monotonic() - begin)
+
+    @attribute_from_return_value("_conn")
+    def get_connection(self):
+        new_conn = False
+        with self._lock:
+            if self._waiters or self._saturated():
+                self._wait_for_release()
+            while True:
+                try:
+                    conn = self.idle.pop()
+                except KeyError:
+                    # Hold a place for the new connection, which is made without the lock.
+                    self._reserved += 1
                     new_conn = True
-                    logger.debug(f"Created new connection with id: {id(conn)}")
-            except KeyError:
-                conn = Connection(self, self.account)
-                new_conn = True
+                    break
+                reason = self._reason_to_discard(
+                    conn, datetime.datetime.now(), probe=self.probe_on_checkout
+                )
+                if reason is None:
+                    break
                 logger.debug(
-                    f"No connection found in idle set. Created a new connection with id: {id(conn)}"
+                    f"Connection with id {id(conn)} {reason}. "
+                    "Releasing the connection and trying the next idle one."
                 )
+                self.metrics.connections_discarded += 1
+                self._discard(conn)
 
+        if new_conn:
+            try:
+                conn = Connection(self, self.account)
+            except BaseException:
+                with self._lock:
+                    self._reserved -= 1
+                    self._released.notify_all()
+                raise
+            logger.debug(
+                f"No connection found in idle set. Created a new connection with id: {id(conn)}"
+            )
+
+        with self._lock:
+            if new_conn:
+                self._reserved -= 1
             self.active.add(conn)
+            self.metrics.checkouts += 1
+            if new_conn:
+                self.metrics.connections_created += 1
+            self.metrics.peak_active = max(self.metrics.peak_active, len(self.active))
 
             sess = self.session_ref()
             if sess and sess.ticket__ and not sess.ticket_applied.get(conn, False):
@@ -139,19 +333,166 @@ class Pool:
 
         return conn
 
+    def _reason_to_discard(self, conn, now, probe=False):
+        """Return why an idle connection should not be reused, or None if it may be."""
+        age = lambda: (now - conn.create_time).total_seconds()
+        if self.refresh_connection and age() > self.connection_refresh_time:
+            return f"was created more than {self.connection_refresh_time} seconds ago"
+        if self.max_lifetime is not None and age() > self.max_lifetime:
+            return f"has exceeded the maximum lifetime of {self.max_lifetime} seconds"
+        if (
+            self.max_idle_time is not None
+            and (now - conn.last_used_time).total_seconds() > self.max_idle_time
+        ):
+            return f"has been idle for more than {self.max_idle_time} seconds"
+        if probe and not conn.is_alive():
+            return "failed the liveness probe"
+        return None
+
+    def _discard(self, conn):
+        # Since calling disconnect() repeatedly is safe, we call disconnect()
+        # here explicitly, instead of relying on the garbage collector to clean
+        # up the object and call disconnect(). This makes the behavior of the
+        # code more predictable as we are not relying on when garbage collector is called
+        try:
+            if conn.is_alive():
+                conn.disconnect()
+            else:
+                # Nothing is sent on a connection the server has dropped.
+                conn._disconnected = True
+                if conn.socket is not None:
+                    conn.socket.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error in discarding connection with id {id(conn)}: {e!r}")
+
+    def reap(self):
+        """Discard the idle connections which are expired or fail the liveness probe, and
+        those in excess of max_idle_count (the least recently used first).  Return the
+        number discarded."""
+        now = datetime.datetime.now()
+        with self._lock:
+            # The idle connections are probed without the lock, meanwhile taken out of the idle
+            # set but still counted against max_size.
+            candidates = list(self.idle)
+            self.idle.clear()
+            self._reserved += len(candidates)
+        doomed = []
+        try:
+            doomed = [
+                conn
+                for conn in candidates
+                if self._reason_to_discard(conn, now, probe=True) is not None
+            ]
+        finally:
+            with self._lock:
+                self._reserved -= len(candidates)
+                self.idle.update(set(candidates).difference(doomed))
+                if (
+                    self.max_idle_count is not None
+                    and len(self.idle) > self.max_idle_count
+                ):
+                    by_last_use = sorted(self.idle, key=lambda conn: conn.last_used_time)
+                    excess = by_last_use[: len(self.idle) - self.max_idle_count]
+                    self.idle.difference_update(excess)
+                    doomed += excess
+                self.metrics.connections_discarded += len(doomed)
+                self._released.notify_all()
+        for conn in doomed:
+            logger.debug(f"Reaping idle connection with id: {id(conn)}")
+            self._discard(conn)
+        return len(doomed)
+
+    def _record_tls_handshake(self, session_reused):
+        with self._lock:
+            self.metrics.tls_handshakes += 1
+            if session_reused:
+                self.metrics.tls_sessions_reused += 1
+
+    def discard_idle(self):
+        """Close all idle connections, returning their number."""
+        with self._lock:
+            doomed = list(self.idle)
+            self.idle.clear()
+            self.metrics.connections_discarded += len(doomed)
+            self._released.notify_all()
+        for conn in doomed:
+            self._discard(conn)
+        return len(doomed)
+
+    def retire(self):
+        """Keep no more connections idle: those idle now are closed, as is each active one once
+        it is released.  For a pool not to be used further, some of whose connections may still
+        be checked out (for instance, under an open data object)."""
+        with self._lock:
+            self.max_idle_count = 0
+        self.stop_reaper()
+        self.discard_idle()
+
+    def start_reaper(self, interval):
+        """Start a daemon thread calling reap() every 'interval' seconds, until stop_reaper()
+        is called or the pool is garbage-collected."""
+        self.stop_reaper()
+        self._reap_interval = interval
+        self._reaper_stop = stop = threading.Event()
+        threading.Thread(
+            target=_reap_periodically,
+            args=(weakref.ref(self), stop, interval),
+            name="irods-pool-reaper",
+            daemon=True,
+        ).start()
+
+    def stop_reaper(self):
+        if self._reaper_stop is not None:
+            self._reaper_stop.set()
+            self._reaper_stop = None
+            self._reap_interval = None
+
+    def _reset_after_fork(self):
+        """In a forked child, forget the connections inherited from the parent, whose sockets
+        it shares.  They are closed locally without being disconnected, so that the parent may
+        go on using them.  Locks are remade, as another thread may have held them at the fork."""
+        inherited = self.active | self.idle
+        self._lock = threading.RLock()
+        self._released = threading.Condition(self._lock)
+        self._waiters = collections.deque()
+        self._reserved = 0
+        self._thread_local = threading.local()
+        self.active = set()
+        self.idle = set()
+        self.metrics = PoolMetrics()
+        for conn in inherited:
+            conn.abandon()
+        # Threads do not survive a fork.
+        reap_interval, self._reaper_stop = self._reap_interval, None
+        if reap_interval:
+            self.start_reaper(reap_interval)
+
     def release_connection(self, conn, destroy=False):
+        surplus = None
         with self._lock:
             if conn in self.active:
                 self.active.remove(conn)
                 logger.debug(f"Removed connection with id: {id(conn)} from active set")
-                if not destroy:
-                    # If 'refresh_connection' flag is True, update connection's 'last_used_time'
-                    if self.refresh_connection:
-                        conn.last_used_time = datetime.datetime.now()
+                if destroy:
+                    pass
+                elif (
+                    self.max_idle_count is not None
+                    and len(self.idle) >= self.max_idle_count
+                ):
+                    surplus = conn
+                    self.metrics.connections_discarded += 1
+                else:
+                    conn.last_used_time = datetime.datetime.now()
                     self.idle.add(conn)
                     logger.debug(f"Added connection with id: {id(conn)} to idle set")
             elif conn in self.idle and destroy:
                 logger.debug(f"Destroying connection with id: {id(conn)}")
                 self.idle.remove(conn)
+            self._released.notify_all()
+        if surplus is not None:
+            logger.debug(
+                f"Idle set is full; discarding connection with id: {id(surplus)}"
+            )
+            self._discard(surplus)
         logger.debug(f"num active: {len(self.active)}")
         logger.debug(f"num idle: {len(self.idle)}")
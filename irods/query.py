@@ -18,6 +18,7 @@ from irods.message import (
 from irods.api_number import api_number
 from irods.exception import CAT_NO_ROWS_FOUND, MultipleResultsFound, NoResultFound
 from irods.results import ResultSet, SpecificQueryResultSet
+import irods.tracing as tracing
 
 query_number = {
     "ORDER_BY": 0x400,
@@ -61,7 +62,7 @@ class Query:
                 raise TypeError("Arguments must be models or columns")
 
     def _clone(self):
-        new_q = Query(self.sess)
+        new_q = type(self)(self.sess)
         new_q.columns = self.columns
         new_q.criteria = self.criteria
         new_q.case_sensitive = self.case_sensitive
@@ -210,7 +211,10 @@ class Query:
         return GenQueryRequest(**args)
 
     def execute(self):
-        with self.sess.pool.get_connection() as conn:
+        with tracing.span(
+            "irods.query.page",
+            {"irods.api": "GEN_QUERY_AN", "irods.continue_index": self._continue_index},
+        ) as span, self.sess.pool.get_connection() as conn:
 
             message_body = self._message()
             message = iRODSMessage(
@@ -224,6 +228,7 @@ class Query:
                 result_set = ResultSet(results)
             except CAT_NO_ROWS_FOUND:
                 result_set = ResultSet(empty_gen_query_out(list(self.columns.keys())))
+            span.set_attribute("irods.rows", len(result_set))
         return result_set
 
     def close(self):
@@ -1,5 +1,6 @@
 import ast
 import atexit
+import collections
 import copy
 import errno
 import json
@@ -7,6 +8,7 @@ import logging
 from numbers import Number
 import os
 import threading
+import time
 import weakref
 import irods.auth
 from irods.query import Query
@@ -51,6 +53,23 @@ with _sessions_lock:
     )
 
 
+def _reset_after_fork_in_child():
+    # Inherited data object handles are unusable here, their connections being dropped by the
+    # pools (see irods.pool); they are marked closed so that neither their finalizers nor the
+    # cleanup at exit will try to close them with the server.
+    global _fds_lock, _sessions_lock
+    _fds_lock = threading.Lock()
+    _sessions_lock = threading.Lock()
+    for fd in list((_fds or {}).keys()):
+        raw = getattr(fd, "raw", None)
+        if raw is not None and not raw.closed:
+            raw._abandon()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork_in_child)
+
+
 def _weakly_reference(ses):
     global _sessions, _fds
     try:
@@ -111,6 +130,10 @@ class iRODSSession:
         self.numThreads = 0
         self._env_file = ""
         self._auth_file = ""
+        self.redirect_cache_size = kwargs.pop("redirect_cache_size", 8)
+        self.redirect_cache_idle_time = kwargs.pop("redirect_cache_idle_time", 300)
+        self._redirect_sessions = collections.OrderedDict()
+        self._redirect_sessions_lock = threading.Lock()
         self.do_configure = kwargs if configure else {}
         self._cached_connection_timeout = None
         self.connection_timeout = kwargs.pop(
@@ -142,6 +165,11 @@ class iRODSSession:
         if auto_cleanup:
             _weakly_reference(self)
 
+        # Connections are opened only now, as authentication consults the options set above.
+        prewarm = int(kwargs.get("pool_prewarm", 0))
+        if configure and prewarm > 0:
+            self.pool.prewarm(prewarm)
+
     def __enter__(self):
         return self
 
@@ -170,6 +198,8 @@ class iRODSSession:
     def clone(self, **kwargs):
         other = copy.copy(self)
         other.pool = None
+        other._redirect_sessions = collections.OrderedDict()
+        other._redirect_sessions_lock = threading.Lock()
         for k, v in vars(self).items():
             if getattr(v, "_set_manager_session", None) is not None:
                 vcopy = copy.copy(v)
@@ -188,8 +218,45 @@ class iRODSSession:
             _weakly_reference(other)
         return other
 
+    def _redirect_session(self, host):
+        """Return a session for the redirection of data object opens to the given server host.
+
+        Sessions are cached by host, port, and account, so that later redirects to the same
+        server reuse their pooled, already authenticated connections.  No more than
+        redirect_cache_size are kept, the least recently used being evicted first, as are those
+        unused for redirect_cache_idle_time seconds.  An evicted session's pool is retired: its
+        idle connections are closed, and those still active (for instance, under an open data
+        object) are closed as they are released.
+        """
+        if self.redirect_cache_size <= 0:
+            return self.clone(host=host)
+        key = (host, self.port, self.username, self.zone, self.ticket__)
+        now = time.monotonic()
+        with self._redirect_sessions_lock:
+            cache = self._redirect_sessions
+            entry = cache.pop(key, None)
+            sess = entry[0] if entry is not None else self.clone(host=host)
+            evicted = [
+                cache.pop(k)[0]
+                for k, (_, last_used) in list(cache.items())
+                if now - last_used > self.redirect_cache_idle_time
+            ]
+            while len(cache) >= self.redirect_cache_size:
+                evicted.append(cache.popitem(last=False)[1][0])
+            cache[key] = (sess, now)
+        for other in evicted:
+            logger.debug("Evicting cached redirect session for host %s", other.host)
+            other.pool.retire()
+        return sess
+
     def cleanup(self, new_host=""):
+        with self._redirect_sessions_lock:
+            redirect_sessions = [sess for sess, _ in self._redirect_sessions.values()]
+            self._redirect_sessions.clear()
+        for sess in redirect_sessions:
+            sess.cleanup()
         if self.pool:
+            self.pool.stop_reaper()
             for conn in self.pool.active | self.pool.idle:
                 try:
                     conn.disconnect()
@@ -288,6 +355,13 @@ class iRODSSession:
             application_name=kwargs.pop("application_name", ""),
             connection_refresh_time=connection_refresh_time,
             session=self,
+            max_size=int(kwargs.get("pool_max_size", 0)),
+            checkout_timeout=kwargs.get("pool_checkout_timeout"),
+            max_idle_time=kwargs.get("pool_max_idle_time"),
+            max_idle_count=kwargs.get("pool_max_idle_count"),
+            max_lifetime=kwargs.get("pool_max_lifetime"),
+            probe_on_checkout=kwargs.get("pool_probe_on_checkout", False),
+            reap_interval=kwargs.get("pool_reap_interval"),
         )
         conn_timeout = getattr(self, "_cached_connection_timeout", None)
         self.pool.connection_timeout = conn_timeout
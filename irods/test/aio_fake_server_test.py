@@ -0,0 +1,142 @@
+#! /usr/bin/env python
+
+import asyncio
+import os
+import sys
+import unittest
+
+import irods.exception as ex
+from irods.aio import AsyncSession
+from irods.meta import iRODSMeta
+from irods.models import Collection, DataObject
+from irods.test.fake_server import FakeServer
+
+
+class TestAsyncSessionWithFakeServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer().start()
+        self.home = self.server.home
+
+    def tearDown(self):
+        self.server.stop()
+
+    def async_session(self, **options):
+        account = dict(
+            host=self.server.host,
+            port=self.server.port,
+            user=self.server.user,
+            zone=self.server.zone,
+            password=self.server.passwords[self.server.user],
+        )
+        account.update(options)
+        return AsyncSession(**account)
+
+    def test_connect_and_authenticate(self):
+        async def connect():
+            async with self.async_session() as sess:
+                return sess.server_version, len(sess.pool.idle)
+
+        self.assertEqual(asyncio.run(connect()), ((4, 2, 12), 1))
+        self.assertEqual(self.server.api_counts["AUTH_REQUEST_AN"], 1)
+        self.assertEqual(self.server.api_counts["AUTH_RESPONSE_AN"], 1)
+
+    def test_negotiated_connection(self):
+        async def connect():
+            async with self.async_session(
+                client_server_negotiation="request_server_negotiation",
+                client_server_policy="CS_NEG_REFUSE",
+            ) as sess:
+                return sess.server_version
+
+        self.assertEqual(asyncio.run(connect()), (4, 2, 12))
+
+    def test_wrong_password_is_refused(self):
+        sess = self.async_session(password="wrong")
+        with self.assertRaises(ex.CAT_INVALID_AUTHENTICATION):
+            asyncio.run(sess.connect())
+        # The failed connection is not kept, nor counted against the pool's size.
+        self.assertEqual(
+            (sess.pool.active, sess.pool.idle, sess.pool._opening), (set(), [], 0)
+        )
+
+    def test_checkout_timeout(self):
+        async def checkouts():
+            async with self.async_session(
+                pool_max_size=1, pool_checkout_timeout=0.1
+            ) as sess:
+                pool = sess.pool
+                held = await pool.get_connection()
+                with self.assertRaises(ex.ConnectionPoolTimeout):
+                    await pool.get_connection()
+                await pool.release_connection(held)
+                # The timed-out checkout has left the queue, and the pool can be used again.
+                self.assertIs(await pool.get_connection(), held)
+                await pool.release_connection(held)
+                return pool.metrics.timeouts, pool.metrics.connections_created
+
+        self.assertEqual(asyncio.run(checkouts()), (1, 1))
+
+    def test_query_metadata_and_data_object_round_trip(self):
+        content = os.urandom(300 * 1024 + 17)
+        path = self.home + "/aio.dat"
+        avu = iRODSMeta("aio_attr", "aio_value", "aio_units")
+
+        async def round_trip():
+            async with self.async_session() as sess:
+                home = (
+                    await sess.query(Collection.name)
+                    .filter(Collection.name == self.home)
+                    .one()
+                )
+                async with await sess.data_objects.open(path, "w") as f:
+                    await f.write(content)
+                async with await sess.data_objects.open(path, "r") as f:
+                    await f.seek(1024)
+                    tail = await f.read()
+                await sess.metadata.add(DataObject, path, avu)
+                added = await sess.metadata.get(DataObject, path)
+                await sess.metadata.remove(DataObject, path, avu)
+                removed = await sess.metadata.get(DataObject, path)
+                return home[Collection.name], tail, added, removed
+
+        home, tail, added, removed = asyncio.run(round_trip())
+        self.assertEqual(home, self.home)
+        self.assertEqual(tail, content[1024:])
+        self.assertEqual(
+            [(m.name, m.value, m.units) for m in added],
+            [(avu.name, avu.value, avu.units)],
+        )
+        self.assertEqual(removed, [])
+        with self.server.session() as sess:
+            with sess.data_objects.open(path, "r") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_checkouts_are_served_in_order_of_arrival(self):
+        async def checkouts():
+            async with self.async_session(pool_max_size=1) as sess:
+                pool = sess.pool
+                order = []
+
+                async def checkout(name):
+                    conn = await pool.get_connection()
+                    order.append(name)
+                    await pool.release_connection(conn)
+
+                held = await pool.get_connection()
+                waiting = asyncio.ensure_future(checkout("waiting"))
+                await asyncio.sleep(0.1)
+                await pool.release_connection(held)
+                # A checkout made just as the connection is released, before the waiting
+                # coroutine has run again, must not take the connection from it.
+                await checkout("late")
+                await waiting
+                return order
+
+        self.assertEqual(asyncio.run(checkouts()), ["waiting", "late"])
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
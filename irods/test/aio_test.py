@@ -0,0 +1,101 @@
+#! /usr/bin/env python
+
+import asyncio
+import os
+import sys
+import unittest
+
+from irods import env_filename_from_keyword_args
+from irods.aio import AsyncSession
+from irods.meta import iRODSMeta
+from irods.models import Collection, DataObject
+import irods.test.helpers as helpers
+
+
+def make_async_session(**kwargs):
+    env_file = env_filename_from_keyword_args(kwargs)
+    return AsyncSession(irods_env_file=env_file, **kwargs)
+
+
+class TestAsyncSession(unittest.TestCase):
+
+    def setUp(self):
+        self.sess = helpers.make_session()
+        if self.sess.pool.account.authentication_scheme != "native":
+            self.sess.cleanup()
+            self.skipTest("Asyncio sessions authenticate only by the native scheme.")
+        self.home = helpers.home_collection(self.sess)
+        self.obj_path = "{}/aio_test_object".format(self.home)
+
+    def tearDown(self):
+        if self.sess.data_objects.exists(self.obj_path):
+            self.sess.data_objects.unlink(self.obj_path, force=True)
+        self.sess.cleanup()
+
+    def test_query_home_collection(self):
+        async def query():
+            async with make_async_session() as sess:
+                return await sess.query(Collection.name).filter(
+                    Collection.name == self.home
+                ).one()
+
+        self.assertEqual(asyncio.run(query())[Collection.name], self.home)
+
+    def test_metadata_add_get_remove(self):
+        helpers.make_object(self.sess, self.obj_path)
+        avu = iRODSMeta("aio_test_attr", "aio_test_value", "aio_test_units")
+
+        async def metadata():
+            async with make_async_session() as sess:
+                await sess.metadata.add(DataObject, self.obj_path, avu)
+                added = await sess.metadata.get(DataObject, self.obj_path)
+                await sess.metadata.remove(DataObject, self.obj_path, avu)
+                return added, await sess.metadata.get(DataObject, self.obj_path)
+
+        (added, removed) = asyncio.run(metadata())
+        self.assertEqual(
+            [(m.name, m.value, m.units) for m in added],
+            [(avu.name, avu.value, avu.units)],
+        )
+        self.assertEqual(removed, [])
+        self.assertEqual(self.sess.metadata.get(DataObject, self.obj_path), [])
+
+    def test_data_object_write_and_read(self):
+        content = os.urandom(3 * 1024**2 + 17)
+
+        async def write_and_read():
+            async with make_async_session() as sess:
+                async with await sess.data_objects.open(self.obj_path, "w") as f:
+                    await f.write(content)
+                async with await sess.data_objects.open(self.obj_path, "r") as f:
+                    await f.seek(1024)
+                    return await f.read()
+
+        self.assertEqual(asyncio.run(write_and_read()), content[1024:])
+        with self.sess.data_objects.open(self.obj_path, "r") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_concurrent_queries_within_pool_bound(self):
+        async def queries():
+            async with make_async_session(pool_max_size=2) as sess:
+                results = await asyncio.gather(
+                    *(
+                        sess.query(Collection.name)
+                        .filter(Collection.name == self.home)
+                        .all()
+                        for _ in range(10)
+                    )
+                )
+                return results, sess.pool.metrics.connections_created
+
+        (results, connections_created) = asyncio.run(queries())
+        self.assertEqual(
+            [[row[Collection.name] for row in r] for r in results], [[self.home]] * 10
+        )
+        self.assertLessEqual(connections_created, 2)
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
@@ -0,0 +1,9 @@
+#  Microbenchmarks for the hot paths of the client library.  They need no iRODS server, and
+#  each module can be run as a script, eg:
+#
+#      $ python -m irods.test.bench.message_send
+#
+#  The whole suite, including data transfers against a local stand-in server, is run with
+#  results written as JSON (see irods.test.bench.suite):
+#
+#      $ python -m irods.test.bench --output results.json
@@ -0,0 +1,5 @@
+import sys
+
+from irods.test.bench.suite import main
+
+main(sys.argv[1:])
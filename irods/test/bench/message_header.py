@@ -0,0 +1,63 @@
+"""
+Compare the per-message cost of decoding a MsgHeader_PI with the dedicated decoder, against
+doing so with each of the XML parsers selectable for the iRODS protocol.
+
+    $ python -m irods.test.bench.message_header [iterations]
+"""
+
+import sys
+import timeit
+
+from irods.message import (
+    ET,
+    XML_Parser_Type,
+    _decode_msg_header,
+)
+
+HEADER = b"""<MsgHeader_PI>
+<type>RODS_API_REPLY</type>
+<msgLen>127</msgLen>
+<errorLen>0</errorLen>
+<bsLen>0</bsLen>
+<intInfo>0</intInfo>
+</MsgHeader_PI>
+"""
+
+
+def decode_with_parser(rsp_header):
+    xml_root = ET().fromstring(rsp_header)
+    return (
+        xml_root.find("type").text,
+        int(xml_root.find("msgLen").text),
+        int(xml_root.find("errorLen").text),
+        int(xml_root.find("bsLen").text),
+        int(xml_root.find("intInfo").text),
+    )
+
+
+def microseconds_per_header(function, iterations):
+    return timeit.timeit(lambda: function(HEADER), number=iterations) * 1e6 / iterations
+
+
+def main(argv):
+    iterations = int(argv[0]) if argv else 100000
+    results = {}
+    try:
+        for parser in (
+            XML_Parser_Type.STANDARD_XML,
+            XML_Parser_Type.QUASI_XML,
+            XML_Parser_Type.SECURE_XML,
+        ):
+            ET(parser)
+            results[parser.name] = microseconds_per_header(
+                decode_with_parser, iterations
+            )
+    finally:
+        ET(None)
+    results["dedicated"] = microseconds_per_header(_decode_msg_header, iterations)
+    for name, value in results.items():
+        print("{:>14}: {:.2f} us per header".format(name, value))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,102 @@
+"""
+Compare the per-message cost of packing and unpacking common request and response types by
+way of the specialized (compiled) functions of each Message class, against the general
+implementation walking the class's properties.
+
+    $ python -m irods.test.bench.message_pack [iterations]
+"""
+
+import sys
+import timeit
+
+from irods.helpers import temporarily_assign_attribute
+from irods.message import (
+    ET,
+    GenQueryRequest,
+    GenQueryResponse,
+    GenQueryResponseColumn,
+    IntegerIntegerMap,
+    IntegerStringMap,
+    Message,
+    MetadataRequest,
+    OpenedDataObjRequest,
+    StringStringMap,
+)
+
+
+def sample_messages():
+    return {
+        "OpenedDataObjRequest": OpenedDataObjRequest(
+            l1descInx=3,
+            len=4194304,
+            whence=0,
+            oprType=0,
+            offset=0,
+            bytesWritten=0,
+            KeyValPair_PI=StringStringMap(),
+        ),
+        "GenQueryRequest": GenQueryRequest(
+            maxRows=500,
+            continueInx=0,
+            partialStartIndex=0,
+            options=0,
+            KeyValPair_PI=StringStringMap(),
+            InxIvalPair_PI=IntegerIntegerMap({401: 1, 403: 1, 407: 1, 408: 1}),
+            InxValPair_PI=IntegerStringMap({501: "= '/tempZone/home/rods'"}),
+        ),
+        "MetadataRequest": MetadataRequest(
+            "add", "-d", "/tempZone/home/rods/file.dat", "attr", "value", "units"
+        ),
+        "GenQueryResponse": GenQueryResponse(
+            rowCnt=500,
+            attriCnt=4,
+            continueInx=1,
+            totalRowCount=0,
+            SqlResult_PI=[
+                GenQueryResponseColumn(
+                    attriInx=attr, reslen=64, value=["row %d" % i for i in range(500)]
+                )
+                for attr in (401, 403, 407, 408)
+            ],
+        ),
+    }
+
+
+def microseconds_per_call(function, iterations):
+    return timeit.timeit(function, number=iterations) * 1e6 / iterations
+
+
+def timings(message, iterations):
+    cls = type(message)
+    root = ET().fromstring(message.pack())
+    return (
+        microseconds_per_call(message.pack, iterations),
+        microseconds_per_call(lambda: cls().unpack(root), iterations),
+    )
+
+
+def main(argv):
+    iterations = int(argv[0]) if argv else 20000
+    print(
+        "{:>22} {:>10} {:>10} {:>12} {:>12}".format(
+            "(microseconds)", "pack", "compiled", "unpack", "compiled"
+        )
+    )
+    for name, message in sample_messages().items():
+        n = iterations if name != "GenQueryResponse" else max(1, iterations // 100)
+        compiled = timings(message, n)
+        # Submessages are packed and unpacked by calling their own pack and unpack methods, so
+        # those are replaced throughout to time the general implementation.
+        with temporarily_assign_attribute(
+            Message, "pack", Message._generic_pack
+        ), temporarily_assign_attribute(Message, "unpack", Message._generic_unpack):
+            generic = timings(message, n)
+        print(
+            "{:>22} {:>10.2f} {:>10.2f} {:>12.2f} {:>12.2f}".format(
+                name, generic[0], compiled[0], generic[1], compiled[1]
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,96 @@
+"""
+Compare the CPU time spent by the sender of DATA_OBJ_WRITE requests when the message is
+packed into one bytes object and sent (the former path, which also made a copy of any
+memoryview payload), versus when its segments are handed separately to the socket.
+
+    $ python -m irods.test.bench.message_send [total_MiB [chunk_MiB]]
+
+CPU time is measured for the sending thread only; a second thread drains the socket.
+"""
+
+import socket
+import sys
+import threading
+import time
+
+from irods.api_number import api_number
+from irods.message import (
+    iRODSMessage,
+    OpenedDataObjRequest,
+    StringStringMap,
+    _send_message_segments,
+)
+
+MEBI = 1024**2
+
+
+def _write_request(payload):
+    return iRODSMessage(
+        "RODS_API_REQ",
+        msg=OpenedDataObjRequest(
+            l1descInx=3,
+            len=len(payload),
+            whence=0,
+            oprType=0,
+            offset=0,
+            bytesWritten=0,
+            KeyValPair_PI=StringStringMap(),
+        ),
+        bs=payload,
+        int_info=api_number["DATA_OBJ_WRITE_AN"],
+    )
+
+
+def send_joined(sock, payload):
+    sock.sendall(_write_request(payload.tobytes()).pack())
+
+
+def send_segments(sock, payload):
+    _send_message_segments(sock, _write_request(payload).pack_segments())
+
+
+def _drain(sock):
+    buf = bytearray(MEBI)
+    while sock.recv_into(buf):
+        pass
+
+
+def cpu_seconds_per_gib(send_function, total_bytes, chunk_size):
+    """Return the sending thread's CPU time, scaled to a GiB of payload."""
+    sender, receiver = socket.socketpair()
+    drain_thread = threading.Thread(target=_drain, args=(receiver,))
+    drain_thread.start()
+    payload = memoryview(bytearray(chunk_size))
+    try:
+        begin = time.thread_time()
+        for _ in range(total_bytes // chunk_size):
+            send_function(sender, payload)
+        cpu = time.thread_time() - begin
+    finally:
+        sender.close()
+        drain_thread.join()
+        receiver.close()
+    return cpu * (1024**3) / total_bytes
+
+
+def main(argv):
+    total_bytes = int(argv[0] if argv else 1024) * MEBI
+    chunk_size = int(argv[1] if len(argv) > 1 else 4) * MEBI
+    results = {
+        name: cpu_seconds_per_gib(function, total_bytes, chunk_size)
+        for name, function in (
+            ("joined", send_joined),
+            ("segments", send_segments),
+        )
+    }
+    for name, value in results.items():
+        print("{:>10}: {:.3f} CPU seconds per GiB".format(name, value))
+    print(
+        "{:>10}: {:.3f} CPU seconds per GiB".format(
+            "saved", results["joined"] - results["segments"]
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,46 @@
+"""
+Compare the per-call cost of serializing a DATA_OBJ_READ request by building and packing an
+OpenedDataObjRequest, against filling in the pre-serialized template used by Connection.
+
+    $ python -m irods.test.bench.request_template [iterations]
+"""
+
+import sys
+import timeit
+
+from irods.api_number import api_number
+from irods.connection import _OPENED_DATA_OBJECT_REQUESTS
+from irods.message import iRODSMessage, OpenedDataObjRequest, StringStringMap
+
+
+def build_and_pack(desc, size):
+    return iRODSMessage(
+        "RODS_API_REQ",
+        msg=OpenedDataObjRequest(
+            l1descInx=desc,
+            len=size,
+            whence=0,
+            oprType=0,
+            offset=0,
+            bytesWritten=0,
+            KeyValPair_PI=StringStringMap(),
+        ),
+        int_info=api_number["DATA_OBJ_READ_AN"],
+    ).pack_segments()
+
+
+def from_template(desc, size):
+    return _OPENED_DATA_OBJECT_REQUESTS["DATA_OBJ_READ_AN"](
+        l1descInx=desc, len=size, whence=0, offset=0
+    ).pack_segments()
+
+
+def main(argv):
+    iterations = int(argv[0]) if argv else 100000
+    for name, function in (("message", build_and_pack), ("template", from_template)):
+        seconds = timeit.timeit(lambda: function(3, 65536), number=iterations)
+        print("{:>10}: {:.2f} us per request".format(name, seconds * 1e6 / iterations))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
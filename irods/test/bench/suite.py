@@ -0,0 +1,420 @@
+"""
+Run the benchmarks of the client's hot paths as one suite, writing the results as JSON so
+that they can be compared across releases.
+
+    $ python -m irods.test.bench [--quick] [--repeat N] [--select REGEX] [--output FILE]
+
+No iRODS server is needed: data transfers are made against irods.test.fake_server.FakeServer,
+to which a simulated latency and bandwidth may be given.
+
+The output is an object with these members, whose names and meanings are kept stable (a
+change to either increments FORMAT_VERSION):
+
+    format_version  the version of this layout
+    environment     the client version, Python version and implementation, platform, and CPU count
+    parameters      the options with which the suite was run
+    results         an object keyed by benchmark name, each value having
+                      unit        "seconds", the unit of the following values
+                      per_call    the time per call measured in each repetition
+                      best        the least of those times
+                      median      their median
+                      iterations  the number of calls timed in each repetition
+                    and, for data transfers,
+                      bytes       the size of the data object
+                      threads     the number of transfer threads requested
+                      MiB_per_second  the throughput, from the best time
+
+Benchmark names are dotted, the first part naming the group:
+
+    message.pack.<class>, message.unpack.<class>    serialization of common messages
+    recv.<response>                                 framing of responses by iRODSMessage.recv
+    xml.<parser>.<document>                         parsing by each of the XML parser variants
+    results.result_set_500_rows                     ResultSet construction for a page of rows
+    path.<case>                                     iRODSPath normalization
+    transfer.{put,get}.{single,multi}_thread        data transfers to and from a local server
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import timeit
+
+import irods
+from irods.message import (
+    ET,
+    FileSeekResponse,
+    GenQueryResponse,
+    GenQueryResponseColumn,
+    XML_Parser_Type,
+    _Buffered_socket_reader,
+    iRODSMessage,
+)
+from irods.models import DataObject
+from irods.path import iRODSPath
+from irods.results import ResultSet
+from irods.test.bench.message_header import HEADER
+from irods.test.bench.message_pack import sample_messages
+from irods.test.fake_server import FakeServer
+
+FORMAT_VERSION = 1
+
+MEBI = 1024**2
+
+
+class _Case:
+    """A benchmark: `function' is called `iterations' times in each repetition, after a call
+    to `prepare' (if given) which is not timed."""
+
+    def __init__(self, name, function, iterations, prepare=None, **extra):
+        self.name = name
+        self.function = function
+        self.iterations = iterations
+        self.prepare = prepare
+        self.extra = extra
+
+
+class _Repeating_socket:
+    """Stands in for a socket from which the same bytes can be received over and over."""
+
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    def recv_into(self, buffer, nbytes=0, flags=0):
+        view = memoryview(buffer)[: nbytes or None]
+        received = self._stream.readinto(view)
+        if received == 0:
+            self._stream.seek(0)
+            received = self._stream.readinto(view)
+        return received
+
+    def recv(self, size, flags=0):
+        data = self._stream.read(size)
+        if not data:
+            self._stream.seek(0)
+            data = self._stream.read(size)
+        return data
+
+    def gettimeout(self):
+        return None
+
+
+def _result_page(rows=500):
+    """A page of general query results, as for the listing of a collection's data objects."""
+    columns = [c for c in DataObject._columns if c.min_version <= (4, 3, 0)]
+    sample_values = {
+        "D_DATA_ID": "10{:06d}",
+        "D_COLL_ID": "10000",
+        "DATA_NAME": "data_object_{:06d}.dat",
+        "DATA_SIZE": "{:d}",
+        "D_CREATE_TIME": "01700000000",
+        "D_MODIFY_TIME": "01700000000",
+        "D_DATA_PATH": "/var/lib/irods/Vault/home/rods/data_object_{:06d}.dat",
+    }
+    return GenQueryResponse(
+        rowCnt=rows,
+        attriCnt=len(columns),
+        continueInx=1,
+        totalRowCount=0,
+        SqlResult_PI=[
+            GenQueryResponseColumn(
+                attriInx=column.icat_id,
+                reslen=64,
+                value=[
+                    sample_values.get(column.icat_key, "0").format(i)
+                    for i in range(rows)
+                ],
+            )
+            for column in columns
+        ],
+    )
+
+
+def message_cases(options, resources):
+    for name, message in sample_messages().items():
+        iterations = options.iterations // (100 if name == "GenQueryResponse" else 1)
+        root = ET().fromstring(message.pack())
+        cls = type(message)
+        yield _Case("message.pack." + name, message.pack, max(1, iterations))
+        yield _Case(
+            "message.unpack." + name,
+            lambda cls=cls, root=root: cls().unpack(root),
+            max(1, iterations),
+        )
+
+
+def recv_cases(options, resources):
+    responses = {
+        "seek_response": iRODSMessage(
+            "RODS_API_REPLY", msg=FileSeekResponse(offset=65536)
+        ),
+        "query_page_500_rows": iRODSMessage("RODS_API_REPLY", msg=_result_page()),
+        "read_response_4MiB": iRODSMessage(
+            "RODS_API_REPLY", bs=b"\0" * (4 * MEBI), int_info=4 * MEBI
+        ),
+    }
+    for name, response in responses.items():
+        reader = _Buffered_socket_reader(_Repeating_socket(response.pack()))
+        iterations = options.iterations if name == "seek_response" else 100
+        yield _Case(
+            "recv." + name,
+            lambda reader=reader: iRODSMessage.recv(reader),
+            max(1, iterations // (10 if options.quick else 1)),
+        )
+
+
+def xml_cases(options, resources):
+    documents = {
+        "message_header": (HEADER, None),
+        "query_page_500_rows": (_result_page().pack(), GenQueryResponse),
+    }
+    for parser in (
+        XML_Parser_Type.STANDARD_XML,
+        XML_Parser_Type.QUASI_XML,
+        XML_Parser_Type.SECURE_XML,
+    ):
+        for name, (document, cls) in documents.items():
+
+            def parse(parser=parser, document=document, cls=cls):
+                root = ET(parser).fromstring(document)
+                if cls is not None:
+                    cls().unpack(root)
+
+            iterations = options.iterations // (1 if cls is None else 200)
+            if parser is XML_Parser_Type.QUASI_XML and cls is not None:
+                iterations = 1  # This parser takes seconds over a full page of results.
+            yield _Case(
+                "xml.{}.{}".format(parser.name, name), parse, max(1, iterations)
+            )
+    ET(None)
+
+
+def result_set_cases(options, resources):
+    page = _result_page()
+    yield _Case(
+        "results.result_set_500_rows",
+        lambda: ResultSet(page),
+        max(1, options.iterations // 1000),
+    )
+
+
+def path_cases(options, resources):
+    paths = {
+        "normalized": (("/tempZone/home/rods/collection/data_object.dat",), True),
+        "redundant_elements": (
+            ("/tempZone//home/./rods/", "collection/../other/", "x.dat"),
+            True,
+        ),
+        "relative": (("../collection/sub", "../data_object.dat"), False),
+    }
+    for name, (elements, absolute) in paths.items():
+        yield _Case(
+            "path." + name,
+            lambda e=elements, a=absolute: iRODSPath(*e, absolute=a),
+            options.iterations,
+        )
+
+
+class _Transfer_fixture:
+    """A local server with a session, a local file, and a data object to transfer, made ready
+    only if a transfer benchmark is to be run."""
+
+    def __init__(self, options, resources):
+        self.options = options
+        self.resources = resources
+        self.size = options.transfer_mib * MEBI
+        self.session = None
+        self._serial = iter(range(sys.maxsize))
+
+    def prepare(self):
+        if self.session is not None:
+            return
+        server = self.resources.enter_context(
+            FakeServer(latency=self.options.latency, bandwidth=self.options.bandwidth)
+        )
+        self.home = server.home
+        self.session = self.resources.enter_context(server.session())
+        directory = self.resources.enter_context(tempfile.TemporaryDirectory())
+        self.local_file = os.path.join(directory, "transfer.dat")
+        with open(self.local_file, "wb") as f:
+            f.write(os.urandom(self.size))
+        self.downloaded = os.path.join(directory, "downloaded.dat")
+        self.source = self.home + "/transfer_source.dat"
+        self.session.data_objects.put(self.local_file, self.source, num_threads=1)
+
+    def put(self, threads):
+        path = "{}/transfer_{}.dat".format(self.home, next(self._serial))
+        if threads == 1:
+            self.session.data_objects.put(self.local_file, path, num_threads=1)
+        else:
+            self.session.data_objects.parallel_put(
+                self.local_file, path, total_bytes=self.size, num_threads=threads
+            )
+        self.session.data_objects.unlink(path)
+
+    def get(self, threads):
+        if threads == 1:
+            self.session.data_objects.get(
+                self.source, self.downloaded, num_threads=1, forceFlag=""
+            )
+        else:
+            self.session.data_objects.parallel_get(
+                self.source, self.downloaded, num_threads=threads
+            )
+
+
+def transfer_cases(options, resources):
+    fixture = _Transfer_fixture(options, resources)
+    for operation in (fixture.put, fixture.get):
+        for label, threads in (("single_thread", 1), ("multi_thread", options.threads)):
+            yield _Case(
+                "transfer.{}.{}".format(operation.__name__, label),
+                lambda operation=operation, threads=threads: operation(threads),
+                1,
+                prepare=fixture.prepare,
+                bytes=fixture.size,
+                threads=threads,
+            )
+
+
+GROUPS = (
+    message_cases,
+    recv_cases,
+    xml_cases,
+    result_set_cases,
+    path_cases,
+    transfer_cases,
+)
+
+
+def measure(case, repeat):
+    if case.prepare is not None:
+        case.prepare()
+    per_call = [
+        seconds / case.iterations
+        for seconds in timeit.Timer(case.function).repeat(repeat, case.iterations)
+    ]
+    result = dict(
+        unit="seconds",
+        per_call=per_call,
+        best=min(per_call),
+        median=statistics.median(per_call),
+        iterations=case.iterations,
+    )
+    result.update(case.extra)
+    if "bytes" in case.extra:
+        result["MiB_per_second"] = case.extra["bytes"] / MEBI / result["best"]
+    return result
+
+
+def environment():
+    return dict(
+        client_version=irods.__version__,
+        python_version=platform.python_version(),
+        python_implementation=platform.python_implementation(),
+        platform=platform.platform(),
+        cpu_count=multiprocessing.cpu_count(),
+    )
+
+
+def run(options, log=None):
+    pattern = re.compile(options.select or "")
+    results = {}
+    with contextlib.ExitStack() as resources:
+        for group in GROUPS:
+            for case in group(options, resources):
+                if not pattern.search(case.name):
+                    continue
+                if options.list:
+                    print(case.name)
+                    continue
+                results[case.name] = measure(case, options.repeat)
+                if log:
+                    log.write(
+                        "{:<50} {:>14.3f} us\n".format(
+                            case.name, results[case.name]["best"] * 1e6
+                        )
+                    )
+    parameters = {
+        k: v for k, v in sorted(vars(options).items()) if k not in ("list", "output")
+    }
+    return dict(
+        format_version=FORMAT_VERSION,
+        environment=environment(),
+        parameters=parameters,
+        results=results,
+    )
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m irods.test.bench",
+        description="Benchmark the client's hot paths, writing the results as JSON.",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="use fewer iterations and less data"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="repetitions of each benchmark"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=None,
+        help="calls timed per repetition of the fastest benchmarks",
+    )
+    parser.add_argument(
+        "--select", metavar="REGEX", help="run only benchmarks with a matching name"
+    )
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    parser.add_argument(
+        "--output", metavar="FILE", help="write the JSON here instead of stdout"
+    )
+    parser.add_argument(
+        "--transfer-mib", type=int, default=None, help="size of the transferred object"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=4, help="threads for multi-threaded transfers"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds added by the local server to each response",
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=float,
+        default=None,
+        help="bytes per second of each connection to the local server",
+    )
+    options = parser.parse_args(argv)
+    if options.iterations is None:
+        options.iterations = 2000 if options.quick else 20000
+    if options.transfer_mib is None:
+        options.transfer_mib = 8 if options.quick else 64
+    return options
+
+
+def main(argv):
+    options = parse_arguments(argv)
+    report = run(options, log=None if options.list else sys.stderr)
+    if options.list:
+        return
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -5,6 +5,7 @@ import logging
 import numbers
 import os
 import re
+import ssl
 import sys
 import tempfile
 import unittest
@@ -37,6 +38,17 @@ class TestConnections(unittest.TestCase):
         self.assertTrue(conn._disconnected)
         conn.release(destroy=True)
 
+    def test_tls_sessions_are_resumed_by_later_connections(self):
+        with self.sess.pool.get_connection() as conn:
+            if not isinstance(conn.socket, ssl.SSLSocket):
+                self.skipTest("requires an SSL connection")
+            conn2 = self.sess.pool.get_connection()
+            conn2.release()
+        metrics = self.sess.pool.metrics
+        self.assertEqual(metrics.tls_handshakes, 2)
+        self.assertEqual(metrics.tls_sessions_reused, 1)
+        self.assertTrue(conn2.socket.session_reused)
+
     def test_server_version_without_authentication__issue_688(self):
         sess = self.sess
 
@@ -69,6 +69,7 @@ from datetime import datetime
 from tempfile import NamedTemporaryFile, gettempdir, mktemp
 from irods.test.helpers import unique_name, my_function_name
 from irods.ticket import Ticket
+import irods.helpers
 import irods.parallel
 from irods.manager.data_object_manager import Server_Checksum_Warning
 
@@ -2622,6 +2623,32 @@ class TestDataObjOps(unittest.TestCase):
                         if self.sess.data_objects.exists(data_path):
                             self.sess.data_objects.unlink(data_path, force=True)
 
+    def test_redirected_opens_reuse_connections_to_the_same_host(self):
+        self._skip_unless_connected_to_local_computer_by_other_than_localhost_synonym()
+        with config.loadlines(
+            entries=[dict(setting="data_objects.allow_redirect", value=True)]
+        ):
+            with self.create_simple_resc(hostname="localhost") as resc_name:
+                paths = [
+                    "{}/redirect_reuse_{}.dat".format(self.coll_path, n) for n in range(5)
+                ]
+                try:
+                    for data_path in paths:
+                        with self.sess.data_objects.open(
+                            data_path, "w", **{kw.DEST_RESC_NAME_KW: resc_name}
+                        ) as f:
+                            f.write(b"content")
+                    self.assertEqual(len(self.sess._redirect_sessions), 1)
+                    ((redirect_sess, _),) = self.sess._redirect_sessions.values()
+                    self.assertEqual(redirect_sess.host, "localhost")
+                    self.assertEqual(redirect_sess.pool.metrics.connections_created, 1)
+                    self.assertEqual(redirect_sess.pool.metrics.checkouts, len(paths))
+                finally:
+                    for data_path in paths:
+                        if self.sess.data_objects.exists(data_path):
+                            self.sess.data_objects.unlink(data_path, force=True)
+                    self.sess.cleanup()
+
     @unittest.skipIf(progressbar is None, "progressbar is not installed")
     def test_progressbar_style_of_pbar_without_registering__issue_574(self):
         # As this test demonstrates, we can always just register an update wrapper for an object rather than the object or its update method directly.
@@ -2809,6 +2836,221 @@ class TestDataObjOps(unittest.TestCase):
 
         self.assertEqual(pbar.percent_done(), 100)
 
+    def test_parallel_put_and_get_with_shared_chunk_queue(self):
+        CHUNK_SIZE = 3 * MEBI
+        FILE_LENGTH = 40 * MEBI + 12345  # not a multiple of CHUNK_SIZE
+        NumChunksRegex = re.compile(
+            r"^num_threads\s*=\s*(\d+)\s*;\s*chunk_size\s*=\s*(\d+)\s*;\s*num_chunks\s*=\s*(\d+)",
+            re.MULTILINE,
+        )
+        logger = logging.getLogger("irods.parallel")
+        with NamedTemporaryFile() as f:
+            f.write(os.urandom(FILE_LENGTH))
+            f.flush()
+            logical_path = "{}/{}".format(self.coll_path, os.path.basename(f.name))
+            LOG = io.StringIO()
+            with helpers.enableLogging(
+                logger, logging.StreamHandler, (LOG,), level_=logging.DEBUG
+            ), config.loadlines(
+                entries=[
+                    dict(setting="data_objects.parallel_chunk_size", value=CHUNK_SIZE)
+                ]
+            ):
+                self.sess.data_objects.put(f.name, logical_path, num_threads=4)
+                self.sess.data_objects.get(
+                    logical_path, f.name + ".get", num_threads=4, **{kw.FORCE_FLAG_KW: ""}
+                )
+            try:
+                matches = NumChunksRegex.findall(LOG.getvalue())
+                self.assertEqual(len(matches), 2)  # one each for the put and the get
+                for _threads, chunk_size, num_chunks in matches:
+                    self.assertEqual(int(chunk_size), CHUNK_SIZE)
+                    self.assertEqual(int(num_chunks), -(-FILE_LENGTH // CHUNK_SIZE))
+                with open(f.name, "rb") as f1, open(f.name + ".get", "rb") as f2:
+                    self.assertEqual(f1.read(), f2.read())
+                self.assertEqual(
+                    self.sess.data_objects.get(logical_path).size, FILE_LENGTH
+                )
+            finally:
+                os.unlink(f.name + ".get")
+
+    def test_parallel_get_resumes_from_transfer_journal(self):
+        CHUNK_SIZE = 4 * MEBI
+        FILE_LENGTH = 40 * MEBI
+        content = os.urandom(FILE_LENGTH)
+        with NamedTemporaryFile() as f:
+            f.write(content)
+            f.flush()
+            logical_path = "{}/{}".format(self.coll_path, os.path.basename(f.name))
+            self.sess.data_objects.put(f.name, logical_path)
+        data = self.sess.data_objects.get(logical_path)
+        local_file = mktemp()
+        journal_path = local_file + irods.parallel.JOURNAL_SUFFIX
+        try:
+            # Simulate an interrupted download: the first half of the chunks arrived and were journaled.
+            half = FILE_LENGTH // 2
+            with open(local_file, "wb") as f:
+                f.write(content[:half] + b"\0" * (FILE_LENGTH - half))
+            journal = irods.parallel._Range_journal(
+                journal_path,
+                dict(
+                    operation="get",
+                    data_object=logical_path,
+                    local_file=os.path.abspath(local_file),
+                    size=FILE_LENGTH,
+                    remote_mtime=str(data.modify_time),
+                ),
+                CHUNK_SIZE,
+            )
+            for chunk in journal.missing_ranges(half):
+                journal.record(chunk)
+
+            LOG = io.StringIO()
+            with helpers.enableLogging(
+                logging.getLogger("irods.parallel"),
+                logging.StreamHandler,
+                (LOG,),
+                level_=logging.DEBUG,
+            ):
+                self.assertTrue(
+                    self.sess.data_objects.parallel_get(
+                        logical_path, local_file, num_threads=3, resume=True, journal=journal_path
+                    )
+                )
+            match = re.search(
+                r"resuming = (\w+) ; bytes_to_transfer = (\d+)", LOG.getvalue()
+            )
+            self.assertEqual(match.groups(), ("True", str(FILE_LENGTH - half)))
+            with open(local_file, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertFalse(os.path.exists(journal_path))
+        finally:
+            for path in (local_file, journal_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    def test_parallel_get_retries_failed_chunks(self):
+        FILE_LENGTH = 40 * MEBI
+        content = os.urandom(FILE_LENGTH)
+        with NamedTemporaryFile() as f:
+            f.write(content)
+            f.flush()
+            logical_path = "{}/{}".format(self.coll_path, os.path.basename(f.name))
+            self.sess.data_objects.put(f.name, logical_path)
+
+        copy_bytes = irods.parallel._copy_bytes
+        failures_to_inject = [2]
+        lock = threading.Lock()
+
+        def unreliable_copy_bytes(*args, **kwargs):
+            with lock:
+                if failures_to_inject[0] > 0:
+                    failures_to_inject[0] -= 1
+                    raise ex.NetworkException("simulated connection reset")
+            return copy_bytes(*args, **kwargs)
+
+        local_file = mktemp()
+        try:
+            errors = []
+            with irods.helpers.temporarily_assign_attribute(
+                irods.parallel, "_copy_bytes", unreliable_copy_bytes
+            ), irods.helpers.temporarily_assign_attribute(
+                irods.parallel, "DEFAULT_RETRY_BACKOFF", 0.01
+            ):
+                self.assertTrue(
+                    self.sess.data_objects.parallel_get(
+                        logical_path,
+                        local_file,
+                        num_threads=3,
+                        chunk_size=4 * MEBI,
+                        retries=3,
+                        errors=errors,
+                    )
+                )
+            self.assertEqual(len(errors), 2)
+            self.assertTrue(
+                all(isinstance(e, irods.parallel.ChunkFailure) for e in errors)
+            )
+            with open(local_file, "rb") as f:
+                self.assertEqual(f.read(), content)
+
+            # Once the retries are exhausted the transfer fails, without leaving threads blocked.
+            failures_to_inject[0] = sys.maxsize
+            with irods.helpers.temporarily_assign_attribute(
+                irods.parallel, "_copy_bytes", unreliable_copy_bytes
+            ), irods.helpers.temporarily_assign_attribute(
+                irods.parallel, "DEFAULT_RETRY_BACKOFF", 0.01
+            ):
+                with self.assertRaises(ex.NetworkException):
+                    self.sess.data_objects.parallel_get(
+                        logical_path, local_file, num_threads=3, retries=1
+                    )
+        finally:
+            if os.path.exists(local_file):
+                os.unlink(local_file)
+
+    def test_read_ahead_returns_same_data_as_plain_reads(self):
+        FILE_LENGTH = 10 * MEBI + 123
+        content = os.urandom(FILE_LENGTH)
+        logical_path = "{}/read_ahead_object".format(self.coll_path)
+        with self.sess.data_objects.open(logical_path, "w") as f:
+            f.write(content)
+        with self.sess.data_objects.open(logical_path, "r", read_ahead=4) as f:
+            self.assertEqual(f.read(), content)
+            self.assertEqual(f.tell(), FILE_LENGTH)
+            f.seek(FILE_LENGTH // 2)
+            self.assertEqual(f.read(MEBI), content[FILE_LENGTH // 2 :][:MEBI])
+            self.assertEqual(f.tell(), FILE_LENGTH // 2 + MEBI)
+            f.seek(-100, io.SEEK_END)
+            self.assertEqual(f.read(), content[-100:])
+
+    def test_write_behind_writes_same_data_as_plain_writes(self):
+        content = os.urandom(10 * MEBI + 321)
+        logical_path = "{}/write_behind_object".format(self.coll_path)
+        with self.sess.data_objects.open(logical_path, "w", write_behind=2 * MEBI) as f:
+            for offset in range(0, len(content), 100001):
+                f.write(content[offset : offset + 100001])
+            self.assertEqual(f.tell(), len(content))
+            f.flush()
+            f.seek(5)
+            f.write(b"overwritten")
+        expected = content[:5] + b"overwritten" + content[16:]
+        with self.sess.data_objects.open(logical_path, "r") as f:
+            self.assertEqual(f.read(), expected)
+
+    def test_spans_are_traced_for_data_object_operations(self):
+        from irods.test.tracing_test import RecordingTracer
+        import irods.tracing
+
+        content = os.urandom(3 * MEBI)
+        logical_path = "{}/traced_object".format(self.coll_path)
+        with self.sess.data_objects.open(logical_path, "w") as f:
+            f.write(content)
+
+        tracer = RecordingTracer()
+        irods.tracing.set_tracer(tracer)
+        try:
+            with self.sess.data_objects.open(logical_path, "r") as f:
+                self.assertEqual(f.read(), content)
+            self.sess.data_objects.get(logical_path)
+        finally:
+            irods.tracing.set_tracer(None)
+
+        spans = collections.defaultdict(list)
+        for span in tracer.spans:
+            spans[span.name].append(span)
+        (opened, *_) = spans["irods.data_object.open"]
+        self.assertEqual(opened.attributes["irods.path"], logical_path)
+        self.assertEqual(opened.attributes["irods.mode"], "r")
+        reads = spans["irods.data_object.read"]
+        self.assertTrue(all(s.attributes["irods.path"] == logical_path for s in reads))
+        self.assertGreaterEqual(
+            sum(s.attributes["irods.bytes"] for s in reads), len(content)
+        )
+        self.assertTrue(spans["irods.data_object.close"])
+        self.assertTrue(spans["irods.query.page"])  # The get() looks up the object.
+        self.assertTrue(all(s.ended for s in tracer.spans))
+
     def test_replica_truncate_related_errors__issue_534(self):
         sess = self.sess
         data_objs = self.sess.data_objects
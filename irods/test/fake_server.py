@@ -0,0 +1,975 @@
+"""An in-process stand-in for an iRODS server, for tests and benchmarks run without one.
+
+FakeServer listens on a local port and answers, in a thread per connection, the requests an
+iRODSSession makes for the most common operations:
+
+    - the startup pack, with or without client-server negotiation (TLS is refused);
+    - native authentication, in the pre-4.3 style;
+    - general queries, paged by means of continuation indices;
+    - opening, creating, reading, writing, seeking, and closing data objects, including the
+      replica token and replica close APIs used by parallel transfers;
+    - bulk puts of small files, as by "iput -b";
+    - adding, removing, and setting AVUs; touch; creating and removing collections; and
+      unlinking data objects.
+
+The catalog is kept in memory, holding one user, one resource, and the home collection of the
+user; each data object has a single replica, stored in a file of a temporary directory.  The
+server presents itself as iRODS 4.2.12.  Requests not understood are answered with
+SYS_UNMATCHED_API_NUM.
+
+A network may be simulated by means of `latency' (seconds added to each response) and
+`bandwidth' (bytes per second at which data read or written passes over each connection):
+
+    with FakeServer(latency=0.001, bandwidth=100e6) as server, server.session() as session:
+        session.data_objects.put("file.dat", server.home + "/file.dat")
+"""
+
+import base64
+import collections
+import itertools
+import os
+import re
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+import irods.exception as ex
+import irods.keywords as kw
+from irods.api_number import api_number
+from irods.client_server_negotiation import (
+    REQUEST_NEGOTIATION,
+    REQUIRE_TCP,
+    CS_NEG_RESULT_KW,
+    FAILURE,
+)
+from irods.column import DateTime, Integer
+from irods.constants import OFFSET_INX
+from irods.connection import _native_auth_digest
+from irods.message import (
+    AuthChallenge,
+    AuthResponse,
+    BulkOprRequest,
+    ClientServerNegotiation,
+    CollectionRequest,
+    FileOpenRequest,
+    FileSeekResponse,
+    GenQueryRequest,
+    GenQueryResponse,
+    GenQueryResponseColumn,
+    JSON_Message,
+    MetadataRequest,
+    OpenedDataObjRequest,
+    StartupPack,
+    VersionResponse,
+    ET,
+    _Buffered_socket_reader,
+    _send_message_segments,
+    empty_gen_query_out,
+    iRODSMessage,
+)
+from irods.models import (
+    Collection,
+    CollectionMeta,
+    DataObject,
+    DataObjectMeta,
+    ModelBase,
+    Resource,
+    ResourceMeta,
+    User,
+    UserMeta,
+)
+from irods.query import query_number
+from irods.session import iRODSSession
+
+__all__ = ["FakeServer"]
+
+SERVER_VERSION = (4, 2, 12)
+
+# Open flags, as for irods.manager.data_object_manager.DataObjectManager.
+O_ACCMODE = 3
+O_RDONLY = 0
+O_CREAT = 64
+O_TRUNC = 512
+
+_META_MODELS = {
+    "-d": DataObjectMeta,
+    "-C": CollectionMeta,
+    "-R": ResourceMeta,
+    "-u": UserMeta,
+}
+
+# The metaclass of the models sets their _columns, unknown to type checkers; hence getattr.
+_MODEL_OF_COLUMN = {
+    column: model
+    for model in (User, Resource, DataObject, Collection) + tuple(_META_MODELS.values())
+    for column in getattr(model, "_columns")
+}
+
+_AGGREGATES = {
+    query_number["SELECT_MIN"]: min,
+    query_number["SELECT_MAX"]: max,
+    query_number["SELECT_SUM"]: sum,
+    query_number["SELECT_AVG"]: lambda values: sum(values) / len(values),
+    query_number["SELECT_COUNT"]: len,
+}
+
+_CONDITION_PATTERN = re.compile(
+    r"\s*(not like|like|in|between|<>|!=|>=|<=|=|<|>)\s*(.*)", re.S
+)
+
+
+def _timestamp(seconds=None):
+    return "{:011d}".format(int(time.time() if seconds is None else seconds))
+
+
+def _keywords(message):
+    pairs = message.KeyValPair_PI
+    if not pairs.ssLen:
+        return {}
+    return dict(zip(pairs.keyWord, pairs.svalue))
+
+
+def _split_path(path):
+    parent, _, name = path.rpartition("/")
+    return (parent or "/", name)
+
+
+class _Condition:
+    """A condition of a general query, as the client sends it (eg. "= 'x'" or "in ('a','b')")."""
+
+    def __init__(self, column, text, upper_case):
+        self.column = column
+        self.upper_case = upper_case
+        self.alternatives = []
+        for alternative in text.split("||"):
+            op, operand = _CONDITION_PATTERN.match(alternative).groups()
+            values = [
+                v.replace("''", "'") for v in re.findall(r"'((?:[^']|'')*)'", operand)
+            ]
+            if op in ("like", "not like"):
+                pattern = "".join(
+                    {"%": ".*", "_": "."}.get(c, re.escape(c)) for c in values[0]
+                )
+                values = [re.compile(pattern, re.S)]
+            self.alternatives.append((op, values))
+
+    def __call__(self, row):
+        value = row.get(self.column, "")
+        if self.upper_case:
+            value = value.upper()
+        return any(self._test(op, value, values) for op, values in self.alternatives)
+
+    def _test(self, op, value, values):
+        if op == "like":
+            return values[0].fullmatch(value) is not None
+        if op == "not like":
+            return values[0].fullmatch(value) is None
+        key, keys = value, values
+        if self.column.column_type in (Integer, DateTime):
+            try:
+                key, keys = int(value), [int(v) for v in values]
+            except ValueError:
+                pass
+        if op == "in":
+            return key in keys
+        if op == "between":
+            return keys[0] <= key <= keys[1]
+        return {
+            "=": key == keys[0],
+            "<>": key != keys[0],
+            "!=": key != keys[0],
+            "<": key < keys[0],
+            "<=": key <= keys[0],
+            ">": key > keys[0],
+            ">=": key >= keys[0],
+        }[op]
+
+
+class _Descriptor:
+    """A replica opened by a client, read and written at an offset of its own."""
+
+    def __init__(self, data_object, fd, writable):
+        self.data_object = data_object
+        self.fd = fd
+        self.writable = writable
+        self.offset = 0
+
+
+class _Agent:
+    """Serves the requests made on one client connection, as an iRODS agent would."""
+
+    def __init__(self, server, sock):
+        self.server = server
+        self.socket = sock
+        self.reader = _Buffered_socket_reader(sock)
+        self.user = None
+        self.authenticated = False
+        self.challenge = None
+        self.descriptors = {}
+        self.queries = {}
+        self._next_descriptor = itertools.count(3)
+        self._next_query = itertools.count(1)
+
+    def send(self, message, data_bytes=0):
+        self.server._delay(data_bytes)
+        _send_message_segments(self.socket, message.pack_segments())
+
+    def serve(self):
+        try:
+            if not self.start():
+                return
+            while True:
+                request = iRODSMessage.recv(self.reader)
+                if request.msg_type == "RODS_DISCONNECT":
+                    return
+                response = self.respond(request)
+                self.send(response, len(request.bs or b"") + len(response.bs or b""))
+        except (OSError, ValueError):
+            pass
+        finally:
+            for descriptor in self.descriptors.values():
+                os.close(descriptor.fd)
+            self.socket.close()
+
+    def start(self):
+        startup = StartupPack(None, None)
+        startup.unpack(ET().fromstring(iRODSMessage.recv(self.reader).msg))
+        self.user = startup.proxyUser
+        if REQUEST_NEGOTIATION in (startup.option or ""):
+            self.send(
+                iRODSMessage(
+                    "RODS_CS_NEG_T",
+                    msg=ClientServerNegotiation(status=1, result=REQUIRE_TCP),
+                )
+            )
+            client_result = iRODSMessage.recv(self.reader).get_main_message(
+                ClientServerNegotiation
+            )
+            if client_result.result == "{}={};".format(CS_NEG_RESULT_KW, FAILURE):
+                return False
+        self.send(
+            iRODSMessage(
+                "RODS_VERSION",
+                msg=VersionResponse(
+                    status=0,
+                    relVersion="rods{}.{}.{}".format(*SERVER_VERSION),
+                    apiVersion="d",
+                    reconnPort=0,
+                    reconnAddr="",
+                    cookie=400,
+                ),
+            )
+        )
+        return True
+
+    def respond(self, request):
+        self.server._count(request.int_info)
+        handler = self.server._handlers.get(request.int_info)
+        try:
+            if handler is None:
+                raise ex.SYS_UNMATCHED_API_NUM
+            if not self.authenticated and handler not in _AUTHENTICATION_HANDLERS:
+                raise ex.CAT_INVALID_AUTHENTICATION
+            response = handler(self, request)
+        except ex.iRODSException as e:
+            return iRODSMessage("RODS_API_REPLY", int_info=e.code)
+        if isinstance(response, iRODSMessage):
+            return response
+        if isinstance(response, int):
+            return iRODSMessage("RODS_API_REPLY", int_info=response)
+        return iRODSMessage("RODS_API_REPLY", msg=response)
+
+    # Authentication
+
+    def auth_request(self, request):
+        # Printable, so that the client's stripping of the challenge leaves it unchanged.
+        self.challenge = base64.b64encode(os.urandom(48))
+        return AuthChallenge(challenge=self.challenge)
+
+    def auth_response(self, request):
+        response = request.get_main_message(AuthResponse)
+        password = self.server.passwords.get(response.username)
+        if (
+            self.challenge is None
+            or password is None
+            or response.response != _native_auth_digest(self.challenge, password)
+        ):
+            raise ex.CAT_INVALID_AUTHENTICATION
+        self.authenticated = True
+        return 0
+
+    # General queries
+
+    def gen_query(self, request):
+        query = request.get_main_message(GenQueryRequest)
+        selects = dict(zip(query.InxIvalPair_PI.inx, query.InxIvalPair_PI.ivalue))
+        columns = [ModelBase.columns()[icat_id] for icat_id in selects]
+        if query.continueInx:
+            cursor = self.queries.get(query.continueInx)
+            if cursor is None:
+                raise ex.CAT_NO_ROWS_FOUND
+        else:
+            cursor = None
+        if query.maxRows <= 0:
+            self.queries.pop(query.continueInx, None)
+            return empty_gen_query_out(columns)
+        if cursor is None:
+            rows = self.server.catalog.select(
+                columns,
+                list(selects.values()),
+                (
+                    zip(query.InxValPair_PI.inx, query.InxValPair_PI.svalue)
+                    if query.InxValPair_PI.isLen
+                    else ()
+                ),
+                upper_case=bool(query.options & query_number["UPPER_CASE_WHERE"]),
+            )[query.partialStartIndex :]
+            if not rows:
+                raise ex.CAT_NO_ROWS_FOUND
+            continue_index = next(self._next_query)
+            cursor = self.queries[continue_index] = [continue_index, rows, len(rows)]
+        continue_index, rows, total = cursor
+        page, cursor[1] = rows[: query.maxRows], rows[query.maxRows :]
+        if not cursor[1]:
+            del self.queries[continue_index]
+            continue_index = 0
+        return GenQueryResponse(
+            rowCnt=len(page),
+            attriCnt=len(columns),
+            continueInx=continue_index,
+            totalRowCount=total,
+            SqlResult_PI=[
+                GenQueryResponseColumn(
+                    attriInx=column.icat_id,
+                    reslen=1 + max(len(row[i]) for row in page),
+                    value=[row[i] for row in page],
+                )
+                for i, column in enumerate(columns)
+            ],
+        )
+
+    # Data objects
+
+    def _open(self, request, create):
+        request_body = request.get_main_message(FileOpenRequest)
+        options = _keywords(request_body)
+        flags = O_CREAT | O_TRUNC | 1 if create else request_body.openFlags
+        catalog = self.server.catalog
+        with catalog.lock:
+            data_object = catalog.data_objects.get(request_body.objPath)
+            if data_object is None:
+                if not flags & O_CREAT:
+                    raise ex.OBJ_PATH_DOES_NOT_EXIST
+                data_object = catalog.create_data_object(
+                    request_body.objPath, self.user
+                )
+            elif create and kw.FORCE_FLAG_KW not in options:
+                raise ex.OVERWRITE_WITHOUT_FORCE_FLAG
+            if kw.REPLICA_TOKEN_KW not in options and flags & O_ACCMODE != O_RDONLY:
+                data_object.replica_token = str(uuid.uuid4())
+        fd = os.open(
+            data_object[DataObject.path],
+            (os.O_RDONLY if flags & O_ACCMODE == O_RDONLY else os.O_RDWR)
+            | (os.O_TRUNC if flags & O_TRUNC else 0),
+        )
+        desc = next(self._next_descriptor)
+        self.descriptors[desc] = _Descriptor(
+            data_object, fd, writable=(flags & O_ACCMODE != O_RDONLY)
+        )
+        return desc
+
+    def open(self, request):
+        return self._open(request, create=False)
+
+    def create(self, request):
+        return self._open(request, create=True)
+
+    def _descriptor(self, request):
+        opened = request.get_main_message(OpenedDataObjRequest)
+        try:
+            return (self.descriptors[opened.l1descInx], opened)
+        except KeyError:
+            raise ex.BAD_INPUT_DESC_INDEX
+
+    def read(self, request):
+        descriptor, opened = self._descriptor(request)
+        data = os.pread(descriptor.fd, opened.len, descriptor.offset)
+        descriptor.offset += len(data)
+        return iRODSMessage("RODS_API_REPLY", bs=data, int_info=len(data))
+
+    def write(self, request):
+        descriptor, opened = self._descriptor(request)
+        data = request.bs or b""
+        os.pwrite(descriptor.fd, data, descriptor.offset)
+        descriptor.offset += len(data)
+        return len(data)
+
+    def seek(self, request):
+        descriptor, opened = self._descriptor(request)
+        base = {
+            os.SEEK_SET: 0,
+            os.SEEK_CUR: descriptor.offset,
+            os.SEEK_END: os.fstat(descriptor.fd).st_size,
+        }[opened.whence]
+        descriptor.offset = base + opened.offset
+        return FileSeekResponse(offset=descriptor.offset)
+
+    def _close(self, desc):
+        descriptor = self.descriptors.pop(desc, None)
+        if descriptor is None:
+            raise ex.BAD_INPUT_DESC_INDEX
+        try:
+            if descriptor.writable:
+                with self.server.catalog.lock:
+                    descriptor.data_object[DataObject.size] = str(
+                        os.fstat(descriptor.fd).st_size
+                    )
+                    descriptor.data_object[DataObject.modify_time] = _timestamp()
+        finally:
+            os.close(descriptor.fd)
+        return 0
+
+    def close(self, request):
+        return self._close(self._descriptor(request)[1].l1descInx)
+
+    def replica_close(self, request):
+        return self._close(request.get_json_encoded_struct()["fd"])
+
+    def get_file_descriptor_info(self, request):
+        desc = request.get_json_encoded_struct()["fd"]
+        descriptor = self.descriptors.get(desc)
+        if descriptor is None:
+            raise ex.BAD_INPUT_DESC_INDEX
+        data_object = descriptor.data_object
+        return JSON_Message(
+            {
+                "l1_descriptor_index": desc,
+                "replica_token": data_object.replica_token,
+                "data_object_info": {
+                    "object_path": data_object.logical_path,
+                    "resource_hierarchy": data_object[DataObject.resc_hier],
+                    "replica_number": int(data_object[DataObject.replica_number]),
+                    "size": int(data_object[DataObject.size]),
+                },
+            },
+            server_version=SERVER_VERSION,
+        )
+
+    def unlink(self, request):
+        path = request.get_main_message(FileOpenRequest).objPath
+        with self.server.catalog.lock:
+            self.server.catalog.remove_data_object(path)
+        return 0
+
+    def touch(self, request):
+        arguments = request.get_json_encoded_struct()
+        path, options = arguments["logical_path"], arguments.get("options", {})
+        catalog = self.server.catalog
+        with catalog.lock:
+            target = catalog.data_objects.get(path) or catalog.collections.get(path)
+            if target is None:
+                if options.get("no_create"):
+                    return 0
+                target = catalog.create_data_object(path, self.user)
+            if "reference" in options:
+                reference = catalog.data_objects.get(
+                    options["reference"]
+                ) or catalog.collections.get(options["reference"])
+                if reference is None:
+                    raise ex.OBJ_PATH_DOES_NOT_EXIST
+                mtime = reference[_modify_time(reference)]
+            else:
+                mtime = _timestamp(options.get("seconds_since_epoch"))
+            target[_modify_time(target)] = mtime
+        return 0
+
+    # Collections and metadata
+
+    def create_collection(self, request):
+        request_body = request.get_main_message(CollectionRequest)
+        recursive = kw.RECURSIVE_OPR__KW in _keywords(request_body)
+        with self.server.catalog.lock:
+            self.server.catalog.create_collection(
+                request_body.collName.rstrip("/"), self.user, recursive
+            )
+        return 0
+
+    def remove_collection(self, request):
+        request_body = request.get_main_message(CollectionRequest)
+        recursive = kw.RECURSIVE_OPR__KW in _keywords(request_body)
+        with self.server.catalog.lock:
+            self.server.catalog.remove_collection(
+                request_body.collName.rstrip("/"), recursive
+            )
+        return 0
+
+    def bulk_data_obj_put(self, request):
+        request_body = request.get_main_message(BulkOprRequest)
+        options = _keywords(request_body)
+        attributes = {
+            column.attriInx: column.value
+            for column in request_body.GenQueryOut_PI.SqlResult_PI
+        }
+        data = request.bs or b""
+        catalog = self.server.catalog
+        with catalog.lock:
+            if request_body.objPath not in catalog.collections:
+                raise ex.CAT_UNKNOWN_COLLECTION
+            paths = attributes[DataObject.name.icat_id]
+            if kw.FORCE_FLAG_KW not in options and any(
+                path in catalog.data_objects for path in paths
+            ):
+                raise ex.OVERWRITE_WITHOUT_FORCE_FLAG
+            start = 0
+            for i, path in enumerate(paths):
+                end = int(attributes[OFFSET_INX][i])
+                data_object = catalog.data_objects.get(
+                    path
+                ) or catalog.create_data_object(path, self.user)
+                with open(data_object[DataObject.path], "wb") as f:
+                    f.write(data[start:end])
+                data_object[DataObject.size] = str(end - start)
+                data_object[DataObject.modify_time] = _timestamp()
+                if DataObject.checksum.icat_id in attributes:
+                    data_object[DataObject.checksum] = attributes[
+                        DataObject.checksum.icat_id
+                    ][i]
+                start = end
+        return 0
+
+    def modify_metadata(self, request):
+        request_body = request.get_main_message(MetadataRequest)
+        operation, target_type, target = (
+            request_body.arg0,
+            request_body.arg1,
+            request_body.arg2,
+        )
+        avu = (request_body.arg3, request_body.arg4, request_body.arg5 or "")
+        with self.server.catalog.lock:
+            self.server.catalog.modify_metadata(operation, target_type, target, avu)
+        return 0
+
+
+_HANDLERS = {
+    "AUTH_REQUEST_AN": _Agent.auth_request,
+    "AUTH_RESPONSE_AN": _Agent.auth_response,
+    "GEN_QUERY_AN": _Agent.gen_query,
+    "DATA_OBJ_OPEN_AN": _Agent.open,
+    "DATA_OBJ_CREATE_AN": _Agent.create,
+    "DATA_OBJ_READ_AN": _Agent.read,
+    "DATA_OBJ_WRITE_AN": _Agent.write,
+    "DATA_OBJ_LSEEK_AN": _Agent.seek,
+    "DATA_OBJ_CLOSE_AN": _Agent.close,
+    "REPLICA_CLOSE_APN": _Agent.replica_close,
+    "GET_FILE_DESCRIPTOR_INFO_APN": _Agent.get_file_descriptor_info,
+    "DATA_OBJ_UNLINK_AN": _Agent.unlink,
+    "TOUCH_APN": _Agent.touch,
+    "COLL_CREATE_AN": _Agent.create_collection,
+    "RM_COLL_AN": _Agent.remove_collection,
+    "MOD_AVU_METADATA_AN": _Agent.modify_metadata,
+    "BULK_DATA_OBJ_PUT_AN": _Agent.bulk_data_obj_put,
+}
+
+
+_AUTHENTICATION_HANDLERS = (_Agent.auth_request, _Agent.auth_response)
+
+_API_NAMES = {number: name for name, number in api_number.items()}
+
+
+def _modify_time(record):
+    return DataObject.modify_time if DataObject.id in record else Collection.modify_time
+
+
+class _Record(dict):
+    """A catalog entry: the values of its columns, keyed by irods.column.Column."""
+
+    logical_path = None
+    replica_token = ""
+
+
+class _Catalog:
+    """The catalog of a FakeServer.  Its contents are changed only while holding `lock'."""
+
+    def __init__(self, zone, user, vault):
+        self.lock = threading.RLock()
+        self.zone = zone
+        self.vault = vault
+        self._next_id = itertools.count(10000)
+        now = _timestamp()
+        self.users = [
+            _Record(
+                {
+                    User.id: str(next(self._next_id)),
+                    User.name: user,
+                    User.type: "rodsadmin",
+                    User.zone: zone,
+                    User.create_time: now,
+                    User.modify_time: now,
+                }
+            )
+        ]
+        self.resource = _Record(
+            {
+                Resource.id: str(next(self._next_id)),
+                Resource.name: "demoResc",
+                Resource.zone_name: zone,
+                Resource.type: "unixfilesystem",
+                Resource.class_name: "cache",
+                Resource.location: "localhost",
+                Resource.vault_path: vault,
+                Resource.create_time: now,
+                Resource.modify_time: now,
+            }
+        )
+        self.collections = {}
+        self.data_objects = {}
+        self.metadata = collections.defaultdict(
+            list
+        )  # AVUs by (meta model, target name)
+        self.create_collection("/{}/home/{}".format(zone, user), user, recursive=True)
+
+    def create_collection(self, path, owner, recursive=False):
+        parent, _ = _split_path(path)
+        if path in self.collections or path in self.data_objects:
+            if recursive and path in self.collections:
+                return
+            raise ex.CATALOG_ALREADY_HAS_ITEM_BY_THAT_NAME
+        if path != "/" and parent not in self.collections:
+            if not recursive:
+                raise ex.CAT_UNKNOWN_COLLECTION
+            self.create_collection(parent, owner, recursive)
+        now = _timestamp()
+        record = self.collections[path] = _Record(
+            {
+                Collection.id: str(next(self._next_id)),
+                Collection.name: path,
+                Collection.parent_name: parent,
+                Collection.owner_name: owner,
+                Collection.owner_zone: self.zone,
+                Collection.inheritance: "0",
+                Collection.create_time: now,
+                Collection.modify_time: now,
+            }
+        )
+        record.logical_path = path
+
+    def remove_collection(self, path, recursive):
+        if path not in self.collections:
+            raise ex.CAT_UNKNOWN_COLLECTION
+        prefix = path.rstrip("/") + "/"
+        contents = [p for p in self.data_objects if p.startswith(prefix)]
+        subcollections = [p for p in self.collections if p.startswith(prefix)]
+        if (contents or subcollections) and not recursive:
+            raise ex.CAT_COLLECTION_NOT_EMPTY
+        for data_path in contents:
+            self.remove_data_object(data_path)
+        for collection_path in subcollections + [path]:
+            del self.collections[collection_path]
+            self.metadata.pop((CollectionMeta, collection_path), None)
+
+    def create_data_object(self, path, owner):
+        parent, name = _split_path(path)
+        collection = self.collections.get(parent)
+        if collection is None:
+            raise ex.CAT_UNKNOWN_COLLECTION
+        if path in self.collections:
+            raise ex.CATALOG_ALREADY_HAS_ITEM_BY_THAT_NAME
+        data_id = str(next(self._next_id))
+        physical_path = os.path.join(self.vault, data_id)
+        open(physical_path, "wb").close()
+        now = _timestamp()
+        record = self.data_objects[path] = _Record(
+            {
+                DataObject.id: data_id,
+                DataObject.collection_id: collection[Collection.id],
+                DataObject.name: name,
+                DataObject.replica_number: "0",
+                DataObject.type: "generic",
+                DataObject.size: "0",
+                DataObject.resource_name: self.resource[Resource.name],
+                DataObject.path: physical_path,
+                DataObject.owner_name: owner,
+                DataObject.owner_zone: self.zone,
+                DataObject.replica_status: "1",
+                DataObject.expiry: "00000000000",
+                DataObject.map_id: "0",
+                DataObject.create_time: now,
+                DataObject.modify_time: now,
+                DataObject.resc_hier: self.resource[Resource.name],
+                DataObject.resc_id: self.resource[Resource.id],
+            }
+        )
+        record.logical_path = path
+        return record
+
+    def remove_data_object(self, path):
+        record = self.data_objects.pop(path, None)
+        if record is None:
+            raise ex.OBJ_PATH_DOES_NOT_EXIST
+        self.metadata.pop((DataObjectMeta, path), None)
+        os.unlink(record[DataObject.path])
+
+    def modify_metadata(self, operation, target_type, target, avu):
+        model = _META_MODELS.get(target_type)
+        exists = {
+            DataObjectMeta: lambda: target in self.data_objects,
+            CollectionMeta: lambda: target in self.collections,
+            ResourceMeta: lambda: target == self.resource[Resource.name],
+            UserMeta: lambda: any(u[User.name] == target for u in self.users),
+        }
+        if model is None or operation not in ("add", "adda", "rm", "set"):
+            raise ex.SYS_NOT_SUPPORTED
+        if not exists[model]():
+            raise ex.CAT_NO_ROWS_FOUND
+        avus = self.metadata[(model, target)]
+        matching = [a for a in avus if a[1:4] == avu]
+        if operation == "rm":
+            if not matching:
+                raise ex.CAT_SUCCESS_BUT_WITH_NO_INFO
+            avus.remove(matching[0])
+            return
+        if operation == "set":
+            avus[:] = [a for a in avus if a[1] != avu[0]]
+        elif matching:
+            raise ex.CATALOG_ALREADY_HAS_ITEM_BY_THAT_NAME
+        avus.append((str(next(self._next_id)),) + avu + (_timestamp(),))
+
+    def _metadata_rows(self, model, records, target_name):
+        id_, name, value, units, create_time, modify_time = (
+            model.id,
+            model.name,
+            model.value,
+            model.units,
+            model.create_time,
+            model.modify_time,
+        )
+        for record in records:
+            for avu_id, *avu, timestamp in self.metadata.get(
+                (model, target_name(record)), ()
+            ):
+                row = dict(record)
+                row.update(zip((id_, name, value, units), [avu_id] + avu))
+                row.update({create_time: timestamp, modify_time: timestamp})
+                yield row
+
+    def _rows(self, models):
+        data_rows = lambda: (
+            {**self.resource, **self.collections[_split_path(path)[0]], **record}
+            for path, record in self.data_objects.items()
+        )
+        if DataObjectMeta in models:
+            return self._metadata_rows(
+                DataObjectMeta,
+                data_rows(),
+                lambda row: row[Collection.name].rstrip("/")
+                + "/"
+                + row[DataObject.name],
+            )
+        if CollectionMeta in models:
+            return self._metadata_rows(
+                CollectionMeta,
+                self.collections.values(),
+                lambda row: row[Collection.name],
+            )
+        if ResourceMeta in models:
+            return self._metadata_rows(
+                ResourceMeta, [self.resource], lambda row: row[Resource.name]
+            )
+        if UserMeta in models:
+            return self._metadata_rows(UserMeta, self.users, lambda row: row[User.name])
+        if DataObject in models:
+            return data_rows()
+        if Collection in models:
+            return iter(self.collections.values())
+        if Resource in models:
+            return iter([self.resource])
+        if User in models:
+            return iter(self.users)
+        return iter(())
+
+    def select(self, columns, select_flags, conditions, upper_case=False):
+        """Return, as tuples of strings, the distinct rows of values of `columns' meeting the
+        conditions, which are pairs of a column number and a condition string."""
+        conditions = [
+            _Condition(ModelBase.columns()[icat_id], text, upper_case)
+            for icat_id, text in conditions
+        ]
+        models = {
+            _MODEL_OF_COLUMN.get(column)
+            for column in columns + [c.column for c in conditions]
+        }
+        with self.lock:
+            rows = [
+                [row.get(column, "") for column in columns]
+                for row in self._rows(models)
+                if all(condition(row) for condition in conditions)
+            ]
+        rows = list(dict.fromkeys(map(tuple, rows)))
+
+        aggregates = [
+            _AGGREGATES.get(
+                flag & ~(query_number["ORDER_BY"] | query_number["ORDER_BY_DESC"])
+            )
+            for flag in select_flags
+        ]
+        if any(aggregates):
+            return self._aggregate(columns, aggregates, rows)
+
+        def sort_key(i):
+            if columns[i].column_type in (Integer, DateTime):
+                return lambda row: (len(row[i]), row[i])
+            return lambda row: row[i]
+
+        # Sort first by all columns, then by those ordered explicitly (least significant first).
+        for i in reversed(range(len(columns))):
+            rows.sort(key=sort_key(i))
+        for i in reversed(range(len(columns))):
+            if select_flags[i] & (
+                query_number["ORDER_BY"] | query_number["ORDER_BY_DESC"]
+            ):
+                rows.sort(
+                    key=sort_key(i),
+                    reverse=bool(select_flags[i] & query_number["ORDER_BY_DESC"]),
+                )
+        return rows
+
+    @staticmethod
+    def _aggregate(columns, aggregates, rows):
+        groups = collections.OrderedDict()
+        for row in rows:
+            key = tuple(v for v, a in zip(row, aggregates) if a is None)
+            groups.setdefault(key, []).append(row)
+        result = []
+        for key, group in groups.items():
+            key_values = iter(key)
+            out = []
+            for i, aggregate in enumerate(aggregates):
+                if aggregate is None:
+                    out.append(next(key_values))
+                    continue
+                values = [row[i] for row in group]
+                if aggregate is not len and columns[i].column_type in (
+                    Integer,
+                    DateTime,
+                ):
+                    values = [int(v) for v in values if v != ""]
+                value = aggregate(values)
+                out.append(str(value))
+            result.append(tuple(out))
+        return result
+
+
+class FakeServer:
+    """A stand-in iRODS server, running in threads of the current process.
+
+    `latency' is a delay, in seconds, added to each response.  If `bandwidth' is given, each
+    response is further delayed for the time the data read or written in the request would take
+    at that many bytes per second.
+    """
+
+    def __init__(
+        self, zone="tempZone", user="rods", password="rods", latency=0.0, bandwidth=None
+    ):
+        self.zone = zone
+        self.user = user
+        self.passwords = {user: password}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.host = "127.0.0.1"
+        self.port = None
+        self.api_counts = collections.Counter()
+        self._counts_lock = threading.Lock()
+        self._directory = None
+        self._listener = None
+        self._threads = []
+        self._sockets = []
+        self._handlers = {
+            api_number[name]: handler for name, handler in _HANDLERS.items()
+        }
+
+    @property
+    def home(self):
+        return "/{0.zone}/home/{0.user}".format(self)
+
+    def start(self):
+        self._directory = tempfile.mkdtemp(prefix="irods_fake_server_")
+        self.catalog = _Catalog(self.zone, self.user, self._directory)
+        self._listener = socket.create_server((self.host, 0))
+        self.port = self._listener.getsockname()[1]
+        self._start_thread(self._accept)
+        return self
+
+    def stop(self):
+        if self._listener is None:
+            return
+        try:
+            self._listener.shutdown(
+                socket.SHUT_RDWR
+            )  # Wakes the thread accepting connections.
+        except OSError:
+            pass
+        self._listener.close()
+        self._listener = None
+        for sock in list(self._sockets):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def session(self, **options):
+        """Return an iRODSSession logged in to this server as its user.  The options are passed
+        to iRODSSession, and may override the account settings."""
+        account = dict(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            zone=self.zone,
+            password=self.passwords[self.user],
+        )
+        account.update(options)
+        return iRODSSession(**account)
+
+    def _start_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _accept(self):
+        listener = self._listener
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sockets.append(sock)
+            self._start_thread(self._serve, sock)
+
+    def _serve(self, sock):
+        try:
+            _Agent(self, sock).serve()
+        finally:
+            self._sockets.remove(sock)
+
+    def _count(self, api):
+        with self._counts_lock:
+            self.api_counts[_API_NAMES.get(api, api)] += 1
+
+    def _delay(self, data_bytes):
+        delay = self.latency
+        if self.bandwidth:
+            delay += data_bytes / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,157 @@
+#! /usr/bin/env python
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import irods.exception as ex
+from irods.column import Like
+from irods.models import Collection, DataObject
+from irods.test.fake_server import FakeServer
+
+
+class TestFakeServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer().start()
+        self.sess = self.server.session()
+        self.home = self.server.home
+        self.local_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.sess.cleanup()
+        self.server.stop()
+        self.local_dir.cleanup()
+
+    def local_file(self, name, content=b""):
+        path = os.path.join(self.local_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_login_and_home_collection(self):
+        self.assertEqual(self.sess.server_version, (4, 2, 12))
+        self.assertEqual(self.sess.collections.get(self.home).path, self.home)
+        with self.assertRaises(ex.CollectionDoesNotExist):
+            self.sess.collections.get(self.home + "/missing")
+
+    def test_negotiated_connection(self):
+        with self.server.session(
+            client_server_negotiation="request_server_negotiation",
+            client_server_policy="CS_NEG_REFUSE",
+        ) as sess:
+            self.assertTrue(sess.collections.exists(self.home))
+
+    def test_wrong_password_is_refused(self):
+        with self.assertRaises(ex.CAT_INVALID_AUTHENTICATION):
+            self.server.session(password="wrong").collections.get(self.home)
+
+    def test_put_and_get(self):
+        content = os.urandom(3 * 1024 * 1024 + 1)
+        self.sess.data_objects.put(
+            self.local_file("put.dat", content), self.home + "/obj"
+        )
+        obj = self.sess.data_objects.get(self.home + "/obj")
+        self.assertEqual(obj.size, len(content))
+        with obj.open("r") as f:
+            f.seek(1024)
+            self.assertEqual(f.read(10), content[1024:1034])
+        got = os.path.join(self.local_dir.name, "got.dat")
+        self.sess.data_objects.get(self.home + "/obj", got)
+        with open(got, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.sess.data_objects.unlink(self.home + "/obj")
+        self.assertFalse(self.sess.data_objects.exists(self.home + "/obj"))
+
+    def test_parallel_put_and_get(self):
+        content = os.urandom(1024 * 1024 + 3)
+        self.sess.data_objects.put(self.local_file("empty.dat"), self.home + "/par")
+        self.assertTrue(
+            self.sess.data_objects.parallel_put(
+                self.local_file("par.dat", content),
+                self.home + "/par",
+                total_bytes=len(content),
+                num_threads=3,
+                chunk_size=100000,
+            )
+        )
+        self.assertEqual(
+            self.sess.data_objects.get(self.home + "/par").size, len(content)
+        )
+        got = os.path.join(self.local_dir.name, "par.got")
+        self.assertTrue(
+            self.sess.data_objects.parallel_get(
+                self.home + "/par", got, num_threads=3, chunk_size=100000
+            )
+        )
+        with open(got, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_queries_are_paged(self):
+        self.sess.collections.create(self.home + "/many")
+        for i in range(12):
+            self.sess.data_objects.create("{}/many/obj_{:02d}".format(self.home, i))
+        query = (
+            self.sess.query(DataObject.name)
+            .filter(Collection.name == self.home + "/many")
+            .limit(5)
+        )
+        self.assertEqual([len(page) for page in query.get_batches()], [5, 5, 2])
+        self.assertEqual(
+            [row[DataObject.name] for row in query],
+            ["obj_{:02d}".format(i) for i in range(12)],
+        )
+        self.assertEqual(len(query.all()), 5)
+        self.assertEqual(
+            self.sess.query(DataObject.id).count(DataObject.id).one()[DataObject.id],
+            12,
+        )
+        self.assertEqual(
+            [
+                row[DataObject.name]
+                for row in self.sess.query(DataObject.name)
+                .filter(Like(DataObject.name, "obj_1%"))
+                .order_by(DataObject.name, "desc")
+            ],
+            ["obj_11", "obj_10"],
+        )
+
+    def test_metadata_and_touch(self):
+        coll = self.sess.collections.create(self.home + "/meta")
+        coll.metadata.add("a", "1", "u")
+        coll.metadata.set("b", "2")
+        coll.metadata.set("b", "3")
+        self.assertEqual(
+            sorted((m.name, m.value) for m in coll.metadata.items()),
+            [("a", "1"), ("b", "3")],
+        )
+        coll.metadata.remove("a", "1", "u")
+        self.assertEqual([m.name for m in coll.metadata.items()], ["b"])
+
+        path = self.home + "/meta/touched"
+        self.sess.data_objects.touch(path)
+        self.sess.data_objects.touch(path, seconds_since_epoch=1000000000)
+        obj = self.sess.data_objects.get(path)
+        self.assertEqual(obj.size, 0)
+        self.assertEqual(int(obj.modify_time.timestamp()), 1000000000)
+        obj.metadata.add("c", "4")
+        self.assertEqual([m.value for m in obj.metadata.get_all("c")], ["4"])
+
+        with self.assertRaises(ex.CAT_COLLECTION_NOT_EMPTY):
+            self.sess.collections.remove(self.home + "/meta", recurse=False)
+        self.sess.collections.remove(self.home + "/meta")
+        self.assertFalse(self.sess.collections.exists(self.home + "/meta"))
+
+    def test_latency_is_injected(self):
+        self.server.latency = 0.05
+        start = time.monotonic()
+        self.sess.collections.get(self.home)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
 import os
+import socket
 import sys
+import threading
 import unittest
 
 # this does not get called when imported from  runner.py
@@ -20,6 +22,14 @@ from irods.message import (
     GenQueryRequest,
     GenQueryResponseColumn,
     GenQueryResponse,
+    OpenedDataObjRequest,
+    MetadataRequest,
+    iRODSMessage,
+    XML_Parser_Type,
+    _Buffered_socket_reader,
+    _Request_template,
+    _decode_msg_header,
+    _send_message_segments,
 )
 from irods.message.ordered import OrderedProperty
 
@@ -212,5 +222,183 @@ class TestMessages(unittest.TestCase):
         property2 = OrderedProperty()
         self.assertNotEqual(property1._creation_counter, property2._creation_counter)  # pylint: disable=protected-access
 
+    def test_message_segments_are_sent_as_packed(self):
+        payload = bytearray(os.urandom(3 * 1024**2 + 5))
+        message = iRODSMessage(
+            "RODS_API_REQ",
+            msg=OpenedDataObjRequest(
+                l1descInx=3,
+                len=len(payload),
+                whence=0,
+                oprType=0,
+                offset=0,
+                bytesWritten=0,
+                KeyValPair_PI=StringStringMap(),
+            ),
+            bs=memoryview(payload),
+            int_info=676,
+        )
+        segments = message.pack_segments()
+        packed = message.pack()
+        self.assertEqual(b"".join(segments), packed)
+        # The payload is passed along without being copied.
+        self.assertIs(segments[-1].obj, payload)
+
+        sender, receiver = socket.socketpair()
+        received = bytearray()
+
+        def drain():
+            while True:
+                data = receiver.recv(1024**2)
+                if not data:
+                    break
+                received.extend(data)
+
+        drain_thread = threading.Thread(target=drain)
+        drain_thread.start()
+        try:
+            _send_message_segments(sender, segments)
+        finally:
+            sender.close()
+            drain_thread.join()
+            receiver.close()
+        self.assertEqual(bytes(received), packed)
+
+    def test_msg_header_decoding(self):
+        headers = [
+            iRODSMessage.pack_header("RODS_API_REPLY", 56, 0, 4194304, 0)[4:],
+            # As formatted by the server:
+            b"<MsgHeader_PI>\n<type>RODS_API_REPLY</type>\n<msgLen>0</msgLen>\n<errorLen>183</errorLen>\n"
+            b"<bsLen>0</bsLen>\n<intInfo>-808000</intInfo>\n</MsgHeader_PI>\n\0",
+            # Not handled by the fast decoder, so must be left to the XML parser:
+            b"<MsgHeader_PI><type>A&amp;B</type><msgLen>1</msgLen><errorLen>2</errorLen>"
+            b"<bsLen>3</bsLen><intInfo>4</intInfo></MsgHeader_PI>",
+        ]
+        expected = [
+            ("RODS_API_REPLY", 56, 0, 4194304, 0),
+            ("RODS_API_REPLY", 0, 183, 0, -808000),
+            ("A&B", 1, 2, 3, 4),
+        ]
+        for parser in (XML_Parser_Type.STANDARD_XML, XML_Parser_Type.SECURE_XML):
+            with self.subTest(parser=parser):
+                ET(parser)
+                try:
+                    self.assertEqual([_decode_msg_header(h) for h in headers], expected)
+                finally:
+                    ET(None)
+
+    def test_buffered_socket_reader(self):
+        class CountingSocket:
+            def __init__(self, sock):
+                self.sock = sock
+                self.recv_calls = 0
+
+            def recv_into(self, *args):
+                self.recv_calls += 1
+                return self.sock.recv_into(*args)
+
+            def __getattr__(self, name):
+                return getattr(self.sock, name)
+
+        payload = os.urandom(200 * 1024)
+        messages = [
+            iRODSMessage("RODS_API_REPLY", int_info=0),
+            iRODSMessage("RODS_API_REPLY", error=b"<RError_PI></RError_PI>", int_info=-1),
+            iRODSMessage("RODS_API_REPLY", bs=payload, int_info=len(payload)),
+            iRODSMessage("RODS_API_REPLY", bs=payload, int_info=len(payload)),
+        ]
+        sender, receiver = socket.socketpair()
+        send_thread = threading.Thread(
+            target=sender.sendall, args=(b"".join(m.pack() for m in messages),)
+        )
+        send_thread.start()
+        try:
+            counting_socket = CountingSocket(receiver)
+            reader = _Buffered_socket_reader(counting_socket)
+            first = iRODSMessage.recv(reader)
+            # A small response is had from a single recv call.
+            self.assertEqual(counting_socket.recv_calls, 1)
+            self.assertEqual((first.int_info, first.error, first.bs), (0, None, None))
+            second = iRODSMessage.recv(reader)
+            self.assertEqual(second.error, b"<RError_PI></RError_PI>")
+            third = iRODSMessage.recv(reader)
+            self.assertEqual(third.bs, payload)
+            buffer = bytearray(len(payload))
+            fourth = iRODSMessage.recv_into(reader, buffer)
+            self.assertEqual(bytes(fourth.bs), payload)
+            self.assertEqual(buffer, payload)
+        finally:
+            send_thread.join()
+            sender.close()
+            receiver.close()
+
+    def test_compiled_and_generic_pack_and_unpack_agree(self):
+        kvp = StringStringMap({"one": "<&>", "two": b"bytes"})
+        gq = GenQueryRequest(
+            maxRows=500,
+            continueInx=0,
+            partialStartIndex=0,
+            options=0,
+            KeyValPair_PI=kvp,
+            InxIvalPair_PI=IntegerIntegerMap({501: 1, 403: 1}),
+            InxValPair_PI=IntegerStringMap({501: "= 'x'"}),
+        )
+        messages = [
+            OpenedDataObjRequest(
+                l1descInx=3,
+                len=4194304,
+                whence=0,
+                oprType=0,
+                offset=2**40,
+                bytesWritten=0,
+                KeyValPair_PI=kvp,
+            ),
+            gq,
+            MetadataRequest("add", "-d", "/tempZone/home/rods/x", "a", "v", "u"),
+            AuthResponse(response=b"\x00\x01binary", username="rods"),
+        ]
+        for message in messages:
+            with self.subTest(message=type(message).__name__):
+                packed = message.pack()
+                self.assertEqual(packed, message._generic_pack())
+                for parser in (
+                    XML_Parser_Type.STANDARD_XML,
+                    XML_Parser_Type.QUASI_XML,
+                    XML_Parser_Type.SECURE_XML,
+                ):
+                    ET(parser)
+                    try:
+                        compiled, generic = type(message)(), type(message)()
+                        compiled.unpack(ET().fromstring(packed))
+                        generic._generic_unpack(ET().fromstring(packed))
+                    finally:
+                        ET(None)
+                    self.assertEqual(compiled._values.keys(), generic._values.keys())
+                    self.assertEqual(compiled.pack(), generic._generic_pack())
+
+    def test_request_template_packs_as_message(self):
+        def request(**fields):
+            return OpenedDataObjRequest(
+                oprType=0, bytesWritten=0, KeyValPair_PI=StringStringMap(), **fields
+            )
+
+        template = _Request_template(
+            request(l1descInx=0, len=0, whence=0, offset=0),
+            676,
+            ("offset", "l1descInx", "len", "whence"),
+        )
+        payload = bytearray(b"100% data")
+        for fields, bs in [
+            (dict(l1descInx=3, len=0, whence=0, offset=0), b""),
+            (dict(l1descInx=1024, len=len(payload), whence=1, offset=2**40), memoryview(payload)),
+            (dict(l1descInx=3, len=-1, whence=2, offset=-5), b""),
+        ]:
+            with self.subTest(**fields):
+                expected = iRODSMessage(
+                    "RODS_API_REQ", msg=request(**fields), bs=bs, int_info=676
+                ).pack()
+                self.assertEqual(template(bs=bs, **fields).pack(), expected)
+
+
 if __name__ == "__main__":
     unittest.main()
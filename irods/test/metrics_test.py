@@ -0,0 +1,97 @@
+#! /usr/bin/env python
+
+import collections
+import os
+import re
+import socket
+import sys
+import threading
+import unittest
+
+import irods.exception as ex
+import irods.metrics
+from irods.connection import Connection
+from irods.message import FileSeekResponse, _Buffered_socket_reader, iRODSMessage
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.client_socket, self.server_socket = socket.socketpair()
+        self.server = threading.Thread(target=self._serve, daemon=True)
+        self.server.start()
+        # A connection made over the socket pair, skipping the handshake with a server.
+        self.conn = Connection.__new__(Connection)
+        self.conn.socket = self.client_socket
+        self.conn._reader = None
+        self.conn._samples = collections.deque()
+        self.conn.pool = None
+
+    def tearDown(self):
+        irods.metrics.disable()
+        self.client_socket.close()
+        self.server.join()
+        self.server_socket.close()
+
+    def _serve(self):
+        # Answer reads with as many bytes as requested, seeks with offset 5, and all else with CAT_NO_ROWS_FOUND.
+        reader = _Buffered_socket_reader(self.server_socket)
+        while True:
+            try:
+                request = iRODSMessage.recv(reader)
+            except (OSError, ValueError):
+                return
+            if request.int_info == 675:
+                size = int(re.search(rb"<len>(\d+)</len>", request.msg).group(1))
+                response = iRODSMessage("RODS_API_REPLY", bs=b"x" * size, int_info=size)
+            elif request.int_info == 674:
+                response = iRODSMessage("RODS_API_REPLY", msg=FileSeekResponse(offset=5))
+            else:
+                response = iRODSMessage("RODS_API_REPLY", int_info=-808000)
+            self.server_socket.sendall(response.pack())
+
+    def test_requests_are_recorded_by_api(self):
+        recorded = []
+        registry = irods.metrics.enable(callback=lambda api, m: recorded.append(api))
+
+        # Pipelined reads are attributed in order.
+        for size in (100, 200, 300):
+            self.conn.send_read_file(3, size)
+        self.assertEqual([len(self.conn.recv_read_file()) for _ in range(3)], [100, 200, 300])
+        self.assertEqual(self.conn.seek_file(3, 5, os.SEEK_SET), 5)
+        with self.assertRaises(ex.CAT_NO_ROWS_FOUND):
+            self.conn.send(iRODSMessage("RODS_API_REQ", int_info=702))
+            self.conn.recv()
+
+        reads = registry.stats("DATA_OBJ_READ_AN")
+        self.assertEqual(reads["count"], 3)
+        self.assertGreater(reads["bytes_in"], 600)
+        self.assertGreater(reads["bytes_out"], 0)
+        self.assertGreater(registry.stats("DATA_OBJ_LSEEK_AN")["times"]["parse"], 0)
+        self.assertEqual(registry.stats("GEN_QUERY_AN")["errors"], {-808000: 1})
+        self.assertEqual(
+            recorded,
+            ["DATA_OBJ_READ_AN"] * 3
+            + ["DATA_OBJ_LSEEK_AN"] * 2  # The request, and the parse of its response.
+            + ["GEN_QUERY_AN"],
+        )
+
+        exposition = registry.to_prometheus()
+        self.assertIn('irods_client_requests_total{api="DATA_OBJ_READ_AN"} 3\n', exposition)
+        self.assertIn(
+            'irods_client_errors_total{api="GEN_QUERY_AN",code="-808000"} 1\n', exposition
+        )
+
+    def test_nothing_is_recorded_while_disabled(self):
+        registry = irods.metrics.enable()
+        irods.metrics.disable()
+        self.conn.send_read_file(3, 10)
+        self.conn.recv_read_file()
+        self.assertEqual(registry.as_dict(), {})
+        self.assertEqual(len(self.conn._samples), 0)
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
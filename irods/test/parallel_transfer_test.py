@@ -0,0 +1,99 @@
+#! /usr/bin/env python
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import irods.exception as ex
+import irods.parallel
+from irods.test.fake_server import FakeServer
+
+
+class TestParallelTransferRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer().start()
+        self.sess = self.server.session()
+        self.home = self.server.home
+        self.local_dir = tempfile.TemporaryDirectory()
+        self.content = os.urandom(1024 * 1024 + 7)
+        self.local_file = os.path.join(self.local_dir.name, "put.dat")
+        with open(self.local_file, "wb") as f:
+            f.write(self.content)
+        # Let the number of transfer threads not be limited by the CPUs of the test host.
+        patcher = mock.patch("multiprocessing.cpu_count", return_value=4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.sess.cleanup()
+        self.server.stop()
+        self.local_dir.cleanup()
+
+    def break_connections(self, failing_threads, count=1):
+        """Patch irods.parallel._copy_bytes so that the first `count' calls made by the transfer
+        threads named in `failing_threads' disconnect their data object handle and fail as for a
+        connection reset."""
+        copy_bytes = irods.parallel._copy_bytes
+        remaining = [count]
+        lock = threading.Lock()
+
+        def unreliable_copy_bytes(src, dst, length, queueObject, debug_info, *a, **kw):
+            with lock:
+                fail = debug_info in failing_threads and remaining[0] > 0
+                if fail:
+                    remaining[0] -= 1
+            if fail:
+                handle = (
+                    dst if isinstance(src, irods.parallel.io.BufferedReader) else src
+                )
+                handle.raw.conn.disconnect()
+                raise ex.NetworkException("simulated connection reset")
+            return copy_bytes(src, dst, length, queueObject, debug_info, *a, **kw)
+
+        return mock.patch.multiple(
+            irods.parallel,
+            _copy_bytes=unreliable_copy_bytes,
+            DEFAULT_RETRY_BACKOFF=0.01,
+        )
+
+    def parallel_put(self, **options):
+        logical_path = self.home + "/put.dat"
+        errors = []
+        result = self.sess.data_objects.parallel_put(
+            self.local_file,
+            logical_path,
+            total_bytes=len(self.content),
+            num_threads=3,
+            chunk_size=100000,
+            errors=errors,
+            **options
+        )
+        return result, errors, logical_path
+
+    def test_put_survives_reset_on_first_thread_connection(self):
+        # The first transfer thread is the one that formerly wrote through the initial
+        # descriptor, through which the replica is finalized.
+        with self.break_connections({"1"}):
+            result, errors, logical_path = self.parallel_put(retries=2)
+        self.assertTrue(result)
+        self.assertEqual([(e.thread, e.attempt) for e in errors], [("1", 1)])
+        with self.sess.data_objects.open(logical_path, "r") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(
+            self.sess.data_objects.get(logical_path).size, len(self.content)
+        )
+
+    def test_put_fails_once_retries_are_exhausted(self):
+        with self.break_connections({"1", "2", "3"}, count=sys.maxsize):
+            with self.assertRaises(ex.NetworkException):
+                self.parallel_put(retries=1)
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
@@ -0,0 +1,159 @@
+#! /usr/bin/env python
+
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import irods.exception as ex
+import irods.pool
+from irods.test.fake_server import FakeServer
+
+
+class TestPoolCheckout(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_connecting_does_not_hold_the_pool_lock(self):
+        connect = irods.pool.Connection
+        connecting, proceed = threading.Event(), threading.Event()
+
+        def slow_connection(*args):
+            connecting.set()
+            proceed.wait(10)
+            return connect(*args)
+
+        with self.server.session(pool_max_size=2, pool_checkout_timeout=5) as sess:
+            pool = sess.pool
+            first = pool.get_connection()
+            with mock.patch.object(irods.pool, "Connection", slow_connection):
+                opener = threading.Thread(target=pool.get_connection)
+                opener.start()
+                self.assertTrue(connecting.wait(10))
+                # While the second connection is being made, the first is released and
+                # checked out again.
+                released = threading.Thread(
+                    target=lambda: (pool.release_connection(first), pool.get_connection())
+                )
+                released.start()
+                released.join(5)
+                blocked = released.is_alive()
+                proceed.set()
+                opener.join(10)
+                released.join(10)
+            self.assertFalse(blocked)
+            self.assertEqual(len(pool.active), 2)
+            self.assertEqual(pool._reserved, 0)
+
+    def test_failed_connect_gives_back_its_place(self):
+        connect = irods.pool.Connection
+        attempts = []
+
+        def unreliable_connection(*args):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise ex.NetworkException("simulated connection failure")
+            return connect(*args)
+
+        with self.server.session(pool_max_size=1, pool_checkout_timeout=1) as sess:
+            pool = sess.pool
+            with mock.patch.object(irods.pool, "Connection", unreliable_connection):
+                with self.assertRaises(ex.NetworkException):
+                    pool.get_connection()
+                self.assertEqual(pool._reserved, 0)
+                conn = pool.get_connection()
+            self.assertEqual(pool.active, {conn})
+            self.assertEqual(len(attempts), 2)
+
+    def test_prewarm_threads_are_limited(self):
+        connect = irods.pool.Connection
+        lock = threading.Lock()
+        opening, peak = [0], [0]
+
+        def counted_connection(*args):
+            with lock:
+                opening[0] += 1
+                peak[0] = max(peak[0], opening[0])
+            try:
+                time.sleep(0.05)
+                return connect(*args)
+            finally:
+                with lock:
+                    opening[0] -= 1
+
+        with self.server.session() as sess:
+            with mock.patch.object(irods.pool, "Connection", counted_connection):
+                self.assertEqual(sess.pool.prewarm(6, max_threads=2), 6)
+            self.assertEqual(len(sess.pool.idle), 6)
+            self.assertEqual(peak[0], 2)
+
+    def test_liveness_probe_of_a_high_numbered_descriptor(self):
+        high_fd = 2000
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= high_fd:
+            self.skipTest("The open file limit is too low.")
+        with self.server.session() as sess:
+            conn = sess.pool.get_connection()
+            original = conn.socket
+            # A descriptor beyond FD_SETSIZE (1024), as in a process with many files open.
+            conn.socket = socket.socket(fileno=os.dup2(original.fileno(), high_fd))
+            try:
+                self.assertTrue(conn.is_alive())
+            finally:
+                conn.socket.close()
+                conn.socket = original
+            conn.release()
+
+    def test_reap_probes_without_the_pool_lock(self):
+        with self.server.session() as sess:
+            pool = sess.pool
+            healthy, dead = pool.get_connection(), pool.get_connection()
+            healthy.release()
+            dead.release()
+            dead.socket.shutdown(socket.SHUT_RDWR)
+            lock_taken = []
+            is_alive = irods.pool.Connection.is_alive
+
+            def take_lock():
+                taken = pool._lock.acquire(timeout=1)
+                lock_taken.append(taken)
+                if taken:
+                    pool._lock.release()
+
+            def probe(conn):
+                # Another thread can take the pool lock while the probe is made.
+                thread = threading.Thread(target=take_lock)
+                thread.start()
+                thread.join()
+                return is_alive(conn)
+
+            with mock.patch.object(irods.pool.Connection, "is_alive", probe):
+                self.assertEqual(pool.reap(), 1)
+            self.assertTrue(lock_taken and all(lock_taken))
+            self.assertEqual(pool.idle, {healthy})
+            self.assertEqual(pool._reserved, 0)
+
+    def test_evicted_redirect_session_closes_its_connections_as_released(self):
+        with self.server.session(redirect_cache_size=1) as sess:
+            evicted = sess._redirect_session(self.server.host)
+            conn = evicted.pool.get_connection()
+            # A redirect to another host evicts the first session, whose connection is
+            # still checked out.
+            sess._redirect_session("localhost")
+            self.assertEqual(evicted.pool.active, {conn})
+            conn.release()
+            self.assertEqual((evicted.pool.active, evicted.pool.idle), (set(), set()))
+            self.assertIsNone(conn.socket)
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
@@ -8,6 +8,7 @@ import os
 import re
 import sys
 import tempfile
+import threading
 import time
 import json
 import unittest
@@ -15,6 +16,7 @@ import socket
 from typing import Any, Dict
 import irods.test.helpers as helpers
 from irods.connection import DESTRUCTOR_MSG
+from irods.exception import ConnectionPoolTimeout
 
 #  Regular expression to match common synonyms for localhost.
 #
@@ -349,6 +351,122 @@ class TestPool(unittest.TestCase):
                 self.assertTrue(DESTRUCTOR_MSG in lines)
         file_handler.close()
 
+    def test_bounded_pool_makes_checkouts_wait__and_times_out(self):
+        with helpers.make_session(
+            pool_max_size=2, pool_checkout_timeout=0.5
+        ) as sess:
+            pool = sess.pool
+            first = pool.get_connection()
+            second = pool.get_connection()
+            self.assertEqual(pool.saturation, 1.0)
+            with self.assertRaises(ConnectionPoolTimeout):
+                pool.get_connection()
+            self.assertEqual(pool.metrics.timeouts, 1)
+
+            # A connection released by another thread goes to the waiting checkout.
+            pool.checkout_timeout = None
+            timer = threading.Timer(0.2, first.release)
+            timer.start()
+            third = pool.get_connection()
+            timer.join()
+            self.assertIs(third, first)
+            self.assertEqual(pool.metrics.connections_created, 2)
+            self.assertEqual(pool.metrics.waits, 2)
+            self.assertGreater(pool.metrics.max_wait_time, 0.1)
+            third.release()
+            second.release()
+            self.assertEqual(len(pool.idle), 2)
+
+    def test_bounded_pool_serves_many_threads(self):
+        with helpers.make_session(pool_max_size=3) as sess:
+            home = helpers.home_collection(sess)
+            paths = []
+
+            def query_home():
+                paths.append(sess.collections.get(home).path)
+
+            threads = [threading.Thread(target=query_home) for _ in range(12)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(paths, [home] * 12)
+            self.assertLessEqual(sess.pool.metrics.peak_active, 3)
+            self.assertLessEqual(len(sess.pool.idle), 3)
+
+    def test_prewarmed_connections_are_idle_and_reused(self):
+        with helpers.make_session(pool_prewarm=3) as sess:
+            pool = sess.pool
+            self.assertEqual(len(pool.idle), 3)
+            prewarmed = set(pool.idle)
+            with pool.get_connection() as conn:
+                self.assertIn(conn, prewarmed)
+            self.assertEqual(pool.prewarm(5, parallel=False), 2)
+            self.assertEqual(len(pool.idle), 5)
+            self.assertEqual(pool.metrics.connections_created, 5)
+
+    def test_prewarm_respects_max_size(self):
+        with helpers.make_session(pool_max_size=2) as sess:
+            self.assertEqual(sess.pool.prewarm(4), 2)
+            self.assertEqual(len(sess.pool.idle), 2)
+
+    def test_idle_connections_are_reaped_by_idle_time_and_count(self):
+        with helpers.make_session(
+            pool_max_idle_count=2, pool_max_idle_time=1
+        ) as sess:
+            pool = sess.pool
+            connections = [pool.get_connection() for _ in range(4)]
+            for conn in connections:
+                conn.release()
+            self.assertEqual(len(pool.idle), 2)
+            self.assertEqual(pool.metrics.connections_discarded, 2)
+            self.assertTrue(all(conn.is_alive() for conn in pool.idle))
+            time.sleep(1.5)
+            self.assertEqual(pool.reap(), 2)
+            self.assertEqual(len(pool.idle), 0)
+
+    def test_connection_failing_liveness_probe_is_not_reused(self):
+        with helpers.make_session(pool_probe_on_checkout=True) as sess:
+            with sess.pool.get_connection() as conn:
+                pass
+            self.assertTrue(conn.is_alive())
+            conn.socket.close()
+            self.assertFalse(conn.is_alive())
+            with sess.pool.get_connection() as conn2:
+                self.assertIsNot(conn2, conn)
+            self.assertEqual(sess.pool.metrics.connections_discarded, 1)
+
+    def test_background_reaper_discards_expired_connections(self):
+        with helpers.make_session(
+            pool_max_lifetime=0.5, pool_reap_interval=0.2
+        ) as sess:
+            with sess.pool.get_connection():
+                pass
+            self.assertEqual(len(sess.pool.idle), 1)
+            time.sleep(1.5)
+            self.assertEqual(len(sess.pool.idle), 0)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_forked_child_does_not_share_connections_with_parent(self):
+        home = helpers.home_collection(self.sess)
+        with self.sess.pool.get_connection() as conn:
+            pass
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                if not (self.sess.pool.idle or self.sess.pool.active):
+                    self.sess.collections.get(home)
+                    status = 0 if conn not in self.sess.pool.idle else 1
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        # The parent's connection was left intact by the child.
+        self.assertIn(conn, self.sess.pool.idle)
+        self.assertTrue(conn.is_alive())
+        self.sess.collections.get(home)
+
     def test_get_connection_refresh_time_no_env_file_input_param(self):
         connection_refresh_time = self.sess.get_connection_refresh_time(
             first_name="Magic", last_name="Johnson"
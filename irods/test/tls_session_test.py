@@ -0,0 +1,111 @@
+#! /usr/bin/env python
+
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import types
+import unittest
+
+from irods.connection import Connection
+from irods.pool import Pool
+
+
+class _TLS_server:
+    """Accepts connections, upgrades each to TLS, and answers the client's encryption headers
+    with a byte, so that the client receives any session ticket."""
+
+    def __init__(self, cert_file, key_file):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(cert_file, key_file)
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            try:
+                with self.context.wrap_socket(sock, server_side=True) as tls:
+                    tls.recv(4096)
+                    tls.sendall(b"\0")
+                    tls.recv(1)
+            except (OSError, ssl.SSLError):
+                pass
+
+    def close(self):
+        self.listener.close()
+
+
+@unittest.skipIf(shutil.which("openssl") is None, "openssl is needed to make a certificate")
+class TestTLSSessionResumption(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        cert_file = os.path.join(self.directory.name, "cert.pem")
+        key_file = os.path.join(self.directory.name, "key.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+            + ["-subj", "/CN=localhost", "-keyout", key_file, "-out", cert_file],
+            check=True,
+            capture_output=True,
+        )
+        self.server = _TLS_server(cert_file, key_file)
+        self.account = types.SimpleNamespace(
+            host="127.0.0.1",
+            port=self.server.port,
+            encryption_algorithm="AES-256-CBC",
+            encryption_key_size=32,
+            encryption_num_hash_rounds=16,
+            encryption_salt_size=8,
+        )
+        self.pool = Pool(self.account)
+
+    def tearDown(self):
+        self.server.close()
+        self.directory.cleanup()
+
+    def client_context(self):
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
+    def connect(self):
+        """Make the TLS part of a connection's startup, returning whether it resumed a session."""
+        conn = Connection.__new__(Connection)
+        conn.account = self.account
+        conn.pool = self.pool
+        conn.socket = socket.create_connection(("127.0.0.1", self.server.port))
+        conn.ssl_startup()
+        try:
+            conn.socket.recv(1)
+            conn._remember_tls_session()
+            return conn.socket.session_reused
+        finally:
+            conn.socket.close()
+
+    def test_session_is_resumed_only_through_its_context(self):
+        self.account.ssl_context = self.client_context()
+        self.assertFalse(self.connect())
+        self.assertTrue(self.connect())
+        # With a new context, as from changed settings, a full handshake is made.
+        self.account.ssl_context = self.client_context()
+        self.assertFalse(self.connect())
+        self.assertTrue(self.connect())
+        self.assertEqual(self.pool.metrics.tls_handshakes, 4)
+        self.assertEqual(self.pool.metrics.tls_sessions_reused, 2)
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
@@ -0,0 +1,153 @@
+#! /usr/bin/env python
+
+import concurrent.futures
+import contextlib
+import inspect
+import os
+import sys
+import threading
+import unittest
+
+import irods.tracing as tracing
+from irods.manager.data_object_manager import DataObjectManager
+from irods.test.fake_server import FakeServer
+
+
+class RecordingSpan(tracing.Span):
+
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.parent = parent
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class RecordingTracer(tracing.Tracer):
+    """Keeps the spans started, noting for each the client span enclosing it."""
+
+    def __init__(self):
+        self.spans = []
+
+    @contextlib.contextmanager
+    def start_span(self, name, attributes):
+        span = RecordingSpan(name, attributes, parent=tracing.current_span())
+        self.spans.append(span)
+        try:
+            yield span
+        finally:
+            span.ended = True
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = RecordingTracer()
+        tracing.set_tracer(self.tracer)
+
+    def tearDown(self):
+        tracing.set_tracer(None)
+
+    def test_spans_nest_and_carry_attributes(self):
+        with tracing.span("outer", {"irods.path": "/z/a", "irods.resc_hier": None}) as outer:
+            with tracing.span("inner") as inner:
+                inner.set_attribute("irods.bytes", 5)
+                self.assertIs(tracing.current_span(), inner)
+            self.assertIs(tracing.current_span(), outer)
+        self.assertIsInstance(tracing.current_span(), tracing.Span)
+        self.assertNotIn(tracing.current_span(), self.tracer.spans)
+
+        (outer, inner) = self.tracer.spans
+        self.assertEqual(
+            outer.attributes, {"irods.path": "/z/a", "thread.id": threading.get_ident()}
+        )
+        self.assertEqual(inner.attributes["irods.bytes"], 5)
+        self.assertIs(inner.parent, outer)
+        self.assertTrue(outer.ended and inner.ended)
+
+    def test_span_ends_when_an_exception_is_raised(self):
+        with self.assertRaises(KeyError):
+            with tracing.span("failing"):
+                raise KeyError
+        self.assertTrue(self.tracer.spans[0].ended)
+        self.assertNotIn(tracing.current_span(), self.tracer.spans)
+
+    def test_propagated_spans_nest_across_threads(self):
+        def work():
+            with tracing.span("thread") as span:
+                return span.attributes["thread.id"]
+
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            with tracing.span("transfer") as transfer:
+                futures = [executor.submit(tracing.propagating(work)) for _ in range(2)]
+                thread_ids = [f.result() for f in futures]
+        self.assertNotIn(threading.get_ident(), thread_ids)
+        self.assertEqual(
+            [span.parent for span in self.tracer.spans if span.name == "thread"],
+            [transfer, transfer],
+        )
+
+    def test_nothing_is_traced_without_a_tracer(self):
+        tracing.set_tracer(None)
+        function = lambda: None
+        self.assertIs(tracing.propagating(function), function)
+        with tracing.span("untraced", {"irods.path": "/z/a"}) as span:
+            span.set_attribute("irods.bytes", 1)
+        self.assertEqual(self.tracer.spans, [])
+
+    def test_opentelemetry_adapter(self):
+        calls = []
+
+        class OTelTracer:
+            def start_as_current_span(self, name, attributes=None):
+                calls.append((name, attributes))
+                return contextlib.nullcontext(RecordingSpan(name, attributes, None))
+
+        tracing.set_tracer(tracing.OpenTelemetryTracer(OTelTracer()))
+        with tracing.span("irods.auth", {"irods.auth_scheme": "native"}) as span:
+            self.assertEqual(span.name, "irods.auth")
+        self.assertEqual(
+            calls,
+            [
+                (
+                    "irods.auth",
+                    {"irods.auth_scheme": "native", "thread.id": threading.get_ident()},
+                )
+            ],
+        )
+
+    def test_data_object_open_span(self):
+        with FakeServer() as server, server.session() as sess:
+            path = server.home + "/traced.dat"
+            with sess.data_objects.open(path, "w") as f:
+                f.write(b"traced")
+        (open_span,) = [s for s in self.tracer.spans if s.name == "irods.data_object.open"]
+        self.assertEqual(open_span.attributes["irods.path"], path)
+        self.assertEqual(open_span.attributes["irods.mode"], "w")
+        # Set once the data object is opened, on the span enclosing the open.
+        self.assertEqual(open_span.attributes["irods.host"], server.host)
+        self.assertTrue(open_span.ended)
+
+    def test_traced_functions_keep_their_signatures(self):
+        @tracing.traced("add", lambda a, b=1: {"a": a})
+        def add(a, b=1):
+            """Add."""
+            return a + b
+
+        self.assertEqual(add(2, b=3), 5)
+        self.assertEqual((add.__name__, add.__doc__), ("add", "Add."))
+        (span,) = self.tracer.spans
+        self.assertEqual((span.name, span.attributes["a"]), ("add", 2))
+        parameters = inspect.signature(DataObjectManager.open).parameters
+        self.assertLessEqual(
+            {"create", "auto_close", "allow_redirect", "read_ahead", "write_behind"},
+            set(parameters),
+        )
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
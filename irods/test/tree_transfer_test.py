@@ -0,0 +1,537 @@
+#! /usr/bin/env python
+
+import base64
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import irods.exception as ex
+import irods.manager.data_object_manager as data_object_manager
+from irods.models import DataObject
+from irods.test.fake_server import FakeServer
+
+
+class TestTreeTransfer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer().start()
+        self.sess = self.server.session()
+        self.home = self.server.home
+        self.local_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.sess.cleanup()
+        self.server.stop()
+        self.local_dir.cleanup()
+
+    def make_tree(self, root, files):
+        """Write the files named (by '/'-separated relative paths) as keys of `files', with
+        the values as content."""
+        for relative, content in files.items():
+            path = os.path.join(root, *relative.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content)
+
+    def sample_files(self):
+        return {
+            "top.dat": os.urandom(1000),
+            "empty.dat": b"",
+            "a/one.dat": os.urandom(70000),
+            "a/b/two.dat": b"two",
+            "a/b/c/three.dat": b"three",
+            "d/four.dat": b"four",
+        }
+
+    def remote_files(self, coll_path):
+        return {
+            obj.path[len(coll_path) + 1 :]: obj.open("r").read()
+            for _, _, objs in self.sess.collections.get(coll_path).walk()
+            for obj in objs
+        }
+
+    def test_put_tree(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = self.sample_files()
+        self.make_tree(source, files)
+        os.makedirs(os.path.join(source, "e", "empty_dir"))
+        progress = []
+
+        failures = self.sess.data_objects.put_tree(
+            source, self.home + "/tree/up", num_workers=3, updatables=progress.append
+        )
+
+        self.assertEqual(failures, [])
+        self.assertEqual(self.remote_files(self.home + "/tree/up"), files)
+        self.assertTrue(
+            self.sess.collections.exists(self.home + "/tree/up/e/empty_dir")
+        )
+        self.assertEqual(sum(progress), sum(len(c) for c in files.values()))
+
+    def test_put_tree_reports_each_failed_file(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = self.sample_files()
+        self.make_tree(source, files)
+        self.sess.collections.create(self.home + "/up/a")
+        self.sess.data_objects.put(
+            os.path.join(source, "a", "one.dat"), self.home + "/up/a/one.dat"
+        )
+
+        failures = self.sess.data_objects.put_tree(
+            source, self.home + "/up", forceFlag=None
+        )
+
+        self.assertEqual(
+            [(f.local_path, f.logical_path) for f in failures],
+            [(os.path.join(source, "a", "one.dat"), self.home + "/up/a/one.dat")],
+        )
+        self.assertIsInstance(failures[0].exception, ex.OVERWRITE_WITHOUT_FORCE_FLAG)
+        del files["a/one.dat"]
+        uploaded = self.remote_files(self.home + "/up")
+        del uploaded["a/one.dat"]
+        self.assertEqual(uploaded, files)
+
+        # Forced, as by default, the existing data object is overwritten.
+        self.assertEqual(self.sess.data_objects.put_tree(source, self.home + "/up"), [])
+
+    def refuse_to_create(self, refused):
+        """Patch the session's collection creation to fail for the collection `refused'."""
+        create = self.sess.collections._create
+
+        def _create(path, *args, **kwargs):
+            if path == refused:
+                raise ex.CAT_NO_ACCESS_PERMISSION("simulated failure")
+            return create(path, *args, **kwargs)
+
+        return mock.patch.object(self.sess.collections, "_create", _create)
+
+    def test_put_tree_reports_a_failed_collection(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = self.sample_files()
+        self.make_tree(source, files)
+        coll = self.home + "/up"
+        with self.refuse_to_create(coll + "/a"):
+            failures = self.sess.data_objects.put_tree(source, coll)
+        self.assertEqual(
+            [(f.local_path, f.logical_path) for f in failures],
+            [(os.path.join(source, "a"), coll + "/a")],
+        )
+        self.assertIsInstance(failures[0].exception, ex.CAT_NO_ACCESS_PERMISSION)
+        # Nothing beneath the failed collection is attempted; the rest is uploaded.
+        self.assertEqual(
+            self.remote_files(coll),
+            {k: v for k, v in files.items() if not k.startswith("a/")},
+        )
+
+    def test_put_tree_sends_large_files_in_parallel(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"big.dat": os.urandom(300000), "small.dat": b"small"}
+        self.make_tree(source, files)
+        with mock.patch.object(
+            data_object_manager, "MAXIMUM_SINGLE_THREADED_TRANSFER_SIZE", 100000
+        ), mock.patch.object(
+            data_object_manager.DataObjectManager,
+            "parallel_put",
+            autospec=True,
+            side_effect=data_object_manager.DataObjectManager.parallel_put,
+        ) as parallel_put:
+            failures = self.sess.data_objects.put_tree(
+                source, self.home + "/up", num_threads=2
+            )
+        self.assertEqual(failures, [])
+        self.assertEqual(parallel_put.call_count, 1)
+        self.assertEqual(self.remote_files(self.home + "/up"), files)
+
+    def test_put_tree_requires_a_directory(self):
+        with self.assertRaises(NotADirectoryError):
+            self.sess.data_objects.put_tree(
+                os.path.join(self.local_dir.name, "missing"), self.home + "/up"
+            )
+
+    def local_files(self, root):
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root).replace(os.sep, "/")] = f.read()
+        return files
+
+    def put_sample_tree(self, coll_path):
+        source = os.path.join(self.local_dir.name, "source")
+        files = self.sample_files()
+        self.make_tree(source, files)
+        self.assertEqual(self.sess.data_objects.put_tree(source, coll_path), [])
+        return files
+
+    def test_get_tree(self):
+        files = self.put_sample_tree(self.home + "/down")
+        self.sess.collections.create(self.home + "/down/e/empty_coll")
+        destination = os.path.join(self.local_dir.name, "destination")
+        progress = []
+
+        failures = self.sess.data_objects.get_tree(
+            self.home + "/down", destination, num_workers=3, updatables=progress.append
+        )
+
+        self.assertEqual(failures, [])
+        self.assertEqual(self.local_files(destination), files)
+        self.assertTrue(os.path.isdir(os.path.join(destination, "e", "empty_coll")))
+        self.assertEqual(sum(progress), sum(len(c) for c in files.values()))
+
+    def test_get_tree_lists_the_tree_in_bulk(self):
+        self.put_sample_tree(self.home + "/down")
+        self.server.api_counts.clear()
+        self.sess.data_objects.get_tree(
+            self.home + "/down", os.path.join(self.local_dir.name, "destination")
+        )
+        self.assertEqual(self.server.api_counts["GEN_QUERY_AN"], 4)
+
+    def test_get_tree_filters(self):
+        files = self.put_sample_tree(self.home + "/down")
+        destination = os.path.join(self.local_dir.name, "destination")
+        self.sess.data_objects.get_tree(
+            self.home + "/down",
+            destination,
+            include=["a/*", "top.dat"],
+            exclude=["*/c/*"],
+        )
+        self.assertEqual(
+            self.local_files(destination),
+            {k: files[k] for k in ("top.dat", "a/one.dat", "a/b/two.dat")},
+        )
+
+    def test_get_tree_reports_each_failed_object(self):
+        files = self.put_sample_tree(self.home + "/down")
+        destination = os.path.join(self.local_dir.name, "destination")
+        self.make_tree(destination, {"d/four.dat": b"local"})
+
+        failures = self.sess.data_objects.get_tree(self.home + "/down", destination)
+
+        self.assertEqual(
+            [(f.local_path, f.logical_path) for f in failures],
+            [
+                (
+                    os.path.join(destination, "d", "four.dat"),
+                    self.home + "/down/d/four.dat",
+                )
+            ],
+        )
+        self.assertIsInstance(failures[0].exception, ex.OVERWRITE_WITHOUT_FORCE_FLAG)
+        self.assertEqual(
+            self.local_files(destination), dict(files, **{"d/four.dat": b"local"})
+        )
+
+        self.assertEqual(
+            self.sess.data_objects.get_tree(
+                self.home + "/down", destination, forceFlag=""
+            ),
+            [],
+        )
+        self.assertEqual(self.local_files(destination), files)
+
+    def test_trees_from_the_root_collection(self):
+        files = self.put_sample_tree(self.home + "/down")
+        under_root = {
+            self.home.lstrip("/") + "/down/" + relative: content
+            for relative, content in files.items()
+        }
+        destination = os.path.join(self.local_dir.name, "destination")
+        self.assertEqual(self.sess.data_objects.get_tree("/", destination), [])
+        self.assertEqual(self.local_files(destination), under_root)
+
+        synced = os.path.join(self.local_dir.name, "synced")
+        os.mkdir(synced)
+        self.assertEqual(self.sess.data_objects.sync(synced, "/", direction="get"), [])
+        self.assertEqual(self.local_files(synced), under_root)
+        self.assertEqual(self.plan_of(synced, "/", direction="get"), [])
+
+    def test_get_tree_requires_a_collection(self):
+        with self.assertRaises(ex.CollectionDoesNotExist):
+            self.sess.data_objects.get_tree(self.home + "/missing", self.local_dir.name)
+
+    def plan_of(self, *args, **kwargs):
+        plan = []
+        self.assertEqual(
+            self.sess.data_objects.sync(*args, dry_run=True, plan=plan, **kwargs), []
+        )
+        return [(a.operation, a.local_path, a.logical_path, a.reason) for a in plan]
+
+    def test_sync_put(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = self.sample_files()
+        self.make_tree(source, files)
+        coll = self.home + "/synced"
+
+        plan = []
+        self.assertEqual(self.sess.data_objects.sync(source, coll, plan=plan), [])
+        self.assertEqual(
+            sorted((a.operation, a.reason) for a in plan),
+            [("create_collection", "missing")] * 5 + [("put", "missing")] * 6,
+        )
+        self.assertEqual(self.remote_files(coll), files)
+        self.assertEqual(self.plan_of(source, coll), [])
+
+        # A change of size, or a later modification time, is transferred again.
+        files["a/b/two.dat"] = b"2"
+        files["d/four.dat"] = b"FOUR"
+        self.make_tree(source, {k: files[k] for k in ("a/b/two.dat", "d/four.dat")})
+        later = time.time() + 10
+        os.utime(os.path.join(source, "d", "four.dat"), (later, later))
+        self.assertEqual(
+            self.plan_of(source, coll),
+            [
+                (
+                    "put",
+                    os.path.join(source, "a", "b", "two.dat"),
+                    coll + "/a/b/two.dat",
+                    "size",
+                ),
+                (
+                    "put",
+                    os.path.join(source, "d", "four.dat"),
+                    coll + "/d/four.dat",
+                    "newer",
+                ),
+            ],
+        )
+        self.assertEqual(self.sess.data_objects.sync(source, coll), [])
+        self.assertEqual(self.remote_files(coll), files)
+
+    def test_sync_put_reports_a_failed_collection(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = self.sample_files()
+        self.make_tree(source, files)
+        coll = self.home + "/synced"
+        with self.refuse_to_create(coll + "/a/b"):
+            failures = self.sess.data_objects.sync(source, coll)
+        self.assertEqual(
+            [(f.local_path, f.logical_path) for f in failures],
+            [(os.path.join(source, "a", "b"), coll + "/a/b")],
+        )
+        self.assertEqual(
+            self.remote_files(coll),
+            {k: v for k, v in files.items() if not k.startswith("a/b/")},
+        )
+
+    def test_sync_put_deletes_only_when_asked(self):
+        source = os.path.join(self.local_dir.name, "source")
+        coll = self.home + "/synced"
+        files = self.put_sample_tree(coll)
+        os.remove(os.path.join(source, "a", "one.dat"))
+        self.assertEqual(self.plan_of(source, coll), [])
+        self.assertEqual(
+            self.plan_of(source, coll, delete=True, exclude=["top.dat"]),
+            [("unlink", None, coll + "/a/one.dat", "extraneous")],
+        )
+        self.assertEqual(self.remote_files(coll), files)
+        self.assertEqual(self.sess.data_objects.sync(source, coll, delete=True), [])
+        del files["a/one.dat"]
+        self.assertEqual(self.remote_files(coll), files)
+
+    def test_sync_get(self):
+        coll = self.home + "/synced"
+        files = self.put_sample_tree(coll)
+        destination = os.path.join(self.local_dir.name, "destination")
+        self.make_tree(destination, {"a/one.dat": b"stale", "extra.dat": b"extra"})
+
+        self.assertEqual(
+            self.sess.data_objects.sync(
+                destination, coll, direction="get", delete=True
+            ),
+            [],
+        )
+        self.assertEqual(self.local_files(destination), files)
+        # Downloaded files take the modification times of the data objects.
+        self.assertEqual(self.plan_of(destination, coll, direction="get"), [])
+        self.assertEqual(
+            int(os.path.getmtime(os.path.join(destination, "top.dat"))),
+            int(self.sess.data_objects.get(coll + "/top.dat").modify_time.timestamp()),
+        )
+
+    def test_sync_by_checksum(self):
+        coll = self.home + "/synced"
+        self.put_sample_tree(coll)
+        source = os.path.join(self.local_dir.name, "source")
+        path = os.path.join(source, "top.dat")
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+        record = self.server.catalog.data_objects[coll + "/top.dat"]
+        record[DataObject.checksum] = "sha2:" + base64.b64encode(digest).decode()
+
+        self.assertEqual(self.plan_of(source, coll, checksum=True), [])
+        self.assertEqual(
+            self.plan_of(source, coll),
+            [("put", path, coll + "/top.dat", "newer")],
+        )
+        record[DataObject.checksum] = hashlib.md5(b"other").hexdigest()
+        self.assertEqual(
+            self.plan_of(source, coll, checksum=True),
+            [("put", path, coll + "/top.dat", "checksum")],
+        )
+
+    def test_sync_lists_the_tree_in_bulk(self):
+        source = os.path.join(self.local_dir.name, "source")
+        coll = self.home + "/synced"
+        self.put_sample_tree(coll)
+        self.server.api_counts.clear()
+        self.assertEqual(self.sess.data_objects.sync(source, coll), [])
+        self.assertEqual(dict(self.server.api_counts), {"GEN_QUERY_AN": 4})
+
+    def test_sync_arguments(self):
+        with self.assertRaises(ValueError):
+            self.sess.data_objects.sync(
+                self.local_dir.name, self.home, direction="both"
+            )
+        with self.assertRaises(ex.CollectionDoesNotExist):
+            self.sess.data_objects.sync(
+                self.local_dir.name,
+                self.home + "/missing",
+                direction="get",
+                delete=True,
+            )
+
+    def test_bulk_put(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"small_{:03d}.dat".format(i): os.urandom(10) for i in range(120)}
+        files["large.dat"] = os.urandom(5000)
+        self.make_tree(source, files)
+        coll = self.home + "/bulk"
+        self.sess.collections.create(coll)
+        progress = []
+        self.server.api_counts.clear()
+
+        failures = self.sess.data_objects.bulk_put(
+            [os.path.join(source, name) for name in sorted(files)],
+            coll,
+            max_files=50,
+            max_bytes=4000,
+            updatables=progress.append,
+            regChksum="",
+        )
+
+        self.assertEqual(failures, [])
+        # The small files go 50 to a request, and the large file by itself.
+        self.assertEqual(self.server.api_counts["BULK_DATA_OBJ_PUT_AN"], 3)
+        self.assertEqual(self.server.api_counts["DATA_OBJ_OPEN_AN"], 1)
+        self.assertEqual(self.remote_files(coll), files)
+        self.assertEqual(sum(progress), sum(len(c) for c in files.values()))
+        digest = hashlib.sha256(files["small_007.dat"]).digest()
+        self.assertEqual(
+            self.sess.data_objects.get(coll + "/small_007.dat").checksum,
+            "sha2:" + base64.b64encode(digest).decode(),
+        )
+
+    def test_bulk_put_checksum_scheme(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"a.dat": b"a", "b.dat": b"b"}
+        self.make_tree(source, files)
+        paths = [os.path.join(source, name) for name in sorted(files)]
+        with self.assertRaises(ValueError):
+            self.sess.data_objects.bulk_put(paths, self.home, checksum_scheme="sha1")
+        failures = self.sess.data_objects.bulk_put(
+            paths, self.home, checksum_scheme="md5", regChksum=""
+        )
+        self.assertEqual(failures, [])
+        self.assertEqual(
+            self.sess.data_objects.get(self.home + "/a.dat").checksum,
+            hashlib.md5(b"a").hexdigest(),
+        )
+
+    def test_bulk_put_limits_the_bytes_per_request(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"{}.dat".format(i): os.urandom(1000) for i in range(10)}
+        self.make_tree(source, files)
+        self.server.api_counts.clear()
+        failures = self.sess.data_objects.bulk_put(
+            [os.path.join(source, name) for name in files], self.home, max_bytes=4000
+        )
+        self.assertEqual(failures, [])
+        self.assertEqual(self.server.api_counts["BULK_DATA_OBJ_PUT_AN"], 3)
+        self.assertEqual(
+            {k: v for k, v in self.remote_files(self.home).items() if k in files},
+            files,
+        )
+
+    def test_bulk_put_reports_existing_data_objects(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"a.dat": b"a", "b.dat": b"b", "c.dat": b"c"}
+        self.make_tree(source, files)
+        paths = [os.path.join(source, name) for name in sorted(files)]
+        coll = self.home + "/bulk"
+        self.sess.collections.create(coll)
+        self.sess.data_objects.put(paths[1], coll + "/b.dat")
+
+        failures = self.sess.data_objects.bulk_put(paths, coll, forceFlag=None)
+
+        self.assertEqual(
+            [(f.local_path, f.logical_path) for f in failures],
+            [(paths[1], coll + "/b.dat")],
+        )
+        self.assertEqual(self.remote_files(coll), files)
+        self.assertEqual(self.sess.data_objects.bulk_put(paths, coll), [])
+
+    def test_bulk_request_failure_lists_every_file(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"a.dat": b"a", "b.dat": b"b"}
+        self.make_tree(source, files)
+        failures = self.sess.data_objects.bulk_put(
+            [os.path.join(source, name) for name in sorted(files)],
+            self.home + "/missing",
+        )
+        self.assertEqual(
+            sorted(f.logical_path for f in failures),
+            [self.home + "/missing/a.dat", self.home + "/missing/b.dat"],
+        )
+        self.assertIsInstance(failures[0].exception, ex.CAT_UNKNOWN_COLLECTION)
+
+    def test_put_tree_in_bulk(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = self.sample_files()
+        self.make_tree(source, files)
+        self.server.api_counts.clear()
+        self.assertEqual(
+            self.sess.data_objects.put_tree(source, self.home + "/up", bulk=True), []
+        )
+        self.assertEqual(self.server.api_counts["BULK_DATA_OBJ_PUT_AN"], 5)
+        self.assertEqual(self.server.api_counts["DATA_OBJ_OPEN_AN"], 0)
+        self.assertEqual(self.remote_files(self.home + "/up"), files)
+
+    def test_unreadable_file_is_left_out_of_its_bulk_request(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"a.dat": b"a", "c.dat": b"c"}
+        self.make_tree(source, files)
+        # A directory can be sized, but not read as a file.
+        os.mkdir(os.path.join(source, "b.dat"))
+        failures = self.sess.data_objects.bulk_put(
+            [os.path.join(source, name) for name in ("a.dat", "b.dat", "c.dat")],
+            self.home,
+        )
+        self.assertEqual([f.logical_path for f in failures], [self.home + "/b.dat"])
+        self.assertIsInstance(failures[0].exception, OSError)
+        self.assertEqual(self.remote_files(self.home), files)
+
+    def test_put_tree_in_bulk_reports_a_file_it_cannot_stat(self):
+        source = os.path.join(self.local_dir.name, "source")
+        files = {"a.dat": b"a", "c.dat": b"c"}
+        self.make_tree(source, files)
+        dangling = os.path.join(source, "b.dat")
+        os.symlink(os.path.join(source, "missing"), dangling)
+        failures = self.sess.data_objects.put_tree(source, self.home + "/up", bulk=True)
+        self.assertEqual(
+            [(f.local_path, f.logical_path) for f in failures],
+            [(dangling, self.home + "/up/b.dat")],
+        )
+        self.assertEqual(self.remote_files(self.home + "/up"), files)
+
+
+if __name__ == "__main__":
+    # let the tests find the parent irods lib
+    sys.path.insert(0, os.path.abspath("../.."))
+    unittest.main()
@@ -0,0 +1,160 @@
+"""Optional tracing of client operations as spans.
+
+Spans are opened around the operations worth seeing in a trace: authentication, each page of
+a query, data object opens (with any redirect to another host), reads, and closes, and the
+threads of a parallel transfer.  Each carries attributes such as "irods.path", "irods.api",
+"irods.bytes", "irods.resc_hier", "irods.host", and "thread.id".
+
+Nothing is traced until a tracer is installed by set_tracer().  A tracer is any object with a
+start_span(name, attributes) method returning a context manager, whose value on entering is a
+span with a set_attribute(key, value) method.  An OpenTelemetry tracer is installed through
+OpenTelemetryTracer:
+
+    from opentelemetry import trace
+    import irods.tracing
+    irods.tracing.set_tracer(irods.tracing.OpenTelemetryTracer(trace.get_tracer("irods")))
+"""
+
+import contextvars
+import functools
+import threading
+from typing import Any, Callable, TypeVar, cast
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "OpenTelemetryTracer",
+    "set_tracer",
+    "get_tracer",
+    "span",
+    "traced",
+    "current_span",
+]
+
+
+class Span:
+    """A span which records nothing; the base for spans made by tracers."""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+
+class Tracer:
+    """The interface to which tracers conform."""
+
+    def start_span(self, name, attributes):
+        """Return a context manager which begins a span named `name', with the given
+        attributes, on entry (returning the span) and ends it on exit."""
+        raise NotImplementedError
+
+
+class OpenTelemetryTracer(Tracer):
+    """Adapts a tracer of the OpenTelemetry API (as returned by opentelemetry.trace.get_tracer)
+    to the Tracer interface.  Spans are made current in the OpenTelemetry context, so those of
+    the client nest under the application's."""
+
+    def __init__(self, otel_tracer):
+        self.otel_tracer = otel_tracer
+
+    def start_span(self, name, attributes):
+        return self.otel_tracer.start_as_current_span(name, attributes=attributes)
+
+
+class _No_span_context:
+
+    def __enter__(self):
+        return _NO_SPAN
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_SPAN = Span()
+_NO_SPAN_CONTEXT = _No_span_context()
+
+# The installed tracer, or None while tracing is disabled.
+_tracer = None
+
+_current_span = contextvars.ContextVar("irods_current_span", default=_NO_SPAN)
+
+
+def set_tracer(tracer):
+    """Install `tracer' (or, with None, disable tracing), returning the previous tracer."""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def get_tracer():
+    return _tracer
+
+
+def current_span():
+    """Return the innermost span opened by the client in the current context, or a span that
+    records nothing."""
+    return _current_span.get()
+
+
+class _Span_context:
+
+    __slots__ = ("_context", "_token")
+
+    def __init__(self, context):
+        self._context = context
+
+    def __enter__(self):
+        span_ = self._context.__enter__()
+        self._token = _current_span.set(span_)
+        return span_
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_span.reset(self._token)
+        return self._context.__exit__(exc_type, exc_value, traceback)
+
+
+def span(name, attributes=None):
+    """Return a context manager opening a span named `name' through the installed tracer.
+
+    Attributes with a value of None are omitted, and "thread.id" is added.  While no tracer
+    is installed, a shared context manager is returned which does nothing."""
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN_CONTEXT
+    attributes = {
+        key: value for key, value in (attributes or {}).items() if value is not None
+    }
+    attributes["thread.id"] = threading.get_ident()
+    return _Span_context(tracer.start_span(name, attributes))
+
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def traced(name, attributes=None) -> Callable[[_F], _F]:
+    """Return a decorator opening a span named `name' around each call of a function, whose
+    name and signature the decorated function keeps.  If given, `attributes' is called with the
+    function's arguments to give those of the span."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def traced_function(*args, **kwargs):
+            if _tracer is None:
+                return function(*args, **kwargs)
+            with span(name, attributes(*args, **kwargs) if attributes else None):
+                return function(*args, **kwargs)
+
+        return cast(_F, traced_function)
+
+    return decorator
+
+
+def propagating(function):
+    """Return `function' bound to a copy of the current context, so that spans opened when it
+    runs in another thread nest under those open here."""
+    if _tracer is None:
+        return function
+    return functools.partial(contextvars.copy_context().run, function)